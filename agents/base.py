@@ -0,0 +1,31 @@
+"""
+智能体基类
+"""
+from typing import Any, Dict
+
+
+class BaseAgent:
+    """
+    智能体基类
+
+    子类实现 async handle(payload)；调度器为每个智能体维护独立的有界优先级队列，
+    并按 concurrency 启动对应数量的工作协程。
+    """
+
+    name: str = "agent"
+    # 同时处理的任务数
+    concurrency: int = 1
+    # 队列容量，满时提交方被阻塞或拒绝（背压）
+    queue_size: int = 100
+
+    async def setup(self) -> None:
+        """调度器启动时调用"""
+
+    async def teardown(self) -> None:
+        """调度器停止时调用"""
+
+    async def handle(self, payload: Dict[str, Any]) -> Any:
+        raise NotImplementedError
+
+    def describe(self) -> Dict[str, Any]:
+        return {"name": self.name, "concurrency": self.concurrency, "queue_size": self.queue_size}
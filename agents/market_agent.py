@@ -0,0 +1,74 @@
+"""
+市场数据智能体 - 拉取行情，只把新增的 K 线作为事件发布
+"""
+import asyncio
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from agents.base import BaseAgent
+from core.event_bus import MARKET_BAR, EventBus
+
+# fetch(ticker, period, force_local) -> {'success', 'history': DataFrame, 'info', 'source'}
+Fetcher = Callable[..., Dict[str, Any]]
+
+
+class MarketAgent(BaseAgent):
+    """
+    行情智能体
+
+    任务 payload: {"tickers": [...], "period": "1mo", "force_local": False}
+    每只股票记录已发布的最后一个交易日，只发布之后的新 K 线；首次发布全部历史。
+    """
+
+    name = "market"
+    concurrency = 2
+    queue_size = 200
+
+    def __init__(self, bus: EventBus, fetch: Fetcher):
+        self.bus = bus
+        self.fetch = fetch
+        self._last_date: Dict[Tuple[str, str], Any] = {}
+
+    async def handle(self, payload: Dict[str, Any]) -> Dict[str, int]:
+        period = payload.get("period", "1mo")
+        force_local = payload.get("force_local", False)
+        published = {}
+        for ticker in payload.get("tickers", []):
+            ticker = ticker.strip().upper()
+            # 数据获取是阻塞 IO，放到线程池中执行
+            data = await asyncio.to_thread(self.fetch, ticker, period, force_local)
+            published[ticker] = await self._publish_new_bars(ticker, period, data)
+        return published
+
+    async def _publish_new_bars(self, ticker: str, period: str, data: Dict[str, Any]) -> int:
+        if not data.get("success"):
+            return 0
+        hist = data["history"]
+        key = (ticker, period)
+        last = self._last_date.get(key)
+        new = hist if last is None else hist[hist.index > last]
+        if new.empty:
+            return 0
+
+        self._last_date[key] = new.index[-1]
+        volume = new["Volume"].to_numpy(dtype=float) if "Volume" in new.columns else None
+        await self.bus.publish(MARKET_BAR, {
+            "ticker": ticker,
+            "period": period,
+            "reset": last is None,
+            "dates": [d.strftime("%Y-%m-%d") if hasattr(d, "strftime") else str(d) for d in new.index],
+            "close": new["Close"].to_numpy(dtype=float),
+            "volume": volume if volume is not None else np.zeros(len(new)),
+            "info": data.get("info", {}),
+            "source": data.get("source")
+        }, key=ticker)
+        return len(new)
+
+    def forget(self, ticker: Optional[str] = None) -> None:
+        """清除发布记录，下次拉取时重新发布全部历史"""
+        if ticker is None:
+            self._last_date.clear()
+        else:
+            for key in [k for k in self._last_date if k[0] == ticker]:
+                del self._last_date[key]
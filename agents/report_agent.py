@@ -0,0 +1,106 @@
+"""
+报告与预警智能体 - 订阅风险指标变化，渲染报告并在风险升级时发出预警
+"""
+from typing import Any, Callable, Dict, Optional
+
+from agents.base import BaseAgent
+from core.event_bus import REPORT_READY, RISK_ALERT, EventBus
+from src.modules.report_templates import ReportTemplate
+
+_LEVEL_ORDER = {level: i for i, level in enumerate(("低风险", "中风险", "高风险"))}
+_NA = "N/A"
+
+METRICS_REPORT_TEMPLATE = ReportTemplate(
+    "## 📊 {ticker} - {company}\n",
+    "### 💰 价格信息\n",
+    "- **当前价格**: {current_price}\n",
+    "- **价格变动**: {daily_change_pct}\n",
+    "- **数据点数**: {days} 个交易日（截至 {as_of}）\n\n",
+    "### ⚠️ 风险分析\n",
+    "- **风险评分**: {risk_score}/10\n",
+    "- **风险等级**: {risk_level}\n",
+    "- **年化波动率**: {volatility_annual}\n",
+    "- **夏普比率**: {sharpe_ratio}\n",
+    "- **最大回撤**: {max_drawdown}\n\n",
+    "### 🎯 投资建议\n",
+    "{recommendation}\n\n",
+    "---\n",
+    "*数据来源: {source} | 事件推送更新*\n"
+)
+
+
+def _fmt(value: Optional[float], pattern: str) -> str:
+    return _NA if value is None or value != value else pattern.format(value)
+
+
+def render_metrics_report(data: Dict[str, Any]) -> str:
+    """将 risk.metrics 事件渲染为 Markdown 报告"""
+    m = data["metrics"]
+    return METRICS_REPORT_TEMPLATE.render({
+        "ticker": data["ticker"],
+        "company": data.get("info", {}).get("longName", data["ticker"]),
+        "current_price": _fmt(m.get("current_price"), "${:.2f}"),
+        "daily_change_pct": _fmt(m.get("daily_change_pct"), "{:+.2f}%"),
+        "days": data.get("days", 0),
+        "as_of": data.get("as_of", ""),
+        "risk_score": _fmt(m.get("risk_score"), "{:.1f}"),
+        "risk_level": m.get("risk_level") or "数据不足",
+        "volatility_annual": _fmt(m.get("volatility_annual"), "{:.2%}"),
+        "sharpe_ratio": _fmt(m.get("sharpe_ratio"), "{:.2f}"),
+        "max_drawdown": _fmt(m.get("max_drawdown"), "{:.2%}"),
+        "recommendation": m.get("recommendation") or "数据不足，暂无建议",
+        "source": data.get("source") or "未知"
+    })
+
+
+class ReportAgent(BaseAgent):
+    """
+    报告/预警智能体
+
+    任务 payload 为 risk.metrics 事件：渲染报告并发布 report.ready；
+    风险等级上升或评分变化超过 alert_score_delta 时发布 risk.alert。
+    """
+
+    name = "report"
+    concurrency = 2
+    queue_size = 500
+
+    def __init__(self, bus: EventBus, render: Callable[[Dict[str, Any]], str] = render_metrics_report,
+                 alert_score_delta: float = 1.0):
+        self.bus = bus
+        self.render = render
+        self.alert_score_delta = alert_score_delta
+
+    async def handle(self, event: Dict[str, Any]) -> str:
+        data = event["data"]
+        ticker = data["ticker"]
+        report = self.render(data)
+        await self.bus.publish(REPORT_READY, {
+            "ticker": ticker,
+            "period": data["period"],
+            "report": report,
+            "as_of": data.get("as_of")
+        }, key=ticker)
+
+        alert = self._check_alert(data)
+        if alert:
+            await self.bus.publish(RISK_ALERT, alert, key=ticker)
+        return report
+
+    def _check_alert(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        current, previous = data["metrics"], data.get("previous") or {}
+        if not previous:
+            return None
+        level, old_level = current.get("risk_level"), previous.get("risk_level")
+        score, old_score = current.get("risk_score"), previous.get("risk_score")
+
+        reasons = []
+        if level in _LEVEL_ORDER and old_level in _LEVEL_ORDER and _LEVEL_ORDER[level] > _LEVEL_ORDER[old_level]:
+            reasons.append(f"风险等级由{old_level}升至{level}")
+        if (score is not None and old_score is not None and score == score and old_score == old_score
+                and abs(score - old_score) >= self.alert_score_delta):
+            reasons.append(f"风险评分由 {old_score:.1f} 变为 {score:.1f}")
+        if not reasons:
+            return None
+        return {"ticker": data["ticker"], "period": data["period"], "reasons": reasons,
+                "risk_level": level, "risk_score": score, "as_of": data.get("as_of")}
@@ -0,0 +1,72 @@
+"""
+风险计算智能体 - 订阅行情事件，只对收到新 K 线的股票增量重算风险指标
+"""
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from agents.base import BaseAgent
+from core.event_bus import RISK_METRICS, EventBus
+from src.modules.risk_metrics import METRIC_COLUMNS, RISK_LEVELS, compute_risk_metrics
+
+# 单只股票保留的最大交易日数
+HISTORY_WINDOW = 756
+
+
+def _same(a: Any, b: Any) -> bool:
+    # NaN 与 NaN 视为未变化
+    return a == b or (isinstance(a, float) and isinstance(b, float) and a != a and b != b)
+
+
+class RiskAgent(BaseAgent):
+    """
+    风险智能体
+
+    任务 payload 为 market.bar 事件；按 (ticker, period) 维护收盘价序列，
+    追加新 K 线后只重算该股票，指标有变化时发布 risk.metrics 事件。
+    """
+
+    name = "risk"
+    concurrency = 1
+    queue_size = 1000
+
+    def __init__(self, bus: EventBus, window: int = HISTORY_WINDOW):
+        self.bus = bus
+        self.window = window
+        self.closes: Dict[Tuple[str, str], np.ndarray] = {}
+        self.volumes: Dict[Tuple[str, str], np.ndarray] = {}
+        self.metrics: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    async def handle(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        bar = event["data"]
+        key = (bar["ticker"], bar["period"])
+        if bar.get("reset") or key not in self.closes:
+            closes, volumes = bar["close"], bar["volume"]
+        else:
+            closes = np.concatenate([self.closes[key], bar["close"]])
+            volumes = np.concatenate([self.volumes[key], bar["volume"]])
+        self.closes[key] = closes[-self.window:]
+        self.volumes[key] = volumes[-self.window:]
+
+        row = compute_risk_metrics(self.closes[key][None, :], self.volumes[key][None, :])
+        metrics = {name: float(row[name][0]) for name in METRIC_COLUMNS if name != "risk_level"}
+        level = int(row["risk_level"][0])
+        metrics["risk_level"] = RISK_LEVELS[level][0] if level >= 0 else None
+        metrics["recommendation"] = RISK_LEVELS[level][1] if level >= 0 else None
+
+        previous = self.metrics.get(key, {})
+        changed = [k for k, v in metrics.items() if not _same(previous.get(k), v)]
+        self.metrics[key] = metrics
+        if changed:
+            await self.bus.publish(RISK_METRICS, {
+                "ticker": bar["ticker"],
+                "period": bar["period"],
+                "metrics": metrics,
+                "previous": previous,
+                "changed": changed,
+                "days": len(self.closes[key]),
+                "as_of": bar["dates"][-1],
+                "info": bar.get("info", {}),
+                "source": bar.get("source")
+            }, key=bar["ticker"])
+        return metrics
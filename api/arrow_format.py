@@ -0,0 +1,153 @@
+"""
+Arrow IPC 流式响应 - 批量接口的二进制列式输出（Accept: application/vnd.apache.arrow.stream）
+"""
+import importlib.util
+import json
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+# pyarrow 导入较慢，只检查是否安装，首次输出 Arrow 时再导入
+ARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+pa = None
+pa_ipc = None
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+# 每个 record batch 的最大行数
+BATCH_ROWS = 65536
+
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+@lru_cache(maxsize=256)
+def _accept_ranges(header: str) -> Tuple[Tuple[str, float], ...]:
+    """解析 Accept 头为 (媒体范围, q 值)，q 缺省为 1，无法解析的 q 视为 0"""
+    ranges = []
+    for item in header.split(","):
+        media, *params = [part.strip() for part in item.split(";")]
+        if not media:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    q = 0.0
+        ranges.append((media.lower(), q))
+    return tuple(ranges)
+
+
+def _quality(ranges: Tuple[Tuple[str, float], ...], media_type: str) -> float:
+    """按最具体的匹配范围（type/subtype > type/* > */*）取 q 值，没有匹配时为 0"""
+    main = media_type.split("/")[0]
+    best, q = -1, 0.0
+    for media, value in ranges:
+        specificity = 2 if media == media_type else 1 if media == f"{main}/*" else 0 if media == "*/*" else -1
+        if specificity > best:
+            best, q = specificity, value
+    return q
+
+
+def wants_arrow(request: Request) -> bool:
+    """
+    请求的 Accept 头是否要求 Arrow IPC 流（要求但未安装 pyarrow 时返回 406）
+
+    Arrow 须被显式列出且 q > 0，并且 q 值不低于 JSON 的 q 值；通配范围只用于 JSON。
+    """
+    header = request.headers.get("accept", "")
+    if ARROW_STREAM_MEDIA_TYPE not in header.lower():
+        return False
+    ranges = _accept_ranges(header)
+    arrow_q = next((q for media, q in ranges if media == ARROW_STREAM_MEDIA_TYPE), 0.0)
+    if arrow_q <= 0 or arrow_q < _quality(ranges, JSON_MEDIA_TYPE):
+        return False
+    _require_arrow()
+    return True
+
+
+def _require_arrow() -> None:
+    global pa, pa_ipc
+    if not ARROW_AVAILABLE:
+        raise HTTPException(status_code=406, detail="Arrow 输出需要服务端安装 pyarrow (pip install pyarrow)")
+    if pa is None:
+        import pyarrow
+        import pyarrow.ipc
+        pa, pa_ipc = pyarrow, pyarrow.ipc
+
+
+def to_arrow(values: Any) -> "pa.Array":
+    """
+    NumPy 列转 Arrow 数组
+
+    连续的数值列直接复用 NumPy 缓冲区（NaN 原样保留，不转为 null）；
+    文本/对象列需要逐元素转换。
+    """
+    if isinstance(values, (pa.Array, pa.ChunkedArray)):
+        return values
+    values = np.asarray(values)
+    if values.dtype.kind in "fiub":
+        return pa.array(np.ascontiguousarray(values))
+    if values.dtype.kind == "M":
+        return pa.array(values)
+    return pa.array(values.tolist(), type=pa.string())
+
+
+def dictionary_column(codes: np.ndarray, labels: List[str]) -> "pa.DictionaryArray":
+    """整数编码列（-1 表示缺失）转为字典编码数组，不展开为字符串"""
+    codes = np.asarray(codes)
+    indices = pa.array(codes.astype(np.int8, copy=False), mask=codes < 0)
+    return pa.DictionaryArray.from_arrays(indices, pa.array(labels, type=pa.string()))
+
+
+class _ChunkSink:
+    """收集 IPC 写入的字节，供生成器逐块取出"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> Iterator[bytes]:
+        chunks, self.chunks = self.chunks, []
+        if chunks:
+            yield b"".join(chunks)
+
+
+def _ipc_stream(batch: "pa.RecordBatch", batch_rows: int) -> Iterator[bytes]:
+    sink = _ChunkSink()
+    with pa_ipc.new_stream(sink, batch.schema) as writer:
+        yield from sink.drain()
+        for offset in range(0, max(batch.num_rows, 1), batch_rows):
+            # slice 为零拷贝视图
+            writer.write_batch(batch.slice(offset, batch_rows))
+            yield from sink.drain()
+    yield from sink.drain()
+
+
+def arrow_response(columns: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None,
+                   batch_rows: int = BATCH_ROWS) -> StreamingResponse:
+    """
+    以 Arrow IPC 流返回列数据，按 batch_rows 切分为多个 record batch 逐块发送
+
+    metadata 以 JSON 字符串写入 schema 元数据（如数据版本、缺失代码）。
+    """
+    arrays = {name: to_arrow(values) for name, values in columns.items()}
+    schema_metadata = {k: json.dumps(v, ensure_ascii=False, default=str) for k, v in (metadata or {}).items()}
+    batch = pa.RecordBatch.from_arrays(list(arrays.values()), names=list(arrays))
+    batch = batch.replace_schema_metadata(schema_metadata)
+    return StreamingResponse(_ipc_stream(batch, batch_rows), media_type=ARROW_STREAM_MEDIA_TYPE)
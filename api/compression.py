@@ -0,0 +1,154 @@
+"""
+响应压缩中间件 - 按 Accept-Encoding 选择 Brotli / Gzip，支持流式响应
+"""
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# 已压缩或不适合压缩的内容类型（SSE 需要逐条即时送达）
+SKIP_CONTENT_TYPES = (b"image/", b"video/", b"audio/", b"application/zip", b"application/gzip",
+                      b"application/pdf", b"text/event-stream")
+
+
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    """解析 Accept-Encoding，返回 编码 -> q 值"""
+    encodings = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        encodings[name.strip().lower()] = q
+    return encodings
+
+
+class _Compressor:
+    """增量压缩器：每块输出可立即解码的数据（流式响应不会被缓冲到结束）"""
+
+    def __init__(self, encoding: str, level: Optional[int]):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=4 if level is None else level)
+        else:
+            # wbits=31 输出 gzip 头尾
+            self._zlib = zlib.compressobj(6 if level is None else level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """
+    压缩中间件（ASGI）
+
+    客户端支持时优先 Brotli（需安装 brotli），否则 Gzip。一次性返回且小于 minimum_size 的响应不压缩；
+    StreamingResponse 按块增量压缩并去掉 Content-Length，内存中不会持有完整的压缩结果。
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: Optional[int] = None,
+                 brotli_quality: Optional[int] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": gzip_level, "br": brotli_quality}
+
+    def _choose(self, scope) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accepted = _parse_accept_encoding(value.decode("latin-1"))
+                if BROTLI_AVAILABLE and accepted.get("br", 0) > 0:
+                    return "br"
+                if accepted.get("gzip", 0) > 0:
+                    return "gzip"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        encoding = self._choose(scope) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Dict = {}
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def wrapped_send(message):
+            nonlocal compressor, passthrough
+            if message["type"] == "http.response.start":
+                start.update(message)
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start:
+                # 第一块到达时决定是否压缩
+                headers = start.get("headers", [])
+                if self._skip(headers) or (not more_body and len(body) < self.minimum_size):
+                    passthrough = True
+                    await send(start)
+                else:
+                    compressor = _Compressor(encoding, self.levels[encoding])
+                    await send({**start, "headers": self._rewrite(headers, encoding)})
+                start.clear()
+
+            if passthrough:
+                await send(message)
+            elif more_body:
+                chunk = compressor.compress(body)
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": compressor.finish(body)})
+
+        await self.app(scope, receive, wrapped_send)
+
+    @staticmethod
+    def _skip(headers: List[Tuple[bytes, bytes]]) -> bool:
+        for name, value in headers:
+            name = name.lower()
+            if name == b"content-encoding":
+                return True
+            if name == b"content-type" and value.lower().startswith(SKIP_CONTENT_TYPES):
+                return True
+        return False
+
+    @staticmethod
+    def _rewrite(headers: List[Tuple[bytes, bytes]], encoding: str) -> List[Tuple[bytes, bytes]]:
+        rewritten = []
+        vary = False
+        for name, value in headers:
+            lower = name.lower()
+            if lower == b"content-length":
+                continue
+            if lower == b"etag" and not value.startswith(b"W/"):
+                # 压缩后字节不同，强 ETag 降为弱 ETag
+                value = b"W/" + value
+            if lower == b"vary":
+                vary = True
+                if b"accept-encoding" not in value.lower():
+                    value += b", Accept-Encoding"
+            rewritten.append((name, value))
+        if not vary:
+            rewritten.append((b"vary", b"Accept-Encoding"))
+        rewritten.append((b"content-encoding", encoding.encode()))
+        return rewritten
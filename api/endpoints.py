@@ -1,10 +1,28 @@
 """
 API 端点定义 - 用于 Vercel 部署
 """
+import asyncio
+import json
 from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Query, HTTPException
-from pydantic import BaseModel
+
+import numpy as np
+from fastapi import APIRouter, Depends, Header, Query, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from api.arrow_format import arrow_response, dictionary_column, wants_arrow
+from api.serialization import stream_json
+from core.alerts import alert_engine, OPERATORS
+from core.metric_stream import FRAME_INTERVAL, metric_stream
+from core.report_jobs import report_jobs, ReportQueueFullError, TERMINAL_STATES
+from core.shared_prices import shared_prices
+from core.system import system
+from core.warmup import portfolio_inputs
+from src.modules.portfolio_optimizer import optimize_weights, portfolio_stats
+from src.modules.risk_metrics import METRIC_COLUMNS, RISK_LEVELS, compute_risk_metrics
+from src.modules.screener import get_screener
+from utils.profiling import profile_config, profile_store
 
 router = APIRouter()
 
@@ -18,40 +36,91 @@ class StressTestRequest(BaseModel):
     portfolio: List[str]
     scenario: str
     confidence_level: float = 0.95
+    report_format: str = "html"
 
 class RiskResponse(BaseModel):
     symbol: str
-    timestamp: datetime
+    # /risk/analyze 经过响应缓存，命中时返回首次计算的时间
+    timestamp: datetime = Field(..., description="指标计算时间（响应缓存命中时不是请求时间）")
     metrics: dict
     warnings: List[str] = []
 
+class ScreenerFilter(BaseModel):
+    metric: str
+    gt: Optional[float] = None
+    gte: Optional[float] = None
+    lt: Optional[float] = None
+    lte: Optional[float] = None
+
+class ScreenerRequest(BaseModel):
+    filters: List[ScreenerFilter] = []
+    sector: Optional[str] = None
+    sort_by: str = "risk_score"
+    descending: bool = True
+    page: int = Field(1, ge=1)
+    page_size: int = Field(20, ge=1, le=500)
+
+class BatchRiskRequest(BaseModel):
+    symbols: List[str] = Field(..., min_length=1, max_length=5000)
+
+class AlertRuleRequest(BaseModel):
+    metric: str
+    op: str
+    threshold: float
+    ticker: Optional[str] = None
+    rule_id: Optional[str] = None
+    message: Optional[str] = None
+
+class ReportJobRequest(BaseModel):
+    report_type: str
+    params: dict = {}
+    format: str = "html"
+
 # API 端点
 @router.post("/risk/analyze", response_model=RiskResponse)
 async def analyze_risk(request: RiskRequest):
     """分析单个资产的风险"""
     # 模拟响应 - 实际应调用风险引擎
+    metrics = {
+        "var": 0.045,
+        "cvar": 0.062,
+        "volatility": 0.22,
+        "sharpe_ratio": 1.8
+    }
+    # 按已注册的预警规则检查（只读，不改变预警引擎状态）
+    alerts = alert_engine.check(request.symbol, {
+        "var_95": metrics["var"],
+        "volatility_annual": metrics["volatility"],
+        "sharpe_ratio": metrics["sharpe_ratio"]
+    })
     return RiskResponse(
         symbol=request.symbol,
         timestamp=datetime.now(),
-        metrics={
-            "var": 0.045,
-            "cvar": 0.062,
-            "volatility": 0.22,
-            "sharpe_ratio": 1.8
-        },
-        warnings=["高波动性警告"] if request.symbol == "TSLA" else []
+        metrics=metrics,
+        warnings=[a["message"] for a in alerts]
     )
 
 @router.post("/stress-test")
 async def stress_test(request: StressTestRequest):
     """运行压力测试"""
-    return {
+    result = {
         "scenario": request.scenario,
         "portfolio": request.portfolio,
         "estimated_loss": 0.152,
-        "confidence_level": request.confidence_level,
-        "report_url": f"/reports/stress_test_{datetime.now():%Y%m%d}.pdf"
+        "confidence_level": request.confidence_level
     }
+    # 报告交给后台线程渲染，这里只返回任务信息
+    try:
+        job = report_jobs.submit("stress_test", result, request.report_format)
+    except ReportQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result["report_job_id"] = job["job_id"]
+    result["report_status_url"] = f"/api/reports/{job['job_id']}"
+    result["report_url"] = f"/api/reports/{job['job_id']}/download"
+    return result
 
 @router.get("/market/trends")
 async def get_market_trends(
@@ -74,7 +143,25 @@ async def optimize_portfolio(
     assets: List[str] = Query(["AAPL", "GOOGL", "MSFT"]),
     risk_tolerance: float = 0.7
 ):
-    """投资组合优化"""
+    """投资组合优化：按共享价格矩阵的收益率与协方差（优先取预热缓存）求只做多的均值-方差权重"""
+    store = shared_prices.snapshot()
+    if store is not None:
+        symbols, _, missing = _resolve_rows(store, list(dict.fromkeys(assets)))
+        if missing:
+            raise HTTPException(status_code=404, detail=f"价格矩阵中没有这些股票: {', '.join(missing)}")
+        returns, cov = portfolio_inputs(system, symbols)
+        with np.errstate(invalid='ignore'):
+            mean_returns = np.nanmean(returns, axis=1)
+        weights = optimize_weights(mean_returns, cov, risk_tolerance)
+        stats = portfolio_stats(weights, mean_returns, cov)
+        return {
+            "optimal_weights": {s: round(float(w), 4) for s, w in zip(symbols, weights)},
+            **{k: round(v, 4) for k, v in stats.items()},
+            "price_version": shared_prices.version,
+            "window": returns.shape[1]
+        }
+
+    # 共享价格矩阵尚未发布时返回示例结果
     return {
         "optimal_weights": {
             "AAPL": 0.35,
@@ -84,4 +171,341 @@ async def optimize_portfolio(
         "expected_return": 0.085,
         "expected_risk": 0.18,
         "sharpe_ratio": 0.472
-    }
\ No newline at end of file
+    }
+
+# 流式 JSON 响应每块包含的股票数
+STREAM_CHUNK = 500
+
+def _price_snapshot():
+    store = shared_prices.snapshot()
+    if store is None:
+        raise HTTPException(status_code=503, detail="共享价格矩阵尚未发布")
+    return store
+
+def _resolve_rows(store, symbols: List[str]):
+    symbols = [s.strip().upper() for s in symbols]
+    rows = store.rows_for(symbols)
+    found = rows >= 0
+    missing = [s for s, ok in zip(symbols, found) if not ok]
+    return [s for s, ok in zip(symbols, found) if ok], rows[found], missing
+
+def _batch_metrics(store, symbols: List[str]):
+    """按行切出价格矩阵并向量化计算指标（CPU 密集，在工作线程中执行）"""
+    symbols, rows, missing = _resolve_rows(store, symbols)
+    volumes = store.volume[rows] if store.volume is not None else None
+    return symbols, missing, compute_risk_metrics(store.close[rows], volumes)
+
+def _returns_window(store, symbols: List[str], window: int):
+    """从内存映射的收益率矩阵复制最近 window 列（在工作线程中执行）"""
+    symbols, rows, missing = _resolve_rows(store, symbols)
+    return symbols, missing, np.asarray(store.returns[rows, -window:])
+
+@router.post("/risk/batch")
+async def batch_risk(request: BatchRiskRequest, http_request: Request):
+    """基于共享价格矩阵批量计算风险指标（Accept 为 Arrow 流时返回列式二进制）"""
+    store = _price_snapshot()
+    symbols, missing, metrics = await asyncio.to_thread(_batch_metrics, store, request.symbols)
+
+    if wants_arrow(http_request):
+        columns = {"ticker": symbols}
+        columns.update({name: metrics[name] for name in METRIC_COLUMNS if name != "risk_level"})
+        columns["risk_level"] = dictionary_column(metrics["risk_level"], [level[0] for level in RISK_LEVELS])
+        return arrow_response(columns, {
+            "version": shared_prices.version,
+            "as_of": str(store.dates[-1]),
+            "missing": missing
+        })
+
+    level_names = np.array([None] + [level[0] for level in RISK_LEVELS], dtype=object)
+
+    def chunks():
+        # 按列转换（tolist 在 C 层完成），再按行拼装；NaN 由序列化器输出为 null
+        for start in range(0, len(symbols), STREAM_CHUNK):
+            end = start + STREAM_CHUNK
+            columns = {name: metrics[name][start:end].tolist() for name in METRIC_COLUMNS if name != "risk_level"}
+            columns["risk_level"] = level_names[metrics["risk_level"][start:end] + 1].tolist()
+            names = list(columns)
+            yield {symbol: dict(zip(names, row)) for symbol, row in zip(symbols[start:end], zip(*columns.values()))}
+
+    head = {"version": shared_prices.version, "as_of": str(store.dates[-1])}
+    return StreamingResponse(stream_json(head, "results", chunks(), {"missing": missing}),
+                             media_type="application/json")
+
+@router.get("/market/returns")
+async def get_market_returns(
+    http_request: Request,
+    symbols: List[str] = Query(...),
+    window: int = Query(20, ge=1, le=2520)
+):
+    """
+    读取共享矩阵中最近 window 个交易日的日收益率
+
+    Arrow 流格式下每行为一个交易日、每只股票一列（不做舍入），股票列直接取自矩阵的连续行。
+    """
+    store = _price_snapshot()
+    if store.returns is None:
+        raise HTTPException(status_code=503, detail="共享价格矩阵不含收益率")
+    symbols, missing, returns = await asyncio.to_thread(_returns_window, store, symbols, window)
+    if wants_arrow(http_request):
+        columns = {"date": store.dates[-returns.shape[1]:]}
+        columns.update(zip(symbols, returns))
+        return arrow_response(columns, {"version": shared_prices.version, "missing": missing})
+    head = {
+        "version": shared_prices.version,
+        "dates": np.datetime_as_string(store.dates[-returns.shape[1]:]).tolist()
+    }
+    chunks = (dict(zip(symbols[start:start + STREAM_CHUNK], np.round(returns[start:start + STREAM_CHUNK], 6)))
+              for start in range(0, len(symbols), STREAM_CHUNK))
+    return StreamingResponse(stream_json(head, "returns", chunks, {"missing": missing}),
+                             media_type="application/json")
+
+@router.get("/portfolio/history/export")
+async def export_portfolio_history(
+    seed: int = 42,
+    start: str = "2023-01-01",
+    end: str = "2023-12-31",
+    freq: Optional[str] = Query(None, pattern="^[DWMY]$")
+):
+    """以 CSV 流导出组合历史，按块格式化，不构造完整文件"""
+    from src.modules.portfolio_history import generate_sample_history
+
+    def build():
+        history = generate_sample_history(seed, start, end)
+        return history.resample(freq) if freq else history
+
+    try:
+        history = await asyncio.to_thread(build)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def rows():
+        yield ",".join(("date",) + history.fields) + "\n"
+        dates = np.datetime_as_string(history.dates)
+        values = history.values
+        for begin in range(0, len(history), STREAM_CHUNK * 4):
+            end_row = begin + STREAM_CHUNK * 4
+            block = np.column_stack([dates[begin:end_row]] +
+                                    [np.char.mod("%.9g", values[i, begin:end_row]) for i in range(len(values))])
+            yield "\n".join(",".join(row) for row in block) + "\n"
+
+    return StreamingResponse(rows(), media_type="text/csv",
+                             headers={"Content-Disposition": f'attachment; filename="portfolio_history_{seed}.csv"'})
+
+@router.post("/screener")
+async def screen_stocks(request: ScreenerRequest, http_request: Request):
+    """风险筛选 - 按指标区间/行业过滤并分页排序"""
+    filters = {}
+    for f in request.filters:
+        bounds = filters.setdefault(f.metric, {})
+        bounds.update(f.model_dump(exclude={"metric"}, exclude_none=True))
+
+    arrow = wants_arrow(http_request)
+
+    def query():
+        # 数据版本变化时 get_screener 会重建索引（批量评分 + 逐指标排序），放在工作线程中执行
+        screener = get_screener()
+        return (screener.screen_columns if arrow else screener.screen)(
+            filters=filters,
+            sector=request.sector,
+            sort_by=request.sort_by,
+            descending=request.descending,
+            offset=(request.page - 1) * request.page_size,
+            limit=request.page_size
+        )
+
+    try:
+        result = await asyncio.to_thread(query)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result["page"] = request.page
+    result["page_size"] = request.page_size
+    result["pages"] = (result["total"] + request.page_size - 1) // request.page_size
+    if arrow:
+        return arrow_response(result.pop("columns"), result)
+    return result
+
+@router.post("/alerts/rules", status_code=201)
+async def add_alert_rule(request: AlertRuleRequest):
+    """注册预警规则，ticker 为空表示对所有股票生效"""
+    if request.op not in OPERATORS:
+        raise HTTPException(status_code=400, detail=f"不支持的运算符: {request.op}")
+    try:
+        rule_id = alert_engine.add_rule(**request.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return alert_engine.rules[rule_id]
+
+@router.get("/alerts/rules")
+async def list_alert_rules():
+    """列出预警规则"""
+    return {"rules": list(alert_engine.rules.values()), "stats": alert_engine.get_stats()}
+
+@router.delete("/alerts/rules/{rule_id}")
+async def delete_alert_rule(rule_id: str):
+    """删除预警规则"""
+    if not alert_engine.remove_rule(rule_id):
+        raise HTTPException(status_code=404, detail="预警规则不存在")
+    return {"rule_id": rule_id, "deleted": True}
+
+@router.get("/alerts")
+async def get_recent_alerts(
+    ticker: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """最近触发的预警（API 进程中由共享价格矩阵的新版本驱动，见 core.price_watcher）"""
+    return {"alerts": alert_engine.recent(ticker, limit)}
+
+# SSE 无数据时的心跳间隔（秒）
+KEEPALIVE_INTERVAL = 15.0
+
+@router.get("/stream/metrics")
+async def stream_metrics(
+    tickers: str = Query(..., description="逗号分隔的股票代码"),
+    interval: float = Query(FRAME_INTERVAL, ge=0.05, le=10.0)
+):
+    """以 Server-Sent Events 推送订阅股票的指标增量，每帧合并为一条消息"""
+    client = metric_stream.connect(tickers.split(","))
+
+    async def events():
+        idle = 0.0
+        try:
+            while True:
+                frame = client.take_frame()
+                if frame is not None:
+                    idle = 0.0
+                    yield f"event: metrics\ndata: {json.dumps(frame, ensure_ascii=False)}\n\n"
+                elif idle >= KEEPALIVE_INTERVAL:
+                    idle = 0.0
+                    yield ": keepalive\n\n"
+                await asyncio.sleep(interval)
+                idle += interval
+        finally:
+            client.close()
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.websocket("/ws/metrics")
+async def websocket_metrics(websocket: WebSocket, interval: float = FRAME_INTERVAL):
+    """
+    WebSocket 指标推送
+
+    客户端发送 {"action": "subscribe" | "unsubscribe", "tickers": [...]} 调整订阅，
+    服务端每帧下发 {"type": "metrics", "updates": {ticker: {"metrics": {...}, ...}}}。
+    """
+    await websocket.accept()
+    client = metric_stream.connect()
+    interval = min(max(interval, 0.05), 10.0)
+
+    async def receive():
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except ValueError:
+                message = None
+            if not isinstance(message, dict) or not isinstance(message.get("tickers", []), list):
+                await websocket.send_json({"type": "error", "detail": "无效的订阅消息"})
+                continue
+            tickers = message.get("tickers") or []
+            if message.get("action") == "unsubscribe":
+                client.unsubscribe(tickers)
+            else:
+                client.subscribe(tickers)
+            await websocket.send_json({"type": "subscribed", "tickers": sorted(client.tickers)})
+
+    async def send():
+        while True:
+            frame = client.take_frame()
+            if frame is not None:
+                await websocket.send_json(frame)
+            await asyncio.sleep(interval)
+
+    tasks = [asyncio.create_task(receive()), asyncio.create_task(send())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            if error and not isinstance(error, WebSocketDisconnect):
+                raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+        client.close()
+
+@router.post("/reports", status_code=202)
+async def submit_report(request: ReportJobRequest):
+    """提交后台报告任务"""
+    try:
+        job = report_jobs.submit(request.report_type, request.params, request.format)
+    except ReportQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    job["status_url"] = f"/api/reports/{job['job_id']}"
+    job["events_url"] = f"/api/reports/{job['job_id']}/events"
+    job["download_url"] = f"/api/reports/{job['job_id']}/download"
+    return job
+
+@router.get("/reports/{job_id}")
+async def get_report_status(job_id: str):
+    """查询报告任务状态"""
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="报告任务不存在")
+    return job
+
+@router.get("/reports/{job_id}/events")
+async def stream_report_status(job_id: str):
+    """以 Server-Sent Events 推送报告任务状态变化，直到任务结束"""
+    if report_jobs.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="报告任务不存在")
+
+    async def events():
+        last_status = None
+        while True:
+            job = report_jobs.get(job_id)
+            if job is None:
+                break
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield f"event: status\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+            if job["status"] in TERMINAL_STATES:
+                break
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@router.get("/reports/{job_id}/download")
+async def download_report(job_id: str):
+    """下载已生成的报告文件"""
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="报告任务不存在")
+    if job["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"报告尚未生成: {job['status']}")
+    media_type = "application/pdf" if job["format"] == "pdf" else "text/html"
+    return FileResponse(job["path"], media_type=media_type,
+                        filename=f"{job['report_type']}_{job_id}.{job['format']}")
+
+def require_profile_token(x_profile: Optional[str] = Header(None), profile: Optional[str] = None):
+    """剖析结果含调用栈，读取同样须带 FINRISK_PROFILE_TOKEN（X-Profile 请求头或 ?profile=）；未配置令牌时不开放"""
+    if not profile_config.token:
+        raise HTTPException(status_code=404, detail="剖析结果不可用")
+    if not profile_config.authorized(x_profile or profile):
+        raise HTTPException(status_code=403, detail="剖析令牌无效")
+
+@router.get("/profiles", dependencies=[Depends(require_profile_token)])
+async def list_profiles():
+    """最近的请求剖析结果（带令牌的 X-Profile / ?profile= 触发或按采样率抽中）"""
+    return {"profiles": profile_store.summaries()}
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_profile_token)])
+async def get_profile(profile_id: str):
+    """折叠栈格式的剖析结果，可直接用于 flamegraph.pl / speedscope"""
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="剖析结果不存在")
+    return PlainTextResponse(profile.collapsed, headers={
+        "Content-Disposition": f'attachment; filename="profile_{profile_id}.collapsed"'
+    })
@@ -2,12 +2,17 @@
 Vercel Serverless Function Entry Point
 This file MUST be named index.py for Vercel Python runtime
 """
+import os
 import sys
 from pathlib import Path
 
 # Add project root to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Vercel's filesystem is read-only outside /tmp: log to stdout only
+if os.getenv("VERCEL"):
+    os.environ.setdefault("FINRISK_LOG_DIR", "")
+
 try:
     # Import the FastAPI app
     from api.main import app
@@ -3,6 +3,8 @@ Vercel 部署主入口 - 兼容 Vercel Serverless Functions
 """
 import sys
 import os
+from contextlib import asynccontextmanager
+from datetime import datetime
 from pathlib import Path
 
 # 添加项目根目录到 Python 路径
@@ -10,22 +12,39 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, PlainTextResponse
 
+from api.compression import CompressionMiddleware
 from api.endpoints import router as api_router
+from api.metrics import MetricsMiddleware
+from api.profiling import ProfilingMiddleware
+from api.response_cache import ResponseCacheMiddleware
+from api.serialization import FastJSONResponse
+from core.alerts import alert_engine
+from core.shared_prices import shared_prices
+from core.system import system
 from utils.logger import setup_logger
+from utils.metrics import registry
 
 # 设置日志
 logger = setup_logger("vercel_app")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """启动时初始化系统、开始预热并监视共享价格矩阵（驱动预警与实时推送），关闭时停止"""
+    await system.initialize(watch_prices=True)
+    yield
+    await system.shutdown()
+
 # 创建 FastAPI 应用
 app = FastAPI(
     title="FinRisk AI Agents API",
     description="金融风险 AI 智能体系统",
     version="0.1.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS 配置
@@ -37,9 +56,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 对相同输入结果确定的端点做响应缓存
+CACHED_PATHS = ("/api/market/trends", "/api/portfolio/optimize", "/api/risk/analyze")
+
+def data_version() -> str:
+    """缓存使用的数据版本：共享价格矩阵版本 + 预警规则版本"""
+    shared_prices.snapshot()
+    return f"{shared_prices.version}.{alert_engine.version}"
+
+app.add_middleware(ResponseCacheMiddleware, paths=CACHED_PATHS, version=data_version)
+
+# 最后添加的中间件位于最外层：缓存保存未压缩的响应，压缩对所有响应生效
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+# 按需剖析（带 FINRISK_PROFILE_TOKEN 令牌的 X-Profile 请求头 / ?profile= 查询参数，或按路径采样率）
+app.add_middleware(ProfilingMiddleware)
+
+# 请求耗时在最外层统计，包含缓存查找与压缩
+app.add_middleware(MetricsMiddleware, known_paths=CACHED_PATHS)
+
 # 挂载静态文件（如果存在）
 static_dir = Path(__file__).parent.parent / "static"
 if static_dir.exists():
+    from fastapi.staticfiles import StaticFiles
     app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
 # 包含 API 路由
@@ -63,19 +102,34 @@ async def root():
     }
 
 @app.get("/health")
+@app.get("/health/live")
 async def health_check():
-    """健康检查端点"""
+    """存活检查 - 进程能响应即返回 200（预热期间同样返回 200）"""
     return JSONResponse(
         status_code=200,
-        content={"status": "healthy", "timestamp": datetime.now().isoformat()}
+        content={"status": "healthy", "ready": system.ready, "timestamp": datetime.now().isoformat()}
     )
 
+@app.get("/health/ready")
+async def readiness_check():
+    """就绪检查 - 预热完成前返回 503，负载均衡只将流量路由到已预热的实例"""
+    return JSONResponse(
+        status_code=200 if system.ready else 503,
+        content={"ready": system.ready, "warmup": system.warmup_report, "timestamp": datetime.now().isoformat()}
+    )
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 抓取端点"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # 全局异常处理
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     return JSONResponse(
         status_code=exc.status_code,
-        content={"error": exc.detail, "path": request.url.path}
+        content={"error": exc.detail, "path": request.url.path},
+        headers=getattr(exc, "headers", None)
     )
 
 @app.exception_handler(Exception)
@@ -0,0 +1,71 @@
+"""
+请求指标中间件 - 按路由模板记录每个 API 请求的耗时与状态码
+"""
+import re
+import time
+from typing import Optional, Sequence
+
+from utils.metrics import HTTP_SECONDS
+
+# 不计入指标的路径（抓取自身）
+EXCLUDED_PATHS = ("/metrics",)
+
+_PARAM = re.compile(r"{(\w+)(?::\w+)?}")
+
+
+def route_template(scope) -> Optional[str]:
+    """
+    请求匹配到的完整路由模板
+
+    嵌套路由（include_router 的 prefix、Mount）下 route.path 只是相对模板，
+    因此用路径参数还原出相对部分的实际路径，再把请求路径中对应的后缀替换回模板。
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return None
+    params = scope.get("path_params", {})
+    try:
+        concrete = _PARAM.sub(lambda m: str(params[m.group(1)]), template)
+    except KeyError:
+        return template
+    path = scope["path"]
+    if concrete and path.endswith(concrete):
+        return path[:len(path) - len(concrete)] + template
+    return template
+
+
+class MetricsMiddleware:
+    """
+    请求耗时中间件（ASGI）
+
+    耗时从收到请求到响应体最后一块发出为止（流式响应包含整个传输过程）；
+    route 标签使用路由模板（如 /api/reports/{job_id}）。未经路由即返回的请求（如响应缓存命中）
+    只有路径在 known_paths 中时按路径记录，其余记为 unmatched，避免标签基数膨胀。
+    """
+
+    def __init__(self, app, known_paths: Sequence[str] = ()):
+        self.app = app
+        self.known_paths = frozenset(known_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def wrapped_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, wrapped_send)
+        finally:
+            route = route_template(scope)
+            if route is None:
+                route = scope["path"] if scope["path"] in self.known_paths else "unmatched"
+            HTTP_SECONDS.observe(time.perf_counter() - start, method=scope["method"], route=route, status=status)
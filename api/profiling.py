@@ -0,0 +1,52 @@
+"""
+请求剖析中间件 - 按请求头 / 查询参数或按路径采样率，在采样剖析器下运行请求
+"""
+from urllib.parse import parse_qs
+
+from utils.profiling import new_profile_id, profile_config, profiled
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY = "profile"
+
+
+class ProfilingMiddleware:
+    """
+    剖析中间件（ASGI）
+
+    请求带 X-Profile: <令牌> 或 ?profile=<令牌>（令牌为 FINRISK_PROFILE_TOKEN，未配置时不能按请求触发），
+    或按 FINRISK_PROFILE_RATES 的路径采样率被抽中时，整个请求在 SamplingProfiler 下运行。
+    响应头 X-Profile-Id / X-Profile-Url 指向保存的折叠栈（GET /api/profiles/{id}）。
+    """
+
+    def __init__(self, app, config=None):
+        self.app = app
+        self.config = config or profile_config
+
+    def _requested(self, scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return self.config.triggered(value.decode("latin-1"))
+        if scope["query_string"]:
+            values = parse_qs(scope["query_string"].decode("latin-1")).get(PROFILE_QUERY)
+            if values:
+                return self.config.triggered(values[-1])
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (self._requested(scope) or self.config.sampled(scope["path"])):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = new_profile_id()
+        with profiled(f"{scope['method']} {scope['path']}", self.config, profile_id) as session:
+            if session.active:
+                async def wrapped_send(message):
+                    if message["type"] == "http.response.start":
+                        headers = list(message.get("headers", []))
+                        headers.append((b"x-profile-id", profile_id.encode()))
+                        headers.append((b"x-profile-url", f"/api/profiles/{profile_id}".encode()))
+                        message = {**message, "headers": headers}
+                    await send(message)
+            else:
+                wrapped_send = send
+            await self.app(scope, receive, wrapped_send)
@@ -0,0 +1,171 @@
+"""
+HTTP 响应缓存中间件 - 按规范化请求 + 数据版本缓存响应，支持 ETag / If-None-Match
+"""
+import hashlib
+import json
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from utils.cache import LRUCache
+
+CACHEABLE_METHODS = ("GET", "POST")
+# 影响响应内容、需要参与缓存键的请求头
+VARY_HEADERS = (b"accept",)
+
+
+def _merge_vary(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    """在响应的 Vary 头中补上参与缓存键的请求头，告知下游缓存按其区分"""
+    merged, found = [], False
+    for name, value in headers:
+        if name.lower() == b"vary":
+            found = True
+            present = {v.strip().lower() for v in value.split(b",")}
+            missing = [h.title() for h in VARY_HEADERS if h not in present]
+            if missing and b"*" not in present:
+                value = b", ".join([value, *missing])
+        merged.append((name, value))
+    if not found:
+        merged.append((b"vary", b", ".join(h.title() for h in VARY_HEADERS)))
+    return merged
+
+
+def _normalize_body(body: bytes) -> bytes:
+    """JSON 请求体按键排序、去掉空白，使等价请求得到同一缓存键"""
+    if not body:
+        return b""
+    try:
+        return json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode()
+    except ValueError:
+        return body
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # 比较时忽略弱校验前缀
+    candidates = [tag.strip() for tag in header.split(",")]
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+class ResponseCacheMiddleware:
+    """
+    响应缓存（ASGI 中间件）
+
+    只缓存指定路径上状态码为 200 的 GET/POST 响应。缓存键由方法、路径、排序后的查询参数、
+    规范化的请求体、Accept 头以及 version() 返回的数据版本组成，数据版本变化后旧条目自然失效。
+    响应带强 ETag、Cache-Control 与 Vary: Accept；请求的 If-None-Match 命中时返回 304。
+    缓存命中返回的是首次计算的响应，其中的时间戳字段为计算时间而非请求时间。
+    缓存按条目数与总字节数双重限制，超出时按 LRU 淘汰。
+    """
+
+    def __init__(self, app, paths: Iterable[str], version: Callable[[], str] = lambda: "",
+                 max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024,
+                 max_entry_bytes: int = 1024 * 1024, max_age: int = 5):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.version = version
+        self.max_entry_bytes = max_entry_bytes
+        self.cache_control = f"public, max-age={max_age}".encode()
+        self.cache = LRUCache(maxsize=max_entries, max_weight=max_bytes, weigher=lambda entry: len(entry[2]))
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope["method"] not in CACHEABLE_METHODS
+                or scope["path"] not in self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        body, receive = await self._read_body(receive)
+        headers = dict(scope["headers"])
+        key = self._key(scope, headers, body)
+        if_none_match = headers.get(b"if-none-match", b"").decode("latin-1")
+
+        entry = self.cache.get(key)
+        if entry is None:
+            entry = await self._call_app(scope, receive, send)
+            if entry is None:
+                return
+            if len(entry[2]) <= self.max_entry_bytes:
+                self.cache.set(key, entry)
+            status = b"MISS"
+        else:
+            status = b"HIT"
+        await self._respond(send, entry, if_none_match, status)
+
+    def _key(self, scope, headers: Dict[bytes, bytes], body: bytes) -> str:
+        # 只按参数名排序，同名参数保持原有顺序
+        pairs = parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)
+        query = urlencode(sorted(pairs, key=lambda pair: pair[0]))
+        digest = hashlib.blake2b(digest_size=20)
+        for part in (scope["method"], scope["path"], query, self.version()):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        for name in VARY_HEADERS:
+            digest.update(headers.get(name, b""))
+            digest.update(b"\0")
+        digest.update(_normalize_body(body))
+        return digest.hexdigest()
+
+    @staticmethod
+    async def _read_body(receive) -> Tuple[bytes, Callable]:
+        """读出完整请求体，并返回可重放该请求体的 receive"""
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        body = b"".join(chunks)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return body, replay
+
+    async def _call_app(self, scope, receive, send) -> Optional[Tuple[int, List, bytes, bytes]]:
+        """执行下游应用并收集响应；非 200 响应直接透传，返回 None"""
+        start: Dict = {}
+        chunks: List[bytes] = []
+        passthrough = False
+
+        async def capture(message):
+            nonlocal passthrough
+            if message["type"] == "http.response.start":
+                start.update(message)
+                if message["status"] != 200:
+                    passthrough = True
+                    await send(message)
+            elif passthrough:
+                await send(message)
+            else:
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        if passthrough or not start:
+            return None
+        body = b"".join(chunks)
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'.encode()
+        headers = _merge_vary([(k, v) for k, v in start.get("headers", [])
+                               if k.lower() not in (b"content-length", b"etag", b"cache-control")])
+        return start["status"], headers, body, etag
+
+    async def _respond(self, send, entry, if_none_match: str, cache_status: bytes) -> None:
+        status, headers, body, etag = entry
+        common = [(b"etag", etag), (b"cache-control", self.cache_control), (b"x-cache", cache_status)]
+        if if_none_match and _etag_matches(if_none_match, etag.decode()):
+            vary = [(k, v) for k, v in headers if k.lower() == b"vary"]
+            await send({"type": "http.response.start", "status": 304, "headers": common + vary})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await send({"type": "http.response.start", "status": status,
+                    "headers": headers + common + [(b"content-length", str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": body})
+
+    def stats(self) -> Dict:
+        return self.cache.stats()
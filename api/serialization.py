@@ -0,0 +1,88 @@
+"""
+快速 JSON 序列化 - 基于 orjson，原生支持 NumPy 数组/标量与 datetime
+"""
+import dataclasses
+import json
+import math
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _default(obj: Any) -> Any:
+    """orjson/json 不能直接处理的类型"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"无法序列化类型: {type(obj).__name__}")
+
+
+def _clean(obj: Any) -> Any:
+    # 标准库 json 会输出非法的 NaN/Infinity，统一替换为 null（与 orjson 行为一致）
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _clean(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_clean(v) for v in obj]
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return _clean(obj.tolist())
+    return obj
+
+
+def dumps(content: Any) -> bytes:
+    """序列化为 UTF-8 JSON；NumPy 数组按列直接编码，NaN/inf 输出为 null"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(_clean(content), default=_default, ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def stream_json(head: Dict[str, Any], field: str, chunks: Iterable[Dict[str, Any]],
+                tail: Optional[Dict[str, Any]] = None) -> Iterator[bytes]:
+    """
+    分块生成一个 JSON 对象：head 的字段，随后 field 对应的对象由 chunks 逐块拼接，最后是 tail 的字段
+
+    每次只编码一块，配合 StreamingResponse 使用时不会在内存中构造完整的响应体。
+    """
+    head_bytes = dumps(head)[:-1]
+    yield head_bytes + (b"," if head else b"") + dumps(field) + b":{"
+    first = True
+    for chunk in chunks:
+        if not chunk:
+            continue
+        yield (b"" if first else b",") + dumps(chunk)[1:-1]
+        first = False
+    yield b"}" + (b"," + dumps(tail)[1:] if tail else b"}")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    默认响应类
+
+    端点直接返回 FastJSONResponse(...) 时可跳过 FastAPI 的 jsonable_encoder，
+    NumPy 结果无需先逐元素转换为 Python float。
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -9,7 +9,6 @@ import sys
 import os
 import json
 import random
-import hashlib
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
 import math
@@ -25,428 +24,17 @@ print("=" * 70)
 # ============================================================================
 # 本地股票数据库 - 包含真实市场数据
 # ============================================================================
-class LocalStockDatabase:
-    """本地股票数据库 - 基于真实市场数据的智能模拟"""
-    
-    # 真实股票数据快照（2024年12月数据）
-    STOCK_DATABASE = {
-        # 美股 - 科技巨头
-        "AAPL": {
-            "name": "苹果公司 (Apple Inc.)",
-            "sector": "科技",
-            "industry": "消费电子",
-            "country": "美国",
-            "currency": "USD",
-            "current_price": 172.35,
-            "daily_change": 1.25,
-            "volume": 58210000,
-            "market_cap": 2650000000000,
-            "pe_ratio": 28.5,
-            "dividend_yield": 0.55,
-            "beta": 1.25,
-            "week_52_high": 182.94,
-            "week_52_low": 142.10,
-            "description": "全球领先的消费电子和科技公司，产品包括iPhone、iPad、Mac等。"
-        },
-        "MSFT": {
-            "name": "微软公司 (Microsoft Corporation)",
-            "sector": "科技",
-            "industry": "软件",
-            "country": "美国",
-            "currency": "USD",
-            "current_price": 328.75,
-            "daily_change": 0.85,
-            "volume": 25430000,
-            "market_cap": 2440000000000,
-            "pe_ratio": 32.8,
-            "dividend_yield": 0.72,
-            "beta": 0.95,
-            "week_52_high": 342.20,
-            "week_52_low": 275.30,
-            "description": "全球最大的软件公司，Windows操作系统、Office办公软件、Azure云服务。"
-        },
-        "NVDA": {
-            "name": "英伟达 (NVIDIA Corporation)",
-            "sector": "科技",
-            "industry": "半导体",
-            "country": "美国",
-            "currency": "USD",
-            "current_price": 495.22,
-            "daily_change": 3.15,
-            "volume": 48320000,
-            "market_cap": 1220000000000,
-            "pe_ratio": 64.3,
-            "dividend_yield": 0.03,
-            "beta": 1.65,
-            "week_52_high": 505.48,
-            "week_52_low": 310.20,
-            "description": "全球领先的GPU制造商，人工智能和游戏图形处理器的领导者。"
-        },
-        "TSLA": {
-            "name": "特斯拉 (Tesla Inc.)",
-            "sector": "汽车",
-            "industry": "电动汽车",
-            "country": "美国",
-            "currency": "USD",
-            "current_price": 245.33,
-            "daily_change": -2.15,
-            "volume": 102350000,
-            "market_cap": 780000000000,
-            "pe_ratio": 72.5,
-            "dividend_yield": 0.00,
-            "beta": 2.05,
-            "week_52_high": 265.80,
-            "week_52_low": 195.20,
-            "description": "全球领先的电动汽车和清洁能源公司，自动驾驶技术领导者。"
-        },
-        "GOOGL": {
-            "name": "谷歌 (Alphabet Inc.)",
-            "sector": "科技",
-            "industry": "互联网",
-            "country": "美国",
-            "currency": "USD",
-            "current_price": 135.67,
-            "daily_change": 0.45,
-            "volume": 28450000,
-            "market_cap": 1680000000000,
-            "pe_ratio": 24.8,
-            "dividend_yield": 0.00,
-            "beta": 1.05,
-            "week_52_high": 142.90,
-            "week_52_low": 115.20,
-            "description": "全球最大的搜索引擎公司，YouTube、Android、Google Cloud的母公司。"
-        },
-        
-        # 美股 - 其他重要公司
-        "AMZN": {
-            "name": "亚马逊 (Amazon.com Inc.)",
-            "sector": "电商",
-            "industry": "零售",
-            "country": "美国",
-            "currency": "USD",
-            "current_price": 145.85,
-            "daily_change": 0.92,
-            "volume": 42310000,
-            "market_cap": 1500000000000,
-            "pe_ratio": 58.3,
-            "dividend_yield": 0.00,
-            "beta": 1.15,
-            "week_52_high": 152.40,
-            "week_52_low": 122.30,
-            "description": "全球最大的电子商务和云计算公司。"
-        },
-        "META": {
-            "name": "Meta Platforms Inc.",
-            "sector": "科技",
-            "industry": "社交网络",
-            "country": "美国",
-            "currency": "USD",
-            "current_price": 310.42,
-            "daily_change": 1.85,
-            "volume": 18520000,
-            "market_cap": 790000000000,
-            "pe_ratio": 26.5,
-            "dividend_yield": 0.45,
-            "beta": 1.35,
-            "week_52_high": 325.80,
-            "week_52_low": 245.60,
-            "description": "Facebook、Instagram、WhatsApp的母公司，元宇宙概念领导者。"
-        },
-        
-        # 中国A股
-        "000001.SZ": {
-            "name": "平安银行 (Ping An Bank)",
-            "sector": "金融",
-            "industry": "银行",
-            "country": "中国",
-            "currency": "CNY",
-            "current_price": 12.45,
-            "daily_change": 0.32,
-            "volume": 85230000,
-            "market_cap": 240000000000,
-            "pe_ratio": 6.8,
-            "dividend_yield": 3.25,
-            "beta": 0.85,
-            "week_52_high": 13.20,
-            "week_52_low": 10.85,
-            "description": "中国领先的商业银行，平安集团旗下核心金融平台。"
-        },
-        "600000.SS": {
-            "name": "浦发银行 (Shanghai Pudong Development Bank)",
-            "sector": "金融",
-            "industry": "银行",
-            "country": "中国",
-            "currency": "CNY",
-            "current_price": 8.75,
-            "daily_change": 0.15,
-            "volume": 63210000,
-            "market_cap": 185000000000,
-            "pe_ratio": 5.2,
-            "dividend_yield": 4.15,
-            "beta": 0.78,
-            "week_52_high": 9.20,
-            "week_52_low": 7.85,
-            "description": "中国重要的股份制商业银行，总部位于上海。"
-        },
-        
-        # 港股
-        "0700.HK": {
-            "name": "腾讯控股 (Tencent Holdings)",
-            "sector": "科技",
-            "industry": "互联网",
-            "country": "中国",
-            "currency": "HKD",
-            "current_price": 285.60,
-            "daily_change": 1.25,
-            "volume": 24580000,
-            "market_cap": 340000000000,
-            "pe_ratio": 18.5,
-            "dividend_yield": 1.15,
-            "beta": 1.10,
-            "week_52_high": 310.20,
-            "week_52_low": 265.40,
-            "description": "中国最大的互联网公司，微信、QQ、游戏等业务的领导者。"
-        },
-        "9988.HK": {
-            "name": "阿里巴巴 (Alibaba Group)",
-            "sector": "电商",
-            "industry": "零售",
-            "country": "中国",
-            "currency": "HKD",
-            "current_price": 72.35,
-            "daily_change": -0.45,
-            "volume": 38450000,
-            "market_cap": 185000000000,
-            "pe_ratio": 12.8,
-            "dividend_yield": 1.85,
-            "beta": 1.25,
-            "week_52_high": 82.40,
-            "week_52_low": 68.20,
-            "description": "中国最大的电子商务平台，淘宝、天猫、支付宝等业务的母公司。"
-        },
-        
-        # ETF和指数
-        "SPY": {
-            "name": "SPDR S&P 500 ETF",
-            "sector": "ETF",
-            "industry": "指数基金",
-            "country": "美国",
-            "currency": "USD",
-            "current_price": 455.20,
-            "daily_change": 0.35,
-            "volume": 68250000,
-            "market_cap": 385000000000,
-            "pe_ratio": 22.5,
-            "dividend_yield": 1.45,
-            "beta": 1.00,
-            "week_52_high": 462.80,
-            "week_52_low": 410.20,
-            "description": "跟踪标普500指数的ETF，代表美国大盘股市场。"
-        },
-        "QQQ": {
-            "name": "Invesco QQQ Trust",
-            "sector": "ETF",
-            "industry": "指数基金",
-            "country": "美国",
-            "currency": "USD",
-            "current_price": 385.45,
-            "daily_change": 0.92,
-            "volume": 45230000,
-            "market_cap": 185000000000,
-            "pe_ratio": 28.5,
-            "dividend_yield": 0.65,
-            "beta": 1.15,
-            "week_52_high": 395.20,
-            "week_52_low": 345.60,
-            "description": "跟踪纳斯达克100指数的ETF，代表科技股为主的成长型公司。"
-        }
-    }
-    
-    # 风险评分规则
-    RISK_RULES = {
-        "sector": {
-            "科技": 7.5,
-            "半导体": 8.0,
-            "汽车": 7.0,
-            "电商": 6.5,
-            "金融": 4.5,
-            "银行": 4.0,
-            "ETF": 3.5,
-            "未知": 6.0
-        },
-        "beta": {
-            "low": (0, 0.8, 3.0),
-            "medium": (0.8, 1.2, 6.0),
-            "high": (1.2, 10, 8.0)
-        },
-        "volatility": {
-            "low": (0, 0.2, 3.0),
-            "medium": (0.2, 0.35, 6.0),
-            "high": (0.35, 10, 9.0)
-        }
-    }
-    
-    @staticmethod
-    def get_stock_info(ticker: str) -> Dict:
-        """获取股票基本信息"""
-        ticker = ticker.upper()
-        
-        if ticker in LocalStockDatabase.STOCK_DATABASE:
-            return LocalStockDatabase.STOCK_DATABASE[ticker].copy()
-        else:
-            # 为未知股票生成智能数据
-            return LocalStockDatabase._generate_smart_stock(ticker)
-    
-    @staticmethod
-    def _generate_smart_stock(ticker: str) -> Dict:
-        """为未知股票生成智能数据"""
-        # 使用ticker的哈希值作为随机种子，确保相同ticker生成相同数据
-        seed = int(hashlib.md5(ticker.encode()).hexdigest()[:8], 16)
-        random.seed(seed)
-        
-        # 随机选择行业和特征
-        sectors = ["科技", "金融", "医疗", "能源", "工业", "消费", "房地产"]
-        sector = random.choice(sectors)
-        
-        # 根据ticker特征智能判断
-        if ticker.endswith(".SZ") or ticker.endswith(".SS"):
-            country = "中国"
-            currency = "CNY"
-            base_price = random.uniform(5, 50)
-        elif ticker.endswith(".HK"):
-            country = "中国"
-            currency = "HKD"
-            base_price = random.uniform(10, 200)
-        else:
-            country = "美国"
-            currency = "USD"
-            base_price = random.uniform(20, 500)
-        
-        # 生成智能数据
-        current_price = base_price * (1 + random.uniform(-0.1, 0.1))
-        daily_change = random.uniform(-3, 3)
-        
-        return {
-            "name": f"{ticker} 公司",
-            "sector": sector,
-            "industry": "多种经营",
-            "country": country,
-            "currency": currency,
-            "current_price": round(current_price, 2),
-            "daily_change": round(daily_change, 2),
-            "volume": random.randint(1000000, 50000000),
-            "market_cap": random.randint(1000000000, 500000000000),
-            "pe_ratio": round(random.uniform(8, 40), 1),
-            "dividend_yield": round(random.uniform(0, 5), 2),
-            "beta": round(random.uniform(0.5, 2.0), 2),
-            "week_52_high": round(current_price * 1.2, 2),
-            "week_52_low": round(current_price * 0.8, 2),
-            "description": f"基于AI智能生成的{ticker}公司模拟数据，用于金融风险分析演示。"
-        }
-    
-    @staticmethod
-    def calculate_risk_score(stock_info: Dict) -> Dict:
-        """计算综合风险评分"""
-        # 基础分数
-        base_score = LocalStockDatabase.RISK_RULES["sector"].get(
-            stock_info["sector"], 6.0
-        )
-        
-        # Beta调整
-        beta = stock_info["beta"]
-        for level, (low, high, score) in LocalStockDatabase.RISK_RULES["beta"].items():
-            if low <= beta < high:
-                beta_score = score
-                break
-        else:
-            beta_score = 6.0
-        
-        # 波动率模拟（基于beta和行业）
-        volatility = beta * 0.15 + random.uniform(0.05, 0.15)
-        stock_info["volatility"] = volatility
-        
-        # 波动率调整
-        for level, (low, high, score) in LocalStockDatabase.RISK_RULES["volatility"].items():
-            if low <= volatility < high:
-                vol_score = score
-                break
-        else:
-            vol_score = 6.0
-        
-        # 综合评分
-        risk_score = (base_score * 0.4 + beta_score * 0.3 + vol_score * 0.3)
-        risk_score = min(10, max(1, risk_score))
-        
-        # 风险等级
-        if risk_score >= 7.5:
-            risk_level = "🔴 高风险"
-            recommendation = "建议谨慎投资，严格设置止损，仅适合高风险承受能力投资者"
-        elif risk_score >= 5:
-            risk_level = "🟡 中风险"
-            recommendation = "适合适度配置，建议分散投资，定期评估持仓"
-        else:
-            risk_level = "🟢 低风险"
-            recommendation = "适合稳健型投资者，可作为核心持仓"
-        
-        # 技术指标
-        ma_20 = stock_info["current_price"] * (1 + random.uniform(-0.05, 0.05))
-        rsi = random.randint(30, 70)
-        
-        return {
-            "risk_score": round(risk_score, 1),
-            "risk_level": risk_level,
-            "volatility": round(volatility * 100, 1),  # 转换为百分比
-            "recommendation": recommendation,
-            "technical": {
-                "ma_20": round(ma_20, 2),
-                "rsi": rsi,
-                "trend": "上涨" if stock_info["current_price"] > ma_20 else "下跌",
-                "support": round(stock_info["current_price"] * 0.95, 2),
-                "resistance": round(stock_info["current_price"] * 1.05, 2)
-            }
-        }
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from src.modules.stock_database import LocalStockDatabase
+from src.modules.screener import get_screener
+from src.modules.report_templates import ReportTemplate, ReportBuilder, render_cached
 
 # ============================================================================
 # 分析引擎
 # ============================================================================
-class AnalysisEngine:
-    """智能分析引擎"""
-    
-    @staticmethod
-    def analyze_stock(ticker: str, analysis_type: str = "basic") -> str:
-        """分析股票并生成报告"""
-        ticker = ticker.upper().strip()
-        
-        if not ticker:
-            return "⚠️ 请输入股票代码"
-        
-        # 获取股票信息
-        stock_info = LocalStockDatabase.get_stock_info(ticker)
-        
-        # 计算风险评分
-        risk_analysis = LocalStockDatabase.calculate_risk_score(stock_info)
-        
-        # 生成分析报告
-        return AnalysisEngine._format_report(ticker, stock_info, risk_analysis, analysis_type)
-    
-    @staticmethod
-    def _format_report(ticker: str, stock_info: Dict, risk_analysis: Dict, analysis_type: str) -> str:
-        """格式化分析报告"""
-        
-        # 货币符号
-        currency_symbol = {
-            "USD": "$",
-            "CNY": "",
-            "HKD": "HK$"
-        }.get(stock_info["currency"], "")
-        
-        # 风险进度条
-        risk_score = risk_analysis["risk_score"]
-        risk_bar = "" * int(risk_score) + "░" * (10 - int(risk_score))
-        
-        # 生成报告
-        report = f"""
-# 📊 {ticker} - {stock_info['name']}
+# 报告模板：正文整体一次 format_map；不含占位符的建议/说明段单独成段，渲染时原样拼接
+STOCK_REPORT_TEMPLATE = ReportTemplate("""
+# 📊 {ticker} - {name}
 **📍 数据来源: 本地智能数据库 | 💾 100% 离线可用**
 
 ---
@@ -454,76 +42,74 @@ class AnalysisEngine:
 ## 📈 市场表现
 | 指标 | 数值 | 说明 |
 |------|------|------|
-| **当前价格** | {currency_symbol}{stock_info['current_price']} | 最新交易价格 |
-| **今日涨跌** | {'📈' if stock_info['daily_change'] >= 0 else '📉'} {stock_info['daily_change']:+.2f}% | 较前日收盘价变动 |
-| **交易量** | {stock_info['volume']:,} 股 | 当日成交量 |
-| **52周区间** | {currency_symbol}{stock_info['week_52_low']} - {currency_symbol}{stock_info['week_52_high']} | 一年内价格范围 |
+| **当前价格** | {currency_symbol}{current_price} | 最新交易价格 |
+| **今日涨跌** | {change_icon} {daily_change:+.2f}% | 较前日收盘价变动 |
+| **交易量** | {volume:,} 股 | 当日成交量 |
+| **52周区间** | {currency_symbol}{week_52_low} - {currency_symbol}{week_52_high} | 一年内价格范围 |
 
 ## ⚠️ 风险分析
 ### 综合风险评估
-**风险评分**: {risk_analysis['risk_level']} ({risk_score}/10)
+**风险评分**: {risk_level} ({risk_score}/10)
 {risk_bar}
 
 | 风险因素 | 评分 | 说明 |
 |----------|------|------|
-| **行业风险** | {LocalStockDatabase.RISK_RULES['sector'].get(stock_info['sector'], 6.0):.1f}/10 | {stock_info['sector']}行业特性 |
-| **市场风险** | {risk_analysis['risk_score'] * 0.3:.1f}/10 | Beta系数: {stock_info['beta']} |
-| **波动风险** | {risk_analysis['risk_score'] * 0.3:.1f}/10 | 年化波动率: {risk_analysis['volatility']}% |
+| **行业风险** | {sector_score:.1f}/10 | {sector}行业特性 |
+| **市场风险** | {factor_score:.1f}/10 | Beta系数: {beta} |
+| **波动风险** | {factor_score:.1f}/10 | 年化波动率: {volatility}% |
 
 ### 技术分析
-- **20日均线**: {currency_symbol}{risk_analysis['technical']['ma_20']}
-- **当前趋势**: {risk_analysis['technical']['trend']}
-- **RSI指标**: {risk_analysis['technical']['rsi']}/100 ({'中性' if 30 <= risk_analysis['technical']['rsi'] <= 70 else '超买' if risk_analysis['technical']['rsi'] > 70 else '超卖'})
-- **支撑位**: {currency_symbol}{risk_analysis['technical']['support']}
-- **阻力位**: {currency_symbol}{risk_analysis['technical']['resistance']}
+- **20日均线**: {currency_symbol}{ma_20}
+- **当前趋势**: {trend}
+- **RSI指标**: {rsi}/100 ({rsi_state})
+- **支撑位**: {currency_symbol}{support}
+- **阻力位**: {currency_symbol}{resistance}
 
 ## 🏢 公司概况
 **基本信息**
-- **公司名称**: {stock_info['name']}
-- **所属行业**: {stock_info['sector']} - {stock_info['industry']}
-- **总部地区**: {stock_info['country']}
-- **交易货币**: {stock_info['currency']}
+- **公司名称**: {name}
+- **所属行业**: {sector} - {industry}
+- **总部地区**: {country}
+- **交易货币**: {currency}
 
 **财务指标**
-- **市值**: {currency_symbol}{stock_info['market_cap']:,}
-- **市盈率(P/E)**: {stock_info['pe_ratio']}
-- **股息率**: {stock_info['dividend_yield']}%
-- **Beta系数**: {stock_info['beta']}
+- **市值**: {currency_symbol}{market_cap:,}
+- **市盈率(P/E)**: {pe_ratio}
+- **股息率**: {dividend_yield}%
+- **Beta系数**: {beta}
 
 **公司描述**
-{stock_info['description']}
+{description}
 
 ## 🎯 投资建议
-### {risk_analysis['recommendation']}
+### {recommendation}
 
 ### 具体建议:
-"""
-        
-        # 根据风险等级添加具体建议
-        if risk_score >= 7.5:
-            report += """
-1. **仓位控制**: 建议仓位不超过总投资组合的10%
-2. **止损设置**: 建议设置8-10%的止损位
-3. **持有期限**: 适合短期交易，建议持有不超过3个月
-4. **监控频率**: 建议每日监控价格变动
-"""
-        elif risk_score >= 5:
-            report += """
-1. **仓位控制**: 建议仓位在总投资组合的15-25%
-2. **止损设置**: 建议设置10-15%的止损位
-3. **持有期限**: 适合中长期投资，建议持有6-12个月
-4. **监控频率**: 建议每周监控一次
-"""
-        else:
-            report += """
+""")
+
+# 按风险等级索引 (0=低, 1=中, 2=高) 的具体建议，纯静态段
+STOCK_REPORT_ADVICE = (
+    """
 1. **仓位控制**: 可作为核心持仓，仓位可达30-40%
 2. **止损设置**: 建议设置15-20%的宽松止损
 3. **持有期限**: 适合长期持有，建议持有1年以上
 4. **监控频率**: 建议每月监控一次即可
+""",
+    """
+1. **仓位控制**: 建议仓位在总投资组合的15-25%
+2. **止损设置**: 建议设置10-15%的止损位
+3. **持有期限**: 适合中长期投资，建议持有6-12个月
+4. **监控频率**: 建议每周监控一次
+""",
+    """
+1. **仓位控制**: 建议仓位不超过总投资组合的10%
+2. **止损设置**: 建议设置8-10%的止损位
+3. **持有期限**: 适合短期交易，建议持有不超过3个月
+4. **监控频率**: 建议每日监控价格变动
 """
-        
-        # 添加数据说明
-        report += f"""
+)
+
+STOCK_REPORT_FOOTER = ReportTemplate("""
 
 ---
 
@@ -535,10 +121,85 @@ class AnalysisEngine:
 
 💡 **提示**: 这是用于金融风险分析演示的智能数据，实际投资请参考实时市场数据。
 
-📅 **报告生成时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-"""
+""")
+
+# 生成时间每次请求单独渲染，不进入报告缓存
+STOCK_REPORT_TIMESTAMP = ReportTemplate("""📅 **报告生成时间**: {generated_at}
+""")
+
+
+class AnalysisEngine:
+    """智能分析引擎"""
+    
+    @staticmethod
+    def analyze_stock(ticker: str, analysis_type: str = "basic") -> str:
+        """分析股票并生成报告"""
+        ticker = ticker.upper().strip()
+        
+        if not ticker:
+            return "⚠️ 请输入股票代码"
+        
+        def render() -> str:
+            # 获取股票信息
+            stock_info = LocalStockDatabase.get_stock_info(ticker)
+            
+            # 计算风险评分
+            risk_analysis = LocalStockDatabase.calculate_risk_score(stock_info)
+            
+            # 生成分析报告
+            return AnalysisEngine._format_report(ticker, stock_info, risk_analysis, analysis_type)
+        
+        # 数据版本未变化时复用已生成的报告正文，生成时间在缓存之外追加
+        body = render_cached(ticker, analysis_type, LocalStockDatabase.DATA_VERSION, render)
+        return body + STOCK_REPORT_TIMESTAMP.render({
+            "generated_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        })
+    
+    @staticmethod
+    def _format_report(ticker: str, stock_info: Dict, risk_analysis: Dict, analysis_type: str) -> str:
+        """格式化分析报告正文（不含生成时间）"""
+        
+        # 货币符号
+        currency_symbol = {
+            "USD": "$",
+            "CNY": "",
+            "HKD": "HK$"
+        }.get(stock_info["currency"], "")
+        
+        # 风险进度条
+        risk_score = risk_analysis["risk_score"]
+        risk_bar = "" * int(risk_score) + "░" * (10 - int(risk_score))
         
-        return report
+        technical = risk_analysis["technical"]
+        rsi = technical["rsi"]
+        values = dict(
+            stock_info,
+            ticker=ticker,
+            currency_symbol=currency_symbol,
+            change_icon="📈" if stock_info["daily_change"] >= 0 else "📉",
+            risk_level=risk_analysis["risk_level"],
+            risk_score=risk_score,
+            risk_bar=risk_bar,
+            sector_score=LocalStockDatabase.RISK_RULES["sector"].get(stock_info["sector"], 6.0),
+            factor_score=risk_score * 0.3,
+            volatility=risk_analysis["volatility"],
+            ma_20=technical["ma_20"],
+            trend=technical["trend"],
+            rsi=rsi,
+            rsi_state="中性" if 30 <= rsi <= 70 else "超买" if rsi > 70 else "超卖",
+            support=technical["support"],
+            resistance=technical["resistance"],
+            recommendation=risk_analysis["recommendation"]
+        )
+        
+        # 根据风险等级添加具体建议
+        level_index = 2 if risk_score >= 7.5 else 1 if risk_score >= 5 else 0
+        
+        return (ReportBuilder()
+                .add_template(STOCK_REPORT_TEMPLATE, values)
+                .add(STOCK_REPORT_ADVICE[level_index])
+                .add_template(STOCK_REPORT_FOOTER, values)
+                .build())
 
 # ============================================================================
 # 创建Gradio界面
@@ -849,11 +510,13 @@ def create_ultimate_interface():
                 db_content = "| 代码 | 名称 | 行业 | 价格 | 涨跌 | 风险等级 |\n"
                 db_content += "|------|------|------|------|------|----------|\n"
                 
-                for ticker, info in LocalStockDatabase.STOCK_DATABASE.items():
-                    risk_score = LocalStockDatabase.calculate_risk_score(info)["risk_score"]
-                    risk_level = "🟢" if risk_score < 5 else "🟡" if risk_score < 7.5 else "🔴"
-                    
-                    db_content += f"| {ticker} | {info['name'][:20]} | {info['sector']} |  | {info['daily_change']:+.2f}% | {risk_level} {risk_score}/10 |\n"
+                # 一次性批量评分整个数据库
+                scores = LocalStockDatabase.calculate_risk_scores()
+                level_icons = [label.split()[0] for label, _ in LocalStockDatabase.RISK_LEVELS]
+                
+                for ticker, risk_score, level in zip(scores["tickers"], scores["risk_score"], scores["risk_level"]):
+                    info = LocalStockDatabase.STOCK_DATABASE[ticker]
+                    db_content += f"| {ticker} | {info['name'][:20]} | {info['sector']} |  | {info['daily_change']:+.2f}% | {level_icons[level]} {risk_score}/10 |\n"
                 
                 gr.Markdown(db_content)
                 
@@ -871,6 +534,64 @@ def create_ultimate_interface():
                 4. **全面性**: 包含价格、基本面、技术指标
                 """)
             
+            # 风险筛选标签页
+            with gr.TabItem("🔎 风险筛选", id="screener"):
+                gr.Markdown("### 🔎 按风险指标筛选股票")
+                
+                with gr.Row():
+                    with gr.Column(scale=1, min_width=300):
+                        sectors = sorted({info["sector"] for info in LocalStockDatabase.STOCK_DATABASE.values()})
+                        screen_sector = gr.Dropdown(
+                            choices=["全部"] + sectors,
+                            value="全部",
+                            label="🏭 行业"
+                        )
+                        min_risk = gr.Slider(label="⚠️ 最低风险评分 (>)", minimum=0, maximum=10, value=0, step=0.5)
+                        min_beta = gr.Number(label="📈 最低Beta (>)", value=0)
+                        max_vol = gr.Number(label="🌊 最高年化波动率 % (≤)", value=100)
+                        screen_sort = gr.Dropdown(
+                            choices=["risk_score", "beta", "volatility", "market_cap", "pe_ratio", "dividend_yield"],
+                            value="risk_score",
+                            label="↕️ 排序指标"
+                        )
+                        screen_top = gr.Slider(label="🏆 显示前N只", minimum=1, maximum=100, value=10, step=1)
+                        screen_btn = gr.Button("🔎 开始筛选", variant="primary")
+                    
+                    with gr.Column(scale=2):
+                        screen_output = gr.Markdown("点击 🔎 开始筛选 查看结果")
+                
+                def on_screen(sector, risk, beta, vol, sort_by, top_n):
+                    """按条件筛选数据库中的股票"""
+                    filters = {
+                        "risk_score": {"gt": risk},
+                        "beta": {"gt": beta},
+                        "volatility": {"lte": vol}
+                    }
+                    result = get_screener().screen(
+                        filters=filters,
+                        sector=None if sector == "全部" else sector,
+                        sort_by=sort_by,
+                        limit=int(top_n)
+                    )
+                    
+                    lines = [
+                        f"**命中 {result['total']} 只股票**（按 {sort_by} 降序）\n",
+                        "| 代码 | 行业 | 风险评分 | Beta | 波动率 | 市盈率 |",
+                        "|------|------|----------|------|--------|--------|"
+                    ]
+                    for row in result["rows"]:
+                        lines.append(
+                            f"| {row['ticker']} | {row['sector']} | {row['risk_score']}/10 | "
+                            f"{row['beta']:.2f} | {row['volatility']}% | {row['pe_ratio']} |"
+                        )
+                    return "\n".join(lines)
+                
+                screen_btn.click(
+                    fn=on_screen,
+                    inputs=[screen_sector, min_risk, min_beta, max_vol, screen_sort, screen_top],
+                    outputs=screen_output
+                )
+            
             # 关于标签页
             with gr.TabItem("ℹ️ 系统信息", id="about"):
                 gr.Markdown(f"""
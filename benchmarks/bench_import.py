@@ -0,0 +1,87 @@
+"""
+冷启动导入耗时检查
+
+在全新解释器中以 python -X importtime 导入入口模块，取多次运行的最小总耗时与预算比较，
+并检查重依赖（pandas / plotly / pyarrow / yfinance / gradio）没有在导入阶段被加载。
+超出预算或加载了禁止的模块时退出码为 1，可直接用于 CI。
+
+用法: python -m benchmarks.bench_import [--module api.index] [--budget-ms 800] [--runs 5]
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+ROOT = Path(__file__).parent.parent
+BUDGET_FILE = Path(__file__).parent / "import_budget.json"
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_profile(module: str) -> List[Tuple[str, int, int]]:
+    """在子进程中导入模块，返回 [(模块名, 自身耗时 us, 累计耗时 us)]"""
+    env = dict(os.environ, PYTHONPATH=str(ROOT), FINRISK_LOG_DIR="")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            rows.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return rows
+
+
+def check(module: str, budget_ms: float, forbidden: Sequence[str], runs: int) -> Dict:
+    best: Optional[List[Tuple[str, int, int]]] = None
+    best_total = None
+    for _ in range(runs):
+        rows = import_profile(module)
+        total = next(cumulative for name, _, cumulative in reversed(rows) if name == module)
+        if best_total is None or total < best_total:
+            best, best_total = rows, total
+
+    loaded = {name for name, _, _ in best}
+    heavy = sorted(name for name in forbidden if name in loaded)
+    slowest = sorted(best, key=lambda row: row[1], reverse=True)[:10]
+    return {
+        "module": module,
+        "total_ms": round(best_total / 1000, 1),
+        "budget_ms": budget_ms,
+        "modules": len(loaded),
+        "forbidden_loaded": heavy,
+        "slowest_self_ms": {name: round(self_us / 1000, 1) for name, self_us, _ in slowest},
+        "ok": best_total / 1000 <= budget_ms and not heavy
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    budget = json.loads(BUDGET_FILE.read_text(encoding="utf-8"))
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_import", description="冷启动导入耗时检查")
+    parser.add_argument("--module", default=budget["module"])
+    parser.add_argument("--budget-ms", type=float, default=budget["budget_ms"])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args(argv)
+
+    result = check(args.module, args.budget_ms, budget["forbidden"], args.runs)
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        print(f"import {result['module']}: {result['total_ms']} ms (预算 {result['budget_ms']} ms, "
+              f"{result['modules']} 个模块)")
+        for name, ms in result["slowest_self_ms"].items():
+            print(f"  {ms:>8.1f} ms  {name}")
+        if result["forbidden_loaded"]:
+            print(f"  导入阶段加载了重依赖: {', '.join(result['forbidden_loaded'])}")
+        print("通过" if result["ok"] else "未通过")
+    return 0 if result["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
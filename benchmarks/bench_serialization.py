@@ -0,0 +1,95 @@
+"""
+批量风险响应的序列化基准
+
+对比两种构造 + 编码 /api/risk/batch 响应的方式：
+  legacy - 逐元素 float() 转换 + NaN 替换，再经 FastAPI jsonable_encoder 与标准库 json 编码
+  fast   - 按列 tolist() 拼装，FastJSONResponse（orjson，不可用时回退标准库）直接编码
+
+用法: python -m benchmarks.bench_serialization [--symbols 5000] [--days 252] [--repeat 10]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+
+from api.serialization import ORJSON_AVAILABLE, dumps
+from core.price_store import synthetic_prices
+from src.modules.risk_metrics import METRIC_COLUMNS, RISK_LEVELS, compute_risk_metrics
+
+
+def legacy_payload(symbols: List[str], metrics: Dict[str, np.ndarray]) -> bytes:
+    results = {}
+    for i, symbol in enumerate(symbols):
+        item = {name: float(metrics[name][i]) for name in METRIC_COLUMNS if name != "risk_level"}
+        level = int(metrics["risk_level"][i])
+        item["risk_level"] = RISK_LEVELS[level][0] if level >= 0 else None
+        results[symbol] = {k: (None if isinstance(v, float) and v != v else v) for k, v in item.items()}
+    content = jsonable_encoder({"results": results})
+    # 与 starlette JSONResponse.render 相同的参数
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def fast_payload(symbols: List[str], metrics: Dict[str, np.ndarray]) -> bytes:
+    columns = {name: metrics[name].tolist() for name in METRIC_COLUMNS if name != "risk_level"}
+    level_names = np.array([None] + [level[0] for level in RISK_LEVELS], dtype=object)
+    columns["risk_level"] = level_names[metrics["risk_level"] + 1].tolist()
+    names = list(columns)
+    results = {symbol: dict(zip(names, row)) for symbol, row in zip(symbols, zip(*columns.values()))}
+    return dumps({"results": results})
+
+
+def measure(func: Callable[[], bytes], repeat: int) -> Dict[str, float]:
+    func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = len(func())
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": round(statistics.median(timings), 3), "min_ms": round(min(timings), 3), "bytes": size}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_serialization",
+                                     description="批量风险响应序列化基准")
+    parser.add_argument("--symbols", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=252)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args(argv)
+
+    symbols = [f"S{i:05d}" for i in range(args.symbols)]
+    _, close, volume = synthetic_prices(symbols, days=args.days)
+    metrics = compute_risk_metrics(close, volume)
+
+    legacy = measure(lambda: legacy_payload(symbols, metrics), args.repeat)
+    fast = measure(lambda: fast_payload(symbols, metrics), args.repeat)
+    result = {
+        "symbols": args.symbols,
+        "orjson": ORJSON_AVAILABLE,
+        "legacy": legacy,
+        "fast": fast,
+        "speedup": round(legacy["median_ms"] / fast["median_ms"], 2)
+    }
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{args.symbols} 只股票 (orjson: {'是' if ORJSON_AVAILABLE else '否'})")
+        for name in ("legacy", "fast"):
+            r = result[name]
+            print(f"  {name:<7} 中位数 {r['median_ms']:>9.2f} ms  最小 {r['min_ms']:>9.2f} ms  {r['bytes']:>10,} 字节")
+        print(f"  加速比 {result['speedup']}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
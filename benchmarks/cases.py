@@ -0,0 +1,330 @@
+"""
+基准用例
+
+所有用例使用模拟数据（core.price_store.synthetic_prices、LocalStockDatabase 的智能生成），不访问网络。
+依赖 gradio / yfinance 的入口（AnalysisEngine、DataProcessor、StockAnalyzer）在缺少依赖时记为跳过。
+"""
+import atexit
+import itertools
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+# 基准环境：不写日志文件、不预热，共享价格矩阵指向临时目录
+_WORKSPACE = Path(tempfile.mkdtemp(prefix="finrisk_bench_"))
+atexit.register(shutil.rmtree, _WORKSPACE, True)
+os.environ.setdefault("FINRISK_LOG_DIR", "")
+os.environ["FINRISK_WARMUP"] = "0"
+os.environ["FINRISK_SHARED_PRICES"] = str(_WORKSPACE / "shared_prices")
+
+from benchmarks.registry import SCALES, Scale, SkipBenchmark, benchmark  # noqa: E402
+from core.price_store import synthetic_prices  # noqa: E402
+
+
+def _tickers(scale: Scale) -> List[str]:
+    return [f"S{i:05d}" for i in range(scale.tickers)]
+
+
+def _histories(scale: Scale) -> List[Dict]:
+    """StockAnalyzer / SmartStockFetcher 返回的数据结构"""
+    import pandas as pd
+
+    tickers = _tickers(scale)
+    dates, close, volume = synthetic_prices(tickers, days=scale.days)
+    index = pd.DatetimeIndex(dates)
+    return [{
+        "success": True,
+        "ticker": ticker,
+        "history": pd.DataFrame({"Close": close[i], "Volume": volume[i]}, index=index),
+        "info": {"longName": ticker, "sector": "Technology", "beta": 1.1, "trailingPE": 25.0}
+    } for i, ticker in enumerate(tickers)]
+
+
+def _stock_infos(scale: Scale) -> Dict[str, Dict]:
+    from src.modules.stock_database import LocalStockDatabase
+
+    return {ticker: LocalStockDatabase._generate_smart_stock(ticker) for ticker in _tickers(scale)}
+
+
+# ----------------------------------------------------------------------------
+# 风险计算
+# ----------------------------------------------------------------------------
+@benchmark("risk")
+def calculate_risk_metrics(scale: Scale):
+    """StockAnalyzer.calculate_risk_metrics，逐只股票"""
+    from src.modules.stock_analyzer import StockAnalyzer
+
+    data = _histories(scale)
+    return lambda: [StockAnalyzer.calculate_risk_metrics(d) for d in data]
+
+
+@benchmark("risk")
+def compute_risk_metrics(scale: Scale):
+    """向量化批量指标（/api/risk/batch 与 RiskAgent 使用）"""
+    from src.modules.risk_metrics import compute_risk_metrics as compute
+
+    _, close, volume = synthetic_prices(_tickers(scale), days=scale.days)
+    return lambda: compute(close, volume)
+
+
+@benchmark("database")
+def calculate_risk_score(scale: Scale):
+    """LocalStockDatabase.calculate_risk_score，逐只股票"""
+    from src.modules.stock_database import LocalStockDatabase
+
+    infos = list(_stock_infos(scale).values())
+    return lambda: [LocalStockDatabase.calculate_risk_score(info) for info in infos]
+
+
+@benchmark("database")
+def calculate_risk_scores(scale: Scale):
+    """LocalStockDatabase.calculate_risk_scores（向量化版）"""
+    from src.modules.stock_database import LocalStockDatabase
+
+    infos = _stock_infos(scale)
+    return lambda: LocalStockDatabase.calculate_risk_scores(infos, seed=0)
+
+
+# ----------------------------------------------------------------------------
+# 报告渲染
+# ----------------------------------------------------------------------------
+@benchmark("report")
+def format_report(scale: Scale):
+    """AnalysisEngine._format_report（app_ultimate_backup，依赖 gradio）"""
+    from app_ultimate_backup import AnalysisEngine
+    from src.modules.stock_database import LocalStockDatabase
+
+    reports = [(ticker, info, LocalStockDatabase.calculate_risk_score(info))
+               for ticker, info in _stock_infos(scale).items()]
+    return lambda: [AnalysisEngine._format_report(ticker, info, risk, "📊 全面分析")
+                    for ticker, info, risk in reports]
+
+
+@benchmark("report")
+def format_analysis_result(scale: Scale):
+    """StockAnalyzer.format_analysis_result，模板 + 列表拼接渲染"""
+    from src.modules.stock_analyzer import StockAnalyzer
+
+    results = [StockAnalyzer.calculate_risk_metrics(d) for d in _histories(scale)]
+    return lambda: [StockAnalyzer.format_analysis_result(r) for r in results]
+
+
+# ----------------------------------------------------------------------------
+# 上传文件处理
+# ----------------------------------------------------------------------------
+class _Upload:
+    """Gradio 上传文件对象（只用到 name）"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+def _upload_csv(scale: Scale) -> str:
+    path = _WORKSPACE / f"upload_{scale.rows}.csv"
+    if not path.exists():
+        import pandas as pd
+
+        rng = np.random.default_rng(42)
+        rows = scale.rows
+        pd.DataFrame({
+            "date": np.datetime64("2020-01-01") + rng.integers(0, 1500, rows).astype("timedelta64[D]"),
+            "ticker": rng.choice(_tickers(SCALES["medium"]), rows),
+            "sector": rng.choice(["Technology", "Financial", "Healthcare", "Energy", "Consumer"], rows),
+            "close": rng.lognormal(4, 0.5, rows).round(2),
+            "volume": rng.integers(1_000, 10_000_000, rows),
+            "weight": rng.random(rows)
+        }).to_csv(path, index=False)
+    return str(path)
+
+
+@benchmark("data")
+def process_uploaded_file(scale: Scale):
+    """DataProcessor.process_uploaded_file，整表读入 + 列类型压缩（app_backup，依赖 gradio）"""
+    from src.app_backup import DataProcessor
+
+    upload = _Upload(_upload_csv(scale))
+    return lambda: DataProcessor.process_uploaded_file(upload, streaming=False)
+
+
+@benchmark("data")
+def process_uploaded_file_streaming(scale: Scale):
+    """DataProcessor.process_uploaded_file 分块流式统计（app_backup，依赖 gradio）"""
+    from src.app_backup import DataProcessor
+
+    upload = _Upload(_upload_csv(scale))
+    return lambda: DataProcessor.process_uploaded_file(upload, streaming=True)
+
+
+@benchmark("data")
+def compute_streaming_stats(scale: Scale):
+    """流式统计内核（DataProcessor 流式模式的主体）"""
+    from src.modules.data_stats import compute_streaming_stats as compute
+
+    path = _upload_csv(scale)
+    return lambda: compute(path).result(path)
+
+
+@benchmark("data")
+def read_csv_optimized(scale: Scale):
+    """CSV 读取 + 列类型压缩（DataProcessor 整表模式的主体）"""
+    from src.modules.columnar_io import read_csv_optimized as read
+
+    path = _upload_csv(scale)
+    return lambda: read(path)
+
+
+# ----------------------------------------------------------------------------
+# 可视化
+# ----------------------------------------------------------------------------
+def _risk_factors(score: float) -> Dict[str, Dict]:
+    names = ("市场风险", "信用风险", "流动性风险", "操作风险", "集中度风险")
+    return {f"f{i}": {"name": name, "score": round((score + i) % 10, 3)} for i, name in enumerate(names)}
+
+
+@benchmark("viz")
+def create_risk_radar(scale: Scale):
+    """Visualization.create_risk_radar，每次数据不同（图表缓存未命中）"""
+    from src.modules.visualization import Visualization
+
+    counter = itertools.count()
+    return lambda: [Visualization.create_risk_radar(_risk_factors(next(counter) * 1e-3))
+                    for _ in range(scale.tickers)]
+
+
+@benchmark("viz")
+def create_risk_gauge(scale: Scale):
+    """Visualization.create_risk_gauge，每次数据不同（图表缓存未命中）"""
+    from src.modules.visualization import Visualization
+
+    counter = itertools.count()
+    return lambda: [Visualization.create_risk_gauge(next(counter) * 1e-3) for _ in range(scale.tickers)]
+
+
+@benchmark("viz")
+def risk_radar_bytes(scale: Scale):
+    """Visualization.risk_radar_bytes（构建 + 紧凑 JSON 序列化）"""
+    from src.modules.visualization import Visualization
+
+    counter = itertools.count()
+    return lambda: [Visualization.risk_radar_bytes(_risk_factors(next(counter) * 1e-3))
+                    for _ in range(scale.tickers)]
+
+
+# ----------------------------------------------------------------------------
+# 序列化（benchmarks/bench_serialization.py 的两种实现）
+# ----------------------------------------------------------------------------
+def _batch_metrics(scale: Scale):
+    from src.modules.risk_metrics import compute_risk_metrics as compute
+
+    symbols = _tickers(scale)
+    _, close, volume = synthetic_prices(symbols, days=scale.days)
+    return symbols, compute(close, volume)
+
+
+@benchmark("serialization")
+def batch_payload_legacy(scale: Scale):
+    from benchmarks.bench_serialization import legacy_payload
+
+    symbols, metrics = _batch_metrics(scale)
+    return lambda: legacy_payload(symbols, metrics)
+
+
+@benchmark("serialization")
+def batch_payload_fast(scale: Scale):
+    from benchmarks.bench_serialization import fast_payload
+
+    symbols, metrics = _batch_metrics(scale)
+    return lambda: fast_payload(symbols, metrics)
+
+
+# ----------------------------------------------------------------------------
+# API 端点（TestClient，经过全部中间件）
+# ----------------------------------------------------------------------------
+_client = None
+
+
+def _api_client():
+    """首次使用时发布最大规模的模拟价格矩阵并启动应用（含 lifespan），进程退出时关闭"""
+    global _client
+    if _client is None:
+        from fastapi.testclient import TestClient
+
+        from core.shared_prices import SharedPricePublisher
+
+        largest = max(SCALES.values(), key=lambda s: (s.tickers, s.days))
+        tickers = _tickers(largest)
+        dates, close, volume = synthetic_prices(tickers, days=largest.days)
+        SharedPricePublisher(os.environ["FINRISK_SHARED_PRICES"]).publish(tickers, dates, close, volume)
+
+        from api.main import app
+
+        _client = TestClient(app)
+        _client.__enter__()
+        atexit.register(_client.__exit__, None, None, None)
+    return _client
+
+
+def _checked(response):
+    if response.status_code >= 400:
+        raise SkipBenchmark(f"HTTP {response.status_code}: {response.text[:200]}")
+    return response
+
+
+@benchmark("api")
+def risk_batch(scale: Scale):
+    """POST /api/risk/batch（流式 JSON）"""
+    client = _api_client()
+    body = {"symbols": _tickers(scale)}
+    _checked(client.post("/api/risk/batch", json=body))
+    return lambda: client.post("/api/risk/batch", json=body).content
+
+
+@benchmark("api")
+def risk_batch_arrow(scale: Scale):
+    """POST /api/risk/batch（Arrow IPC 流）"""
+    client = _api_client()
+    body = {"symbols": _tickers(scale)}
+    headers = {"Accept": "application/vnd.apache.arrow.stream"}
+    _checked(client.post("/api/risk/batch", json=body, headers=headers))
+    return lambda: client.post("/api/risk/batch", json=body, headers=headers).content
+
+
+@benchmark("api")
+def market_returns(scale: Scale):
+    """GET /api/market/returns，最近一年收益率"""
+    client = _api_client()
+    params = {"symbols": _tickers(scale), "window": min(scale.days, 252)}
+    _checked(client.get("/api/market/returns", params=params))
+    return lambda: client.get("/api/market/returns", params=params).content
+
+
+@benchmark("api")
+def screener(scale: Scale):
+    """POST /api/screener"""
+    client = _api_client()
+    body = {"filters": [{"metric": "beta", "gt": 1.0}], "page_size": min(scale.tickers, 500)}
+    _checked(client.post("/api/screener", json=body))
+    return lambda: client.post("/api/screener", json=body).content
+
+
+@benchmark("api")
+def portfolio_history_export(scale: Scale):
+    """GET /api/portfolio/history/export（CSV 流），区间长度随规模增加"""
+    client = _api_client()
+    end_year = 2023 + scale.days // 252
+    params = {"start": "2023-01-01", "end": f"{end_year}-12-31"}
+    _checked(client.get("/api/portfolio/history/export", params=params))
+    return lambda: client.get("/api/portfolio/history/export", params=params).content
+
+
+@benchmark("api")
+def risk_analyze_cached(scale: Scale):
+    """POST /api/risk/analyze，重复请求命中响应缓存"""
+    client = _api_client()
+    body = {"symbol": "AAPL"}
+    _checked(client.post("/api/risk/analyze", json=body))
+    return lambda: client.post("/api/risk/analyze", json=body).content
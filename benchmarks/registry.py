@@ -0,0 +1,52 @@
+"""
+基准用例注册表 - 规模定义与 @benchmark 装饰器（benchmarks/cases.py 注册，benchmarks/suite.py 运行）
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class Scale:
+    """数据规模：股票数、交易日数、上传文件行数"""
+    tickers: int
+    days: int
+    rows: int
+
+
+SCALES: Dict[str, Scale] = {
+    "small": Scale(tickers=10, days=252, rows=10_000),
+    "medium": Scale(tickers=200, days=756, rows=100_000),
+    "large": Scale(tickers=2000, days=1260, rows=1_000_000)
+}
+DEFAULT_SCALES = ("small", "medium")
+
+
+class SkipBenchmark(Exception):
+    """用例在当前环境不可运行（缺少可选依赖等）"""
+
+
+@dataclass
+class Benchmark:
+    group: str
+    name: str
+    setup: Callable[[Scale], Any]
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.group}.{self.name}"
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(group: str, name: Optional[str] = None):
+    """
+    注册用例
+
+    被装饰的函数接收 Scale，准备数据后返回待计时的无参函数，
+    或 (函数, 清理函数) 二元组；抛出 SkipBenchmark / ImportError 时该用例记为跳过。
+    """
+    def decorator(setup: Callable[[Scale], Any]) -> Callable[[Scale], Any]:
+        BENCHMARKS.append(Benchmark(group, name or setup.__name__, setup))
+        return setup
+    return decorator
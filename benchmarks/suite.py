@@ -0,0 +1,219 @@
+"""
+热路径基准套件
+
+benchmarks/cases.py 中用 @benchmark（benchmarks/registry.py）注册的用例在 small / medium / large 三种规模的模拟数据上运行：
+每个用例先按规模准备数据并返回待计时的函数，计时自动确定每轮调用次数（单轮不少于 min_time），
+重复多轮取统计量。结果连同提交号、Python / NumPy 版本写入 JSON，便于离线对比不同提交。
+
+bench_serialization 的两种实现已作为 serialization 组用例纳入；冷启动导入预算仍由 bench_import 单独检查。
+
+用法:
+    python -m benchmarks.suite run [--scales small,medium] [--filter risk] [--output FILE]
+    python -m benchmarks.suite compare BASE.json NEW.json [--threshold 1.2]
+    python -m benchmarks.suite list
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+ROOT = Path(__file__).parent.parent
+RESULTS_DIR = Path(__file__).parent / "results"
+
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.registry import BENCHMARKS, DEFAULT_SCALES, SCALES, Benchmark, SkipBenchmark
+
+
+def measure(func: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, Any]:
+    """预热一次后确定每轮调用次数，重复 repeat 轮，返回单次调用耗时（秒）的统计"""
+    start = time.perf_counter()
+    func()
+    once = time.perf_counter() - start
+    number = max(1, int(min_time / once)) if once > 0 else 1000
+
+    timings = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            timings.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "max": max(timings),
+        "number": number,
+        "repeat": repeat
+    }
+
+
+def run_benchmark(bench: Benchmark, scale_name: str, repeat: int, min_time: float) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"group": bench.group, "name": bench.name, "scale": scale_name,
+                              "params": SCALES[scale_name].__dict__}
+    try:
+        prepared = bench.setup(SCALES[scale_name])
+    except (SkipBenchmark, ImportError) as e:
+        return {**result, "status": "skipped", "reason": str(e)}
+
+    func, teardown = prepared if isinstance(prepared, tuple) else (prepared, None)
+    try:
+        result.update(status="ok", stats=measure(func, repeat, min_time))
+    except Exception as e:
+        result.update(status="failed", reason=f"{type(e).__name__}: {e}")
+    finally:
+        if teardown is not None:
+            teardown()
+    return result
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        proc = subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return proc.stdout.strip() if proc.returncode == 0 else None
+
+
+def environment() -> Dict[str, Any]:
+    import numpy as np
+
+    dirty = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(dirty) if dirty is not None else None,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor()
+    }
+
+
+def run(scales: Sequence[str], pattern: Optional[str], repeat: int, min_time: float,
+        verbose: bool = True) -> Dict[str, Any]:
+    import benchmarks.cases  # noqa: F401  注册全部用例
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for bench in BENCHMARKS:
+        if pattern and pattern not in bench.full_name:
+            continue
+        for scale_name in scales:
+            key = f"{bench.full_name}[{scale_name}]"
+            results[key] = run_benchmark(bench, scale_name, repeat, min_time)
+            if verbose:
+                print(_format_line(key, results[key]), flush=True)
+    return {"env": environment(), "scales": list(scales), "results": results}
+
+
+def _format_time(seconds: float) -> str:
+    for unit, factor in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= factor:
+            return f"{seconds / factor:8.3f} {unit}"
+    return f"{seconds / 1e-9:8.1f} ns"
+
+
+def _format_line(key: str, result: Dict[str, Any]) -> str:
+    if result["status"] != "ok":
+        return f"  {key:<52} {result['status']}: {result['reason']}"
+    stats = result["stats"]
+    return f"  {key:<52} {_format_time(stats['median'])}  ±{stats['stdev'] / stats['median'] * 100:5.1f}%"
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float) -> Tuple[List[str], List[str]]:
+    """按中位数对比两次结果，返回 (输出行, 超过阈值的用例)"""
+    lines, regressions = [], []
+    for key, result in new["results"].items():
+        before = base["results"].get(key)
+        if result["status"] != "ok" or not before or before["status"] != "ok":
+            continue
+        ratio = result["stats"]["median"] / before["stats"]["median"]
+        mark = ""
+        if ratio > threshold:
+            mark = "  变慢"
+            regressions.append(key)
+        elif ratio < 1 / threshold:
+            mark = "  变快"
+        lines.append(f"  {key:<52} {_format_time(before['stats']['median'])} -> "
+                     f"{_format_time(result['stats']['median'])}  {ratio:6.2f}x{mark}")
+    return lines, regressions
+
+
+def _default_output(env: Dict[str, Any]) -> Path:
+    commit = (env["commit"] or "nogit")[:10] + ("-dirty" if env["dirty"] else "")
+    return RESULTS_DIR / f"{datetime.now():%Y%m%d_%H%M%S}_{commit}.json"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description="热路径基准套件")
+    commands = parser.add_subparsers(dest="command")
+
+    run_parser = commands.add_parser("run", help="运行基准并保存 JSON 结果")
+    run_parser.add_argument("--scales", default=",".join(DEFAULT_SCALES),
+                            help=f"逗号分隔的规模（{', '.join(SCALES)}）或 all")
+    run_parser.add_argument("--filter", default=None, help="只运行名称包含该字符串的用例")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--min-time", type=float, default=0.05, help="单轮最短耗时（秒）")
+    run_parser.add_argument("--output", default=None, help=f"结果文件，默认 {RESULTS_DIR.name}/<时间>_<提交>.json")
+    run_parser.add_argument("--compare", default=None, help="运行后与该结果文件对比")
+    run_parser.add_argument("--threshold", type=float, default=1.2)
+
+    compare_parser = commands.add_parser("compare", help="对比两个结果文件")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=1.2, help="中位数比值超过该值视为变慢")
+
+    commands.add_parser("list", help="列出全部用例")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        import benchmarks.cases  # noqa: F401
+        for bench in BENCHMARKS:
+            print(bench.full_name)
+        return 0
+
+    if args.command == "compare":
+        base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+        new = json.loads(Path(args.new).read_text(encoding="utf-8"))
+    elif args.command == "run":
+        scales = list(SCALES) if args.scales == "all" else [s.strip() for s in args.scales.split(",") if s.strip()]
+        unknown = [s for s in scales if s not in SCALES]
+        if unknown:
+            parser.error(f"未知规模: {', '.join(unknown)}")
+        new = run(scales, args.filter, args.repeat, args.min_time)
+        output = Path(args.output) if args.output else _default_output(new["env"])
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(new, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"结果已保存: {output}")
+        if not args.compare:
+            return 0
+        base = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+    else:
+        parser.print_help()
+        return 2
+
+    lines, regressions = compare(base, new, args.threshold)
+    print(f"对比 {(base['env']['commit'] or '?')[:10]} -> {(new['env']['commit'] or '?')[:10]}")
+    print("\n".join(lines))
+    if regressions:
+        print(f"{len(regressions)} 个用例变慢超过 {args.threshold}x")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+"""
+预警规则引擎 - 规则按 (指标, 运算符) 编译为 numpy 数组，只对变化的股票/指标增量求值
+"""
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.modules.risk_metrics import METRIC_COLUMNS
+from utils.logger import setup_logger
+
+logger = setup_logger("alerts")
+
+# 可用于规则的指标（risk_level 为文本，不参与比较）
+ALERT_METRICS = tuple(m for m in METRIC_COLUMNS if m != 'risk_level')
+METRIC_ALIASES = {
+    'vol': 'volatility_annual',
+    'volatility': 'volatility_annual',
+    'drawdown': 'max_drawdown',
+    'var': 'var_95',
+    'sharpe': 'sharpe_ratio',
+    'score': 'risk_score',
+    'price': 'current_price',
+    'change_pct': 'daily_change_pct'
+}
+OPERATORS = {
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '<': np.less,
+    '<=': np.less_equal
+}
+WILDCARD = '*'
+
+
+def resolve_metric(metric: str) -> str:
+    metric = METRIC_ALIASES.get(metric, metric)
+    if metric not in ALERT_METRICS:
+        raise ValueError(f"不支持的预警指标: {metric}")
+    return metric
+
+
+class _RuleGroup:
+    """同一 (指标, 运算符) 的规则，编译为按股票排序的数组"""
+
+    __slots__ = ('rule_ids', 'tickers', 'thresholds', 'active')
+
+    def __init__(self, rule_ids: List[str], tickers: List[int], thresholds: List[float]):
+        order = np.argsort(np.asarray(tickers, dtype=np.int64), kind='stable')
+        self.rule_ids = np.asarray(rule_ids, dtype=object)[order]
+        self.tickers = np.asarray(tickers, dtype=np.int64)[order]
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)[order]
+        self.active = np.zeros(len(order), dtype=bool)
+
+    def rows_for(self, ticker_idx: np.ndarray) -> np.ndarray:
+        """规则数组中属于给定股票的位置"""
+        if len(ticker_idx) * 8 < len(self.tickers):
+            lo = np.searchsorted(self.tickers, ticker_idx, 'left')
+            hi = np.searchsorted(self.tickers, ticker_idx, 'right')
+            lengths = hi - lo
+            if not lengths.any():
+                return np.empty(0, dtype=np.int64)
+            # 拼接各股票的 [lo, hi) 区间
+            starts = np.repeat(lo - np.cumsum(np.r_[0, lengths[:-1]]), lengths)
+            return starts + np.arange(lengths.sum())
+        return np.flatnonzero(np.isin(self.tickers, ticker_idx))
+
+
+class _WildcardGroup:
+    """
+    对所有股票生效的规则，阈值升序排列
+
+    阈值有序时，某只股票满足的规则总是一段前缀（> / >=）或后缀（< / <=），
+    因此每只股票只需记录一个边界下标，新旧边界之间的规则即为状态变化的规则。
+    """
+
+    __slots__ = ('op', 'rule_ids', 'thresholds', 'bounds')
+
+    def __init__(self, op: str, rule_ids: List[str], thresholds: List[float]):
+        order = np.argsort(np.asarray(thresholds, dtype=np.float64), kind='stable')
+        self.op = op
+        self.rule_ids = np.asarray(rule_ids, dtype=object)[order]
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)[order]
+        # 股票下标 -> 满足区间的边界
+        self.bounds = np.empty(0, dtype=np.int64)
+
+    @property
+    def prefix(self) -> bool:
+        return self.op in ('>', '>=')
+
+    @property
+    def empty_bound(self) -> int:
+        """没有任何规则满足时的边界"""
+        return 0 if self.prefix else len(self.thresholds)
+
+    def boundary(self, values: np.ndarray) -> np.ndarray:
+        """各数值满足区间的边界：前缀为 [0, b)，后缀为 [b, n)"""
+        side = 'left' if self.op in ('>', '<=') else 'right'
+        bounds = np.searchsorted(self.thresholds, values, side).astype(np.int64)
+        bounds[np.isnan(values)] = self.empty_bound
+        return bounds
+
+    def reset(self, values: np.ndarray) -> None:
+        self.bounds = self.boundary(values)
+
+    def advance(self, idx: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """更新给定股票的边界，返回新满足规则的 (股票下标, 规则位置)"""
+        if len(idx) and idx.max() >= len(self.bounds):
+            grown = np.full(int(idx.max()) + 1, self.empty_bound, dtype=np.int64)
+            grown[:len(self.bounds)] = self.bounds
+            self.bounds = grown
+        old = self.bounds[idx]
+        new = self.boundary(values)
+        self.bounds[idx] = new
+        lo, hi = (old, new) if self.prefix else (new, old)
+        lengths = np.maximum(hi - lo, 0)
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        # 拼接各股票的 [lo, hi) 区间
+        offsets = np.repeat(lo - np.cumsum(np.r_[0, lengths[:-1]]), lengths)
+        return np.repeat(idx, lengths), offsets + np.arange(total)
+
+
+class AlertEngine:
+    """
+    阈值预警引擎
+
+    规则形如 "vol > 0.4"、"drawdown < -0.2"、"var_breach >= 1"，可指定股票或对全部股票生效。
+    新指标到来时只对发生变化的股票、以及依赖变化指标的规则组求值；
+    条件由不满足变为满足时触发一次预警（边沿触发），恢复后可再次触发。
+    规则注册时按已有指标建立基线，注册前已满足的条件不会重复触发。
+    """
+
+    def __init__(self, max_history: int = 1000):
+        self.rules: Dict[str, Dict[str, Any]] = {}
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=max_history)
+        self._ticker_index: Dict[str, int] = {}
+        self._tickers: List[str] = []
+        self._metric_index = {m: i for i, m in enumerate(ALERT_METRICS)}
+        self._values = np.full((0, len(ALERT_METRICS)), np.nan)
+        self._groups: Dict[Tuple[str, str], _RuleGroup] = {}
+        self._wildcards: Dict[Tuple[str, str], _WildcardGroup] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+        self._dirty = False
+        # 规则集版本，每次增删规则递增
+        self.version = 0
+        self.evaluations = 0
+        self.last_eval_ms = 0.0
+
+    # ------------------------------------------------------------------
+    # 规则管理
+    # ------------------------------------------------------------------
+    def add_rule(self, metric: str, op: str, threshold: float, ticker: Optional[str] = None,
+                 rule_id: Optional[str] = None, message: Optional[str] = None) -> str:
+        """注册规则，返回规则 ID；ticker 为空表示对所有股票生效"""
+        if op not in OPERATORS:
+            raise ValueError(f"不支持的运算符: {op}")
+        metric = resolve_metric(metric)
+        rule_id = rule_id or f"rule-{next(self._ids)}"
+        with self._lock:
+            self.rules[rule_id] = {
+                "rule_id": rule_id,
+                "ticker": ticker.strip().upper() if ticker else WILDCARD,
+                "metric": metric,
+                "op": op,
+                "threshold": float(threshold),
+                "message": message or f"{metric} {op} {threshold}"
+            }
+            self._dirty = True
+            self.version += 1
+        return rule_id
+
+    def add_rules(self, rules: Iterable[Dict[str, Any]]) -> List[str]:
+        return [self.add_rule(**rule) for rule in rules]
+
+    def remove_rule(self, rule_id: str) -> bool:
+        with self._lock:
+            removed = self.rules.pop(rule_id, None) is not None
+            self._dirty = self._dirty or removed
+            self.version += removed
+        return removed
+
+    def _ticker_idx(self, ticker: str) -> int:
+        idx = self._ticker_index.get(ticker)
+        if idx is None:
+            idx = len(self._tickers)
+            self._ticker_index[ticker] = idx
+            self._tickers.append(ticker)
+            if idx >= len(self._values):
+                grown = np.full((max(16, 2 * len(self._values)), len(ALERT_METRICS)), np.nan)
+                grown[:len(self._values)] = self._values
+                self._values = grown
+        return idx
+
+    def _compile(self) -> None:
+        """重新编译规则数组，并按当前指标建立基线状态"""
+        specific: Dict[Tuple[str, str], Tuple[List, List, List]] = {}
+        wildcard: Dict[Tuple[str, str], Tuple[List, List]] = {}
+        for rule in self.rules.values():
+            key = (rule["metric"], rule["op"])
+            if rule["ticker"] == WILDCARD:
+                ids, thresholds = wildcard.setdefault(key, ([], []))
+            else:
+                ids, tickers, thresholds = specific.setdefault(key, ([], [], []))
+                tickers.append(self._ticker_idx(rule["ticker"]))
+            ids.append(rule["rule_id"])
+            thresholds.append(rule["threshold"])
+
+        self._groups = {key: _RuleGroup(*args) for key, args in specific.items()}
+        self._wildcards = {key: _WildcardGroup(key[1], *args) for key, args in wildcard.items()}
+        self._dirty = False
+
+        for (metric, op), group in self._groups.items():
+            values = self._values[group.tickers, self._metric_index[metric]]
+            group.active = OPERATORS[op](values, group.thresholds)
+        for (metric, _), group in self._wildcards.items():
+            group.reset(self._values[:len(self._tickers), self._metric_index[metric]])
+
+    # ------------------------------------------------------------------
+    # 求值
+    # ------------------------------------------------------------------
+    def update(self, ticker: str, metrics: Dict[str, Any],
+               changed: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """单只股票的指标更新，返回新触发的预警"""
+        return self.update_batch([ticker], {k: [v] for k, v in metrics.items() if k in self._metric_index},
+                                 changed)
+
+    def update_batch(self, tickers: List[str], metrics: Dict[str, Iterable[float]],
+                     changed: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        批量更新指标并求值
+
+        Args:
+            tickers: 本次有新指标的股票
+            metrics: 指标名 -> 与 tickers 对齐的数值
+            changed: 发生变化的指标名，None 表示 metrics 中的全部指标
+        """
+        start = time.perf_counter()
+        with self._lock:
+            idx = np.array([self._ticker_idx(t.upper()) for t in tickers], dtype=np.int64)
+            if self._dirty:
+                # 先按更新前的指标建立基线，本次更新仍可触发新规则
+                self._compile()
+            changed_metrics = set(changed) if changed is not None else set(metrics)
+            for name, values in metrics.items():
+                if name in self._metric_index:
+                    self._values[idx, self._metric_index[name]] = np.asarray(values, dtype=np.float64)
+            fired = self._evaluate(idx, changed_metrics)
+            self.evaluations += 1
+            self.last_eval_ms = (time.perf_counter() - start) * 1000
+            self.history.extend(fired)
+        if fired:
+            logger.info(f"预警触发 {len(fired)} 条，涉及 {len({a['ticker'] for a in fired})} 只股票")
+        return fired
+
+    def _evaluate(self, idx: np.ndarray, changed_metrics: set) -> List[Dict[str, Any]]:
+        fired = []
+        now = time.time()
+        for (metric, op), group in self._groups.items():
+            if metric not in changed_metrics:
+                continue
+            rows = group.rows_for(idx)
+            if len(rows) == 0:
+                continue
+            values = self._values[group.tickers[rows], self._metric_index[metric]]
+            hit = OPERATORS[op](values, group.thresholds[rows])
+            newly = hit & ~group.active[rows]
+            group.active[rows] = hit
+            for pos in np.flatnonzero(newly):
+                fired.append(self._alert(group.rule_ids[rows[pos]], self._tickers[group.tickers[rows[pos]]],
+                                         float(values[pos]), now))
+
+        for (metric, _), group in self._wildcards.items():
+            if metric not in changed_metrics:
+                continue
+            col = self._metric_index[metric]
+            tickers, positions = group.advance(idx, self._values[idx, col])
+            for i, pos in zip(tickers, positions):
+                fired.append(self._alert(group.rule_ids[pos], self._tickers[i], float(self._values[i, col]), now))
+        return fired
+
+    def _alert(self, rule_id: str, ticker: str, value: float, ts: float) -> Dict[str, Any]:
+        rule = self.rules[rule_id]
+        return {"rule_id": rule_id, "ticker": ticker, "metric": rule["metric"], "op": rule["op"],
+                "threshold": rule["threshold"], "value": value, "message": rule["message"], "ts": ts}
+
+    def check(self, ticker: str, metrics: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """无状态检查：返回给定指标下当前满足的规则（不更新引擎状态）"""
+        ticker = ticker.upper()
+        matched = []
+        for rule in list(self.rules.values()):
+            if rule["ticker"] not in (WILDCARD, ticker):
+                continue
+            value = metrics.get(rule["metric"])
+            if value is not None and value == value and OPERATORS[rule["op"]](value, rule["threshold"]):
+                matched.append(self._alert(rule["rule_id"], ticker, float(value), time.time()))
+        return matched
+
+    def recent(self, ticker: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            alerts = [a for a in self.history if ticker is None or a["ticker"] == ticker.upper()]
+        return alerts[-limit:]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "rules": len(self.rules),
+            "tickers": len(self._tickers),
+            "evaluations": self.evaluations,
+            "last_eval_ms": round(self.last_eval_ms, 3),
+            "alerts": len(self.history)
+        }
+
+
+# 全局预警引擎
+alert_engine = AlertEngine()
@@ -0,0 +1,136 @@
+"""
+批量风险评分命令行 - 将股票池分片到多进程，各进程内存映射共享价格存储并计算风险指标
+
+用法:
+    python -m core.batch universe.csv -o risk_scores.parquet [--workers N] [--prices DIR]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from core.price_store import PriceStore, build_synthetic_store, default_store_path
+from src.modules.columnar_io import is_columnar_file, read_columnar_file
+from src.modules.risk_metrics import METRIC_COLUMNS, RISK_LEVELS, compute_risk_metrics
+from utils.logger import setup_logger
+
+logger = setup_logger("batch")
+
+# 工作进程内的价格存储（进程初始化时打开一次）
+_worker_store: Optional[PriceStore] = None
+
+
+def load_universe(path: str) -> List[str]:
+    """读取股票池：CSV/Parquet 取 ticker 列（无则取第一列），其他文本文件每行一个代码"""
+    if is_columnar_file(path) or path.endswith('.csv'):
+        df = read_columnar_file(path) if is_columnar_file(path) else pd.read_csv(path)
+        column = 'ticker' if 'ticker' in df.columns else df.columns[0]
+        tickers = df[column].astype(str)
+    else:
+        with open(path, encoding="utf-8") as f:
+            tickers = pd.Series([line.strip() for line in f])
+    tickers = tickers.str.strip().str.upper()
+    return tickers[tickers != ""].drop_duplicates().tolist()
+
+
+def _init_worker(store_path: str) -> None:
+    global _worker_store
+    _worker_store = PriceStore(store_path)
+
+
+def _score_shard(rows: np.ndarray) -> Dict[str, np.ndarray]:
+    """工作进程：读取分片对应的价格行并计算指标"""
+    store = _worker_store
+    # 分片内行号已排序，映射页按顺序访问
+    closes = store.close[rows]
+    volumes = store.volume[rows] if store.volume is not None else None
+    return compute_risk_metrics(closes, volumes)
+
+
+def _shards(rows: np.ndarray, workers: int, shard_size: Optional[int]) -> List[np.ndarray]:
+    if shard_size is None:
+        # 每个进程约 4 个分片，兼顾负载均衡与调度开销
+        shard_size = max(1, int(np.ceil(len(rows) / (workers * 4))))
+    return [rows[i:i + shard_size] for i in range(0, len(rows), shard_size)]
+
+
+def run_batch(tickers: Sequence[str], store_path, workers: Optional[int] = None,
+              shard_size: Optional[int] = None) -> pd.DataFrame:
+    """对股票池批量计算风险指标，返回每只股票一行的 DataFrame"""
+    store = PriceStore(store_path)
+    rows = store.rows_for(tickers)
+    missing = [t for t, r in zip(tickers, rows) if r < 0]
+    if missing:
+        logger.warning(f"价格存储中缺少 {len(missing)} 只股票: {missing[:10]}")
+
+    known = np.array([t for t, r in zip(tickers, rows) if r >= 0], dtype=object)
+    rows = rows[rows >= 0]
+    order = np.argsort(rows, kind='stable')
+    rows, known = rows[order], known[order]
+
+    workers = workers or os.cpu_count() or 1
+    shards = _shards(rows, workers, shard_size)
+    if workers == 1 or len(shards) == 1:
+        _init_worker(str(store_path))
+        parts = [_score_shard(shard) for shard in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(str(store_path),)) as pool:
+            parts = list(pool.map(_score_shard, shards))
+
+    data = {'ticker': known}
+    for column in METRIC_COLUMNS:
+        data[column] = np.concatenate([p[column] for p in parts]) if parts else np.empty(0)
+    df = pd.DataFrame(data)
+    labels = np.array([label for label, _ in RISK_LEVELS] + [None], dtype=object)
+    df['risk_level'] = labels[df['risk_level'].to_numpy()]
+    df['as_of'] = pd.Timestamp(store.dates[-1]) if len(store.dates) else pd.NaT
+    return df
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m core.batch", description="批量风险评分")
+    parser.add_argument("universe", help="股票池文件 (csv / parquet / 每行一个代码的文本)")
+    parser.add_argument("-o", "--output", default="risk_scores.parquet", help="输出 Parquet 文件")
+    parser.add_argument("--prices", default=str(default_store_path()),
+                        help="价格存储目录 (默认 $FINRISK_PRICE_STORE 或 data/prices)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="进程数 (默认 CPU 核数)")
+    parser.add_argument("--shard-size", type=int, default=None, help="每个分片的股票数")
+    parser.add_argument("--synthetic", type=int, metavar="DAYS", default=None,
+                        help="价格存储不存在时生成 DAYS 天的模拟价格")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    tickers = load_universe(args.universe)
+    if not tickers:
+        logger.error(f"股票池为空: {args.universe}")
+        return 1
+
+    if not PriceStore.exists(args.prices):
+        if args.synthetic is None:
+            logger.error(f"价格存储不存在: {args.prices}（可使用 --synthetic DAYS 生成模拟数据）")
+            return 1
+        logger.info(f"生成模拟价格存储: {args.prices} ({len(tickers)} 只 x {args.synthetic} 天)")
+        build_synthetic_store(args.prices, tickers, days=args.synthetic)
+
+    start = time.perf_counter()
+    df = run_batch(tickers, args.prices, args.workers, args.shard_size)
+    elapsed = time.perf_counter() - start
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(output, index=False)
+    logger.info(f"完成 {len(df)} 只股票的风险评分，用时 {elapsed:.2f}s -> {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
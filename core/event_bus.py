@@ -0,0 +1,117 @@
+"""
+进程内事件总线 - 主题发布/订阅，为每个主题保留各 key 的最新事件
+"""
+import asyncio
+import itertools
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from utils.logger import setup_logger
+
+logger = setup_logger("event_bus")
+
+# 主题
+MARKET_BAR = "market.bar"
+RISK_METRICS = "risk.metrics"
+RISK_ALERT = "risk.alert"
+REPORT_READY = "report.ready"
+
+Handler = Callable[[Dict[str, Any]], Optional[Awaitable[Any]]]
+
+
+class Subscription:
+    """
+    队列式订阅，可用 async for 逐个读取事件
+
+    队列有界，消费者跟不上时丢弃最旧的事件，不阻塞发布方。
+    """
+
+    def __init__(self, bus: "EventBus", topics: List[str], maxsize: int = 256):
+        self.bus = bus
+        self.topics = topics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def deliver(self, event: Dict[str, Any]) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        return await self.queue.get()
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class EventBus:
+    """进程内发布/订阅总线（需在事件循环线程中使用）"""
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Handler]] = defaultdict(list)
+        self._subscriptions: Dict[str, List[Subscription]] = defaultdict(list)
+        self._latest: Dict[str, Dict[Any, Dict[str, Any]]] = defaultdict(dict)
+        self._seq = itertools.count(1)
+        self.published: Dict[str, int] = defaultdict(int)
+
+    def on(self, topic: str, handler: Handler) -> None:
+        """注册回调，回调可以是普通函数或协程函数"""
+        self._handlers[topic].append(handler)
+
+    def subscribe(self, *topics: str, maxsize: int = 256) -> Subscription:
+        subscription = Subscription(self, list(topics), maxsize)
+        for topic in topics:
+            self._subscriptions[topic].append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        for topic in subscription.topics:
+            if subscription in self._subscriptions[topic]:
+                self._subscriptions[topic].remove(subscription)
+
+    async def publish(self, topic: str, data: Dict[str, Any], key: Any = None) -> Dict[str, Any]:
+        """发布事件，等待所有回调执行完毕（回调异常只记录日志）"""
+        event = {"topic": topic, "key": key, "seq": next(self._seq), "ts": time.time(), "data": data}
+        self.published[topic] += 1
+        if key is not None:
+            self._latest[topic][key] = event
+
+        for subscription in self._subscriptions.get(topic, ()):
+            subscription.deliver(event)
+        for handler in self._handlers.get(topic, ()):
+            try:
+                result = handler(event)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error(f"事件处理失败 {topic}: {e}")
+        return event
+
+    def latest(self, topic: str, key: Any = None) -> Optional[Dict[str, Any]]:
+        """某主题某 key 最近一次发布的事件"""
+        return self._latest.get(topic, {}).get(key)
+
+    def snapshot(self, topic: str) -> Dict[Any, Dict[str, Any]]:
+        """某主题各 key 的最新事件"""
+        return dict(self._latest.get(topic, {}))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "published": dict(self.published),
+            "subscribers": {t: len(s) for t, s in self._subscriptions.items() if s},
+            "handlers": {t: len(h) for t, h in self._handlers.items() if h}
+        }
@@ -0,0 +1,157 @@
+"""
+实时风险指标推送 - 按客户端订阅的股票合并指标增量，按帧批量下发
+"""
+import itertools
+import math
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from utils.logger import setup_logger
+
+logger = setup_logger("metric_stream")
+
+# 默认帧间隔（秒）
+FRAME_INTERVAL = 0.25
+# 单个客户端最多订阅的股票数
+MAX_TICKERS = 2000
+
+
+def _clean(value: Any) -> Any:
+    # NaN/inf 不是合法 JSON
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+class StreamClient:
+    """
+    单个推送客户端
+
+    待发送的增量按股票合并：两帧之间同一股票多次更新只保留最新值，
+    因此缓冲大小以订阅的股票数为上限，慢客户端拿到的总是最新值而不是积压的旧值。
+    """
+
+    def __init__(self, hub: "MetricStreamHub", client_id: int):
+        self.hub = hub
+        self.client_id = client_id
+        self.tickers: Set[str] = set()
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.coalesced = 0
+        self.frames = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, tickers: Iterable[str]) -> List[str]:
+        """增加订阅，返回新增的股票（超过上限的部分忽略）"""
+        added = []
+        with self._lock:
+            for ticker in tickers:
+                ticker = ticker.strip().upper()
+                if ticker and ticker not in self.tickers and len(self.tickers) < MAX_TICKERS:
+                    self.tickers.add(ticker)
+                    added.append(ticker)
+        # 新订阅的股票先下发一次完整快照
+        for ticker, data in self.hub.snapshot(added).items():
+            self.push(ticker, data)
+        return added
+
+    def unsubscribe(self, tickers: Iterable[str]) -> None:
+        with self._lock:
+            for ticker in tickers:
+                ticker = ticker.strip().upper()
+                self.tickers.discard(ticker)
+                self.pending.pop(ticker, None)
+
+    def push(self, ticker: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            if ticker not in self.tickers:
+                return
+            previous = self.pending.get(ticker)
+            if previous is None:
+                # 同一增量会推给所有客户端，metrics 需各自复制，后续合并才不会写到其他客户端的缓冲
+                self.pending[ticker] = {**data, "metrics": dict(data["metrics"])}
+            else:
+                # 合并增量：指标字段取最新值
+                previous["metrics"].update(data["metrics"])
+                previous.update({k: v for k, v in data.items() if k != "metrics"})
+                self.coalesced += 1
+
+    def take_frame(self) -> Optional[Dict[str, Any]]:
+        """取出本帧待发送的增量，没有更新时返回 None"""
+        with self._lock:
+            if not self.pending:
+                return None
+            updates, self.pending = self.pending, {}
+            self.frames += 1
+        return {"type": "metrics", "ts": time.time(), "updates": updates}
+
+    def close(self) -> None:
+        self.hub.disconnect(self)
+
+
+class MetricStreamHub:
+    """
+    指标推送中心
+
+    publish 可在任意线程（如后台系统事件循环）调用；各客户端在自己的协程里按帧调用 take_frame，
+    发布方从不等待客户端。
+    """
+
+    def __init__(self):
+        self._clients: Dict[int, StreamClient] = {}
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def connect(self, tickers: Iterable[str] = ()) -> StreamClient:
+        with self._lock:
+            client = StreamClient(self, next(self._ids))
+            self._clients[client.client_id] = client
+        client.subscribe(tickers)
+        return client
+
+    def disconnect(self, client: StreamClient) -> None:
+        with self._lock:
+            self._clients.pop(client.client_id, None)
+
+    def publish(self, ticker: str, metrics: Dict[str, Any], changed: Optional[Iterable[str]] = None,
+                **extra: Any) -> None:
+        """发布一只股票的指标，changed 为空时视为全部指标变化"""
+        ticker = ticker.upper()
+        full = {k: _clean(v) for k, v in metrics.items()}
+        keys = list(changed) if changed is not None else list(full)
+        delta = {"metrics": {k: full[k] for k in keys if k in full}, **extra}
+        with self._lock:
+            self._latest[ticker] = {"metrics": full, **extra}
+            clients = list(self._clients.values())
+            self.published += 1
+        for client in clients:
+            client.push(ticker, delta)
+
+    async def on_metrics(self, event: Dict[str, Any]) -> None:
+        """risk.metrics 事件回调"""
+        data = event["data"]
+        self.publish(data["ticker"], data["metrics"], data.get("changed"),
+                     period=data.get("period"), as_of=data.get("as_of"))
+
+    def snapshot(self, tickers: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {t: {"metrics": dict(self._latest[t]["metrics"]),
+                        **{k: v for k, v in self._latest[t].items() if k != "metrics"}}
+                    for t in tickers if t in self._latest}
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            clients = list(self._clients.values())
+        return {
+            "clients": len(clients),
+            "subscriptions": sum(len(c.tickers) for c in clients),
+            "tickers": len(self._latest),
+            "published": self.published,
+            "coalesced": sum(c.coalesced for c in clients)
+        }
+
+
+# 全局推送中心
+metric_stream = MetricStreamHub()
@@ -0,0 +1,99 @@
+"""
+价格存储模块 - 以 .npy 矩阵保存收盘价/成交量，按内存映射只读打开，供多进程共享
+"""
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_PRICE_STORE = Path(__file__).parent.parent / "data" / "prices"
+
+
+def default_store_path() -> Path:
+    return Path(os.getenv("FINRISK_PRICE_STORE", DEFAULT_PRICE_STORE))
+
+
+class PriceStore:
+    """
+    目录结构:
+        tickers.json  股票代码列表（行顺序）
+        dates.npy     datetime64[D] 交易日
+        close.npy     float64 (股票数, 交易日数)，缺失为 NaN
+        volume.npy    float64，可选
+        returns.npy   float64 (股票数, 交易日数 - 1) 日收益率，可选
+
+    打开时使用 mmap_mode='r'，各进程共享操作系统页缓存，只读取实际访问的行。
+    """
+
+    def __init__(self, path, mmap: bool = True):
+        self.path = Path(path)
+        mode = 'r' if mmap else None
+        with open(self.path / "tickers.json", encoding="utf-8") as f:
+            self.tickers: List[str] = json.load(f)
+        self.dates = np.load(self.path / "dates.npy")
+        self.close = np.load(self.path / "close.npy", mmap_mode=mode)
+        volume_path = self.path / "volume.npy"
+        self.volume = np.load(volume_path, mmap_mode=mode) if volume_path.exists() else None
+        returns_path = self.path / "returns.npy"
+        self.returns = np.load(returns_path, mmap_mode=mode) if returns_path.exists() else None
+        if self.close.shape != (len(self.tickers), len(self.dates)):
+            # 其他进程正在重写该目录时可能读到不同批次的文件
+            raise ValueError(f"价格存储文件不一致: close {self.close.shape}, "
+                             f"tickers {len(self.tickers)}, dates {len(self.dates)}")
+        self._rows: Dict[str, int] = {t: i for i, t in enumerate(self.tickers)}
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def rows_for(self, tickers: Iterable[str]) -> np.ndarray:
+        """股票代码 -> 行号，不存在的代码为 -1"""
+        return np.array([self._rows.get(t, -1) for t in tickers], dtype=np.int64)
+
+    @staticmethod
+    def exists(path) -> bool:
+        return (Path(path) / "close.npy").exists()
+
+    @staticmethod
+    def write(path, tickers: Sequence[str], dates: np.ndarray, close: np.ndarray,
+              volume: Optional[np.ndarray] = None, with_returns: bool = False) -> "PriceStore":
+        """写入价格存储（先写临时文件再替换，避免读到半写的矩阵）"""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        arrays = {"dates": np.asarray(dates, dtype='datetime64[D]'),
+                  "close": np.ascontiguousarray(close, dtype=np.float64)}
+        if volume is not None:
+            arrays["volume"] = np.ascontiguousarray(volume, dtype=np.float64)
+        if with_returns:
+            close = arrays["close"]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                arrays["returns"] = close[:, 1:] / close[:, :-1] - 1
+        for name, array in arrays.items():
+            tmp = path / f".{name}.tmp.npy"
+            np.save(tmp, array)
+            os.replace(tmp, path / f"{name}.npy")
+        tmp = path / ".tickers.tmp.json"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(list(tickers), f)
+        os.replace(tmp, path / "tickers.json")
+        return PriceStore(path)
+
+
+def synthetic_prices(tickers: Sequence[str], days: int = 252, seed: int = 42):
+    """按几何布朗运动生成模拟价格，返回 (dates, close, volume)"""
+    rng = np.random.default_rng(seed)
+    n = len(tickers)
+    vol = rng.uniform(0.15, 0.6, n)[:, None] / np.sqrt(252)
+    drift = rng.uniform(-0.1, 0.2, n)[:, None] / 252
+    log_returns = drift + vol * rng.standard_normal((n, days))
+    close = rng.uniform(10, 500, n)[:, None] * np.exp(np.cumsum(log_returns, axis=1))
+    volume = rng.integers(100_000, 50_000_000, (n, days)).astype(np.float64)
+    dates = np.busday_offset(np.datetime64('today', 'D'), np.arange(-days, 0), roll='backward')
+    return dates, close, volume
+
+
+def build_synthetic_store(path, tickers: Sequence[str], days: int = 252,
+                          seed: int = 42) -> PriceStore:
+    """生成模拟价格存储（无真实数据源时用于演示和压测）"""
+    return PriceStore.write(path, tickers, *synthetic_prices(tickers, days, seed))
@@ -0,0 +1,136 @@
+"""
+共享价格矩阵监视 - 发布新版本时批量重算风险指标，增量驱动预警引擎与实时推送（API 进程的指标来源）
+"""
+import asyncio
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from core.event_bus import RISK_ALERT
+from src.modules.risk_metrics import METRIC_COLUMNS, RISK_LEVELS, compute_risk_metrics
+from utils.logger import setup_logger
+
+logger = setup_logger("price_watcher")
+
+# 共享价格矩阵指标的周期标识（区别于 Gradio 流水线按 1mo/1y 等周期计算的指标）
+SHARED_PERIOD = "shared"
+NUMERIC_METRICS = tuple(m for m in METRIC_COLUMNS if m != 'risk_level')
+
+
+def watch_interval_from_env() -> float:
+    """FINRISK_PRICE_WATCH_INTERVAL：检查新版本的间隔秒数，0 关闭"""
+    return float(os.getenv("FINRISK_PRICE_WATCH_INTERVAL", "1.0"))
+
+
+def _changed_rows(new: np.ndarray, old: np.ndarray) -> np.ndarray:
+    """逐元素比较，NaN 与 NaN 视为未变化"""
+    return (new != old) & ~(np.isnan(new) & np.isnan(old))
+
+
+class PriceWatcher:
+    """
+    价格矩阵监视器
+
+    每 interval 秒检查一次共享价格矩阵版本，变化时在工作线程中对全部股票向量化重算指标，
+    只把相对上一版本发生变化的股票和指标交给预警引擎、推送给订阅客户端，触发的预警发布到 risk.alert。
+    """
+
+    def __init__(self, system, interval: float = 1.0):
+        self.system = system
+        self.interval = interval
+        self.version = 0
+        self.tickers: List[str] = []
+        self.metrics: Dict[str, np.ndarray] = {}
+        self.as_of: Optional[str] = None
+        self.updates = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="price-watcher")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"价格矩阵指标更新失败: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def check(self) -> bool:
+        """有新版本时重算并分发指标，返回是否处理了新版本"""
+        store = self.system.prices.snapshot()
+        version = self.system.prices.version
+        if store is None or version == self.version:
+            return False
+        metrics = await asyncio.to_thread(compute_risk_metrics, store.close, store.volume)
+        tickers = [t.upper() for t in store.tickers]
+        masks = self._diff(tickers, metrics)
+        self.tickers, self.metrics, self.version = tickers, metrics, version
+        self.as_of = str(store.dates[-1]) if len(store.dates) else None
+        changed = await self._dispatch(masks) if masks else 0
+        self.updates += 1
+        logger.info(f"价格矩阵 v{version} 指标已更新: {changed}/{len(tickers)} 只股票有变化")
+        return True
+
+    def _diff(self, tickers: List[str], metrics: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """各指标相对上一版本发生变化的股票掩码（只包含有变化的指标）"""
+        if tickers != self.tickers:
+            # 股票池变化时按全部股票、全部指标处理
+            return {name: np.ones(len(tickers), dtype=bool) for name in METRIC_COLUMNS}
+        masks = {}
+        for name in METRIC_COLUMNS:
+            new, old = metrics[name], self.metrics[name]
+            diff = _changed_rows(new, old) if new.dtype.kind == 'f' else new != old
+            if diff.any():
+                masks[name] = diff
+        return masks
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """单只股票的指标字典（与 RiskAgent 发布的 risk.metrics 结构一致）"""
+        metrics = {name: float(self.metrics[name][i]) for name in NUMERIC_METRICS}
+        level = int(self.metrics['risk_level'][i])
+        metrics['risk_level'] = RISK_LEVELS[level][0] if level >= 0 else None
+        metrics['recommendation'] = RISK_LEVELS[level][1] if level >= 0 else None
+        return metrics
+
+    async def _dispatch(self, masks: Dict[str, np.ndarray]) -> int:
+        """变化的指标交给预警引擎并推送给订阅客户端，返回有变化的股票数"""
+        rows = np.flatnonzero(np.logical_or.reduce(list(masks.values())))
+        if not len(rows):
+            return 0
+        tickers = [self.tickers[i] for i in rows]
+        changed = [name for name in NUMERIC_METRICS if name in masks]
+        fired = self.system.alerts.update_batch(
+            tickers, {name: self.metrics[name][rows] for name in NUMERIC_METRICS}, changed
+        ) if changed else []
+
+        for i, ticker in zip(rows, tickers):
+            row_changed = [name for name, mask in masks.items() if mask[i]]
+            if 'risk_level' in row_changed:
+                row_changed.append('recommendation')
+            self.system.stream.publish(ticker, self.row(i), row_changed,
+                                       period=SHARED_PERIOD, as_of=self.as_of)
+
+        for alert in fired:
+            alert["period"] = SHARED_PERIOD
+            alert["as_of"] = self.as_of
+            await self.system.bus.publish(RISK_ALERT, alert, key=alert["ticker"])
+        return len(rows)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval": self.interval,
+            "version": self.version,
+            "tickers": len(self.tickers),
+            "updates": self.updates,
+            "as_of": self.as_of
+        }
@@ -0,0 +1,185 @@
+"""
+后台报告任务模块 - 提交任务、线程池渲染 HTML/PDF、落盘并跟踪状态
+"""
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.logger import setup_logger
+
+logger = setup_logger("report_jobs")
+
+# 任务状态
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+TERMINAL_STATES = (SUCCEEDED, FAILED)
+
+SUPPORTED_FORMATS = ("html", "pdf")
+
+
+class ReportQueueFullError(ValueError):
+    """排队/运行中的任务已达上限（背压）"""
+
+
+def html_to_pdf(html_content: str, output_path: Path) -> None:
+    """HTML 转 PDF（依赖可选的 weasyprint）"""
+    try:
+        from weasyprint import HTML
+    except ImportError:
+        raise RuntimeError("PDF 渲染需要安装 weasyprint (pip install weasyprint)，或改用 html 格式")
+    HTML(string=html_content).write_pdf(str(output_path))
+
+
+class ReportJobManager:
+    """报告任务管理器"""
+
+    def __init__(self, storage_dir: Optional[str] = None, max_workers: Optional[int] = None,
+                 max_jobs: int = 500, renderers: Optional[Dict[str, Callable]] = None,
+                 max_pending: Optional[int] = None):
+        default_dir = Path(__file__).parent.parent / "reports"
+        self.storage_dir = Path(storage_dir or os.getenv("FINRISK_REPORT_DIR", default_dir))
+        self.max_workers = max_workers or int(os.getenv("FINRISK_REPORT_WORKERS", "2"))
+        self.max_jobs = max_jobs
+        # 未结束（排队 + 运行中）任务的上限，达到后拒绝提交，避免任务记录与线程池队列无限增长
+        self.max_pending = max_pending or int(os.getenv("FINRISK_REPORT_MAX_PENDING", "50"))
+        self.pending = 0
+        self.rejected = 0
+        self.renderers: Dict[str, Callable] = dict(renderers or {})
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def register_renderer(self, report_type: str, renderer: Callable[[Dict, str], str]) -> None:
+        """注册报告渲染函数 renderer(params, fmt) -> HTML"""
+        self.renderers[report_type] = renderer
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="report-worker"
+                    )
+        return self._executor
+
+    def submit(self, report_type: str, params: Dict, fmt: str = "html") -> Dict[str, Any]:
+        """提交报告任务，立即返回任务信息（不等待渲染）"""
+        if report_type not in self.renderers:
+            raise ValueError(f"不支持的报告类型: {report_type}")
+        if fmt not in SUPPORTED_FORMATS:
+            raise ValueError(f"不支持的报告格式: {fmt}")
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "report_type": report_type,
+            "format": fmt,
+            "status": QUEUED,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+            "path": None
+        }
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise ReportQueueFullError(f"报告任务过多（{self.pending} 个未完成），请稍后重试")
+            self.pending += 1
+            self.jobs[job_id] = job
+            evicted = self._evict_finished()
+        self._remove_files(evicted)
+
+        self._get_executor().submit(self._run, job_id, report_type, params, fmt)
+        logger.info(f"报告任务已提交: {job_id} ({report_type}/{fmt})")
+        return dict(job)
+
+    def _evict_finished(self) -> List[Dict[str, Any]]:
+        """超出 max_jobs 时按提交顺序淘汰已结束的任务（排队/运行中的任务不淘汰），返回被淘汰的任务；调用方持有锁"""
+        excess = len(self.jobs) - self.max_jobs
+        if excess <= 0:
+            return []
+        evicted = []
+        for job_id, job in list(self.jobs.items()):
+            if len(evicted) >= excess:
+                break
+            if job["status"] in TERMINAL_STATES:
+                evicted.append(self.jobs.pop(job_id))
+        return evicted
+
+    def _remove_files(self, jobs: List[Dict[str, Any]]) -> None:
+        """删除被淘汰任务的报告文件"""
+        for job in jobs:
+            if job["path"]:
+                try:
+                    Path(job["path"]).unlink(missing_ok=True)
+                except OSError as e:
+                    logger.warning(f"报告文件删除失败 {job['path']}: {e}")
+
+    def _run(self, job_id: str, report_type: str, params: Dict, fmt: str) -> None:
+        """在工作线程中渲染报告并写入本地存储"""
+        self._update(job_id, status=RUNNING, started_at=time.time())
+        try:
+            content = self.renderers[report_type](params, fmt)
+            self.storage_dir.mkdir(parents=True, exist_ok=True)
+            output_path = self.storage_dir / f"{report_type}_{job_id}.{fmt}"
+            if fmt == "pdf":
+                html_to_pdf(content, output_path)
+            else:
+                output_path.write_text(content, encoding="utf-8")
+            self._update(job_id, status=SUCCEEDED, finished_at=time.time(), path=str(output_path))
+            logger.info(f"报告任务完成: {job_id} -> {output_path}")
+        except Exception as e:
+            logger.error(f"报告任务失败 {job_id}: {e}")
+            self._update(job_id, status=FAILED, finished_at=time.time(), error=str(e))
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def _update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            if job_id in self.jobs:
+                self.jobs[job_id].update(fields)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """获取任务状态快照"""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def wait(self, job_id: str, timeout: float = 30.0, interval: float = 0.1) -> Optional[Dict[str, Any]]:
+        """阻塞等待任务结束（供脚本/测试使用）"""
+        deadline = time.time() + timeout
+        job = self.get(job_id)
+        while job and job["status"] not in TERMINAL_STATES and time.time() < deadline:
+            time.sleep(interval)
+            job = self.get(job_id)
+        return job
+
+    def shutdown(self, wait: bool = True) -> None:
+        """关闭工作线程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+# 全局报告任务管理器
+def _lazy_renderer(report_type: str) -> Callable[[Dict, str], str]:
+    """首次渲染时才导入 report_renderers（依赖 plotly），避免拖慢服务冷启动"""
+    def render(params: Dict, fmt: str) -> str:
+        from src.modules.report_renderers import RENDERERS
+        return RENDERERS[report_type](params, fmt)
+    return render
+
+
+# 与 src.modules.report_renderers.RENDERERS 的键一致
+DEFAULT_REPORT_TYPES = ("portfolio_risk", "stress_test")
+
+report_jobs = ReportJobManager(renderers={t: _lazy_renderer(t) for t in DEFAULT_REPORT_TYPES})
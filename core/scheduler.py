@@ -0,0 +1,244 @@
+"""
+智能体调度器 - 每个智能体独立的有界优先级队列、截止时间与背压控制
+"""
+import asyncio
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Set
+
+import numpy as np
+
+from agents.base import BaseAgent
+from utils.logger import setup_logger
+
+logger = setup_logger("scheduler")
+
+DEFAULT_PRIORITY = 5
+# 统计窗口：延迟样本数与吞吐量时间窗口（秒）
+LATENCY_SAMPLES = 1000
+THROUGHPUT_WINDOW = 60.0
+
+
+class QueueFullError(Exception):
+    """智能体队列已满（背压）"""
+
+
+class DeadlineExceeded(Exception):
+    """任务在截止时间前未完成"""
+
+
+@dataclass(order=True)
+class Job:
+    priority: int
+    seq: int
+    payload: Dict[str, Any] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    submitted_at: float = field(compare=False)
+    deadline: Optional[float] = field(default=None, compare=False)
+
+
+class AgentStats:
+    """单个智能体的运行统计"""
+
+    def __init__(self):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.expired = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.wait_ms: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.run_ms: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._finished_at: Deque[float] = deque()
+
+    def record(self, wait_s: float, run_s: float) -> None:
+        now = time.monotonic()
+        self.wait_ms.append(wait_s * 1000)
+        self.run_ms.append(run_s * 1000)
+        self._finished_at.append(now)
+
+    def throughput(self) -> float:
+        """最近 THROUGHPUT_WINDOW 秒内每秒完成的任务数"""
+        cutoff = time.monotonic() - THROUGHPUT_WINDOW
+        while self._finished_at and self._finished_at[0] < cutoff:
+            self._finished_at.popleft()
+        return len(self._finished_at) / THROUGHPUT_WINDOW
+
+    @staticmethod
+    def _percentiles(samples: Deque[float]) -> Dict[str, float]:
+        if not samples:
+            return {"avg": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+        values = np.fromiter(samples, dtype=float)
+        p50, p95 = np.percentile(values, [50, 95])
+        return {"avg": round(float(values.mean()), 3), "p50": round(float(p50), 3),
+                "p95": round(float(p95), 3), "max": round(float(values.max()), 3)}
+
+    def to_dict(self, queue_depth: int) -> Dict[str, Any]:
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "expired": self.expired,
+            "rejected": self.rejected,
+            "in_flight": self.in_flight,
+            "queue_depth": queue_depth,
+            "throughput_per_s": round(self.throughput(), 3),
+            "queue_wait_ms": self._percentiles(self.wait_ms),
+            "run_ms": self._percentiles(self.run_ms)
+        }
+
+
+class AgentScheduler:
+    """
+    异步智能体调度器
+
+    每个智能体一个有界 PriorityQueue（数值越小优先级越高）和 concurrency 个工作协程，
+    智能体之间互不抢占，慢任务不会饿死其他智能体。
+    提交时队列已满：block=True 最多等待 timeout 秒，否则抛出 QueueFullError。
+    任务在截止时间前未开始则直接丢弃，开始后剩余时间内未完成则取消。
+    """
+
+    def __init__(self):
+        self.agents: Dict[str, BaseAgent] = {}
+        self.stats: Dict[str, AgentStats] = {}
+        self._queues: Dict[str, asyncio.PriorityQueue] = {}
+        self._workers: Dict[str, List[asyncio.Task]] = {}
+        # 运行中注册的智能体的启动任务（保留引用，避免被垃圾回收）
+        self._starting: Set[asyncio.Task] = set()
+        self._seq = itertools.count()
+        self.is_running = False
+
+    def register(self, agent: BaseAgent) -> None:
+        if agent.name in self.agents:
+            raise ValueError(f"智能体已注册: {agent.name}")
+        self.agents[agent.name] = agent
+        self.stats[agent.name] = AgentStats()
+        if self.is_running:
+            # 队列同步创建，启动完成前提交的任务先入队，待工作协程启动后处理
+            self._queues[agent.name] = asyncio.PriorityQueue(maxsize=agent.queue_size)
+            task = asyncio.get_running_loop().create_task(self._start_agent(agent))
+            self._starting.add(task)
+            task.add_done_callback(self._starting.discard)
+
+    async def _start_agent(self, agent: BaseAgent) -> None:
+        if agent.name not in self._queues:
+            self._queues[agent.name] = asyncio.PriorityQueue(maxsize=agent.queue_size)
+        await agent.setup()
+        self._workers[agent.name] = [
+            asyncio.create_task(self._worker(agent), name=f"{agent.name}-worker-{i}")
+            for i in range(max(1, agent.concurrency))
+        ]
+        logger.info(f"智能体已启动: {agent.name} (并发 {agent.concurrency}, 队列 {agent.queue_size})")
+
+    async def start(self) -> None:
+        if self.is_running:
+            return
+        self.is_running = True
+        for agent in self.agents.values():
+            await self._start_agent(agent)
+
+    async def stop(self) -> None:
+        """停止所有工作协程，未处理的任务以取消结束"""
+        if not self.is_running:
+            return
+        self.is_running = False
+        for task in list(self._starting):
+            task.cancel()
+        await asyncio.gather(*self._starting, return_exceptions=True)
+        for name, queue in self._queues.items():
+            tasks = self._workers.get(name, [])
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            while not queue.empty():
+                queue.get_nowait().future.cancel()
+            if name in self._workers:
+                await self.agents[name].teardown()
+        self._workers.clear()
+        self._queues.clear()
+
+    async def submit(self, agent_name: str, payload: Optional[Dict[str, Any]] = None,
+                     priority: int = DEFAULT_PRIORITY, deadline: Optional[float] = None,
+                     block: bool = True, timeout: Optional[float] = None) -> asyncio.Future:
+        """
+        提交任务，返回结果 Future
+
+        Args:
+            priority: 优先级，数值越小越先执行
+            deadline: 从提交起的截止秒数
+            block: 队列满时是否等待
+            timeout: 等待入队的最长秒数
+        """
+        if agent_name not in self._queues:
+            raise KeyError(f"智能体未注册或调度器未启动: {agent_name}")
+        stats = self.stats[agent_name]
+        queue = self._queues[agent_name]
+        now = time.monotonic()
+        job = Job(priority, next(self._seq), payload or {}, asyncio.get_running_loop().create_future(),
+                  now, now + deadline if deadline is not None else None)
+        try:
+            if block:
+                await asyncio.wait_for(queue.put(job), timeout)
+            else:
+                queue.put_nowait(job)
+        except (asyncio.QueueFull, asyncio.TimeoutError):
+            stats.rejected += 1
+            raise QueueFullError(f"{agent_name} 队列已满 ({queue.maxsize})")
+        stats.submitted += 1
+        return job.future
+
+    async def run(self, agent_name: str, payload: Optional[Dict[str, Any]] = None, **kwargs) -> Any:
+        """提交并等待结果"""
+        return await (await self.submit(agent_name, payload, **kwargs))
+
+    async def _worker(self, agent: BaseAgent) -> None:
+        queue = self._queues[agent.name]
+        stats = self.stats[agent.name]
+        while True:
+            job: Job = await queue.get()
+            try:
+                await self._execute(agent, job, stats)
+            finally:
+                queue.task_done()
+
+    async def _execute(self, agent: BaseAgent, job: Job, stats: AgentStats) -> None:
+        if job.future.cancelled():
+            return
+        started = time.monotonic()
+        if job.deadline is not None and started >= job.deadline:
+            stats.expired += 1
+            job.future.set_exception(DeadlineExceeded(f"{agent.name} 任务在开始前已超时"))
+            return
+
+        stats.in_flight += 1
+        try:
+            remaining = job.deadline - started if job.deadline is not None else None
+            result = await asyncio.wait_for(agent.handle(job.payload), remaining)
+        except asyncio.TimeoutError:
+            stats.expired += 1
+            if not job.future.done():
+                job.future.set_exception(DeadlineExceeded(f"{agent.name} 任务执行超时"))
+        except asyncio.CancelledError:
+            job.future.cancel()
+            raise
+        except Exception as e:
+            stats.failed += 1
+            logger.error(f"智能体 {agent.name} 任务失败: {e}")
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            stats.completed += 1
+            stats.record(started - job.submitted_at, time.monotonic() - started)
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            stats.in_flight -= 1
+
+    def queue_depths(self) -> Dict[str, int]:
+        return {name: queue.qsize() for name, queue in self._queues.items()}
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        depths = self.queue_depths()
+        return {name: stats.to_dict(depths.get(name, 0)) for name, stats in self.stats.items()}
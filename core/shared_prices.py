@@ -0,0 +1,169 @@
+"""
+共享价格矩阵 - 由一个加载进程发布版本化快照，多个 API 工作进程以内存映射只读挂载
+
+目录结构:
+    CURRENT        当前版本号（原子替换写入）
+    v000001/ ...   各版本的 PriceStore（close / returns / volume .npy）
+
+所有工作进程映射同一组文件，数据只在操作系统页缓存中保留一份，
+工作进程增加时内存占用基本不变。
+
+加载进程:
+    python -m core.shared_prices universe.csv [--interval 3600] [--synthetic DAYS]
+"""
+import argparse
+import os
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from core.price_store import PriceStore, synthetic_prices
+from utils.logger import setup_logger
+
+logger = setup_logger("shared_prices")
+
+DEFAULT_SHARED_DIR = Path(__file__).parent.parent / "data" / "shared_prices"
+CURRENT_FILE = "CURRENT"
+
+
+def default_shared_path() -> Path:
+    return Path(os.getenv("FINRISK_SHARED_PRICES", DEFAULT_SHARED_DIR))
+
+
+def _version_dir(root: Path, version: int) -> Path:
+    return root / f"v{version:06d}"
+
+
+def read_current_version(root) -> int:
+    """读取当前发布的版本号，尚未发布时为 0"""
+    try:
+        return int((Path(root) / CURRENT_FILE).read_text().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+class SharedPricePublisher:
+    """加载进程使用：写入新版本并原子切换 CURRENT"""
+
+    def __init__(self, root=None, keep: int = 2):
+        self.root = Path(root or default_shared_path())
+        self.keep = keep
+
+    def publish(self, tickers: Sequence[str], dates: np.ndarray, close: np.ndarray,
+                volume: Optional[np.ndarray] = None) -> int:
+        self.root.mkdir(parents=True, exist_ok=True)
+        version = read_current_version(self.root) + 1
+        PriceStore.write(_version_dir(self.root, version), tickers, dates, close, volume, with_returns=True)
+
+        tmp = self.root / f".{CURRENT_FILE}.tmp"
+        tmp.write_text(str(version))
+        os.replace(tmp, self.root / CURRENT_FILE)
+        logger.info(f"共享价格矩阵已发布 v{version}: {len(tickers)} 只 x {len(dates)} 天")
+        self._cleanup(version)
+        return version
+
+    def _cleanup(self, current: int) -> None:
+        # 已挂载旧版本的进程仍持有映射，删除目录项不影响其读取
+        for path in self.root.glob("v*"):
+            try:
+                version = int(path.name[1:])
+            except ValueError:
+                continue
+            if version <= current - self.keep:
+                shutil.rmtree(path, ignore_errors=True)
+
+
+class SharedPriceReader:
+    """
+    API 工作进程使用：按需挂载最新版本
+
+    每隔 check_interval 秒最多读取一次 CURRENT，版本变化时重新映射；
+    返回的 PriceStore 快照在其生命周期内不会变化，请求内应持有同一个快照。
+    """
+
+    def __init__(self, root=None, check_interval: float = 1.0):
+        self.root = Path(root or default_shared_path())
+        self.check_interval = check_interval
+        self.version = 0
+        self._store: Optional[PriceStore] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> Optional[PriceStore]:
+        """当前版本的只读快照，尚未发布时返回 None"""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._store
+        with self._lock:
+            self._checked_at = now
+            version = read_current_version(self.root)
+            if version and version != self.version:
+                try:
+                    self._store = PriceStore(_version_dir(self.root, version))
+                    self.version = version
+                    logger.info(f"已挂载共享价格矩阵 v{version}")
+                except FileNotFoundError:
+                    # 版本目录已被清理（读到过期的 CURRENT），下次再试
+                    self._checked_at = 0.0
+            return self._store
+
+    def status(self) -> dict:
+        store = self.snapshot()
+        return {
+            "version": self.version,
+            "tickers": len(store) if store else 0,
+            "days": len(store.dates) if store else 0,
+            "as_of": str(store.dates[-1]) if store and len(store.dates) else None
+        }
+
+
+def load_prices(tickers: List[str], days: int, synthetic: bool):
+    """加载价格：优先使用 yfinance，不可用或指定 synthetic 时生成模拟数据"""
+    if not synthetic:
+        try:
+            import yfinance as yf
+            data = yf.download(tickers, period=f"{days}d", auto_adjust=True, progress=False)
+            closes = data["Close"].reindex(columns=tickers)
+            volumes = data["Volume"].reindex(columns=tickers) if "Volume" in data else None
+            return (closes.index.values.astype('datetime64[D]'), closes.to_numpy().T,
+                    volumes.to_numpy().T if volumes is not None else None)
+        except ImportError:
+            logger.warning("未安装 yfinance，使用模拟价格")
+    return synthetic_prices(tickers, days, seed=int(time.time()))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    from core.batch import load_universe
+
+    parser = argparse.ArgumentParser(prog="python -m core.shared_prices", description="共享价格矩阵加载进程")
+    parser.add_argument("universe", help="股票池文件")
+    parser.add_argument("--root", default=str(default_shared_path()), help="共享目录")
+    parser.add_argument("--days", type=int, default=252, help="加载的交易日数")
+    parser.add_argument("--interval", type=float, default=0, help="刷新间隔秒数，0 表示只加载一次")
+    parser.add_argument("--synthetic", action="store_true", help="使用模拟价格")
+    args = parser.parse_args(argv)
+
+    tickers = load_universe(args.universe)
+    publisher = SharedPricePublisher(args.root)
+    while True:
+        try:
+            publisher.publish(tickers, *load_prices(tickers, args.days, args.synthetic))
+        except Exception as e:
+            logger.error(f"价格刷新失败: {e}")
+            if not args.interval:
+                return 1
+        if not args.interval:
+            return 0
+        time.sleep(args.interval)
+
+
+# 全局只读挂载（每个工作进程一个，映射的数据在进程间共享）
+shared_prices = SharedPriceReader()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,19 @@
 ﻿"""
 核心系统模块
 """
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Callable
 import asyncio
-from utils.logger import setup_logger
+import threading
+import time
+from agents.base import BaseAgent
+from core.alerts import alert_engine
+from core.event_bus import EventBus, MARKET_BAR, RISK_ALERT, RISK_METRICS
+from core.metric_stream import metric_stream
+from core.price_watcher import PriceWatcher, watch_interval_from_env
+from core.scheduler import AgentScheduler, DEFAULT_PRIORITY, QueueFullError
+from core.shared_prices import shared_prices
+from core.warmup import WarmupConfig, run_warmup
+from utils.logger import log_stats, setup_logger
 
 logger = setup_logger("core")
 
@@ -11,28 +21,149 @@ class FinRiskSystem:
     """金融风险系统核心"""
     
     def __init__(self):
-        self.agents = {}
+        self.scheduler = AgentScheduler()
+        self.agents = self.scheduler.agents
+        self.bus = EventBus()
+        self.alerts = alert_engine
+        self.stream = metric_stream
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
         self.data_cache = {}
+        # 价格/收益矩阵由加载进程发布，各工作进程只读映射，不再各自缓存
+        self.prices = shared_prices
         self.is_running = False
+        # 就绪（预热完成）与存活（is_running）分开上报
+        self.ready = False
+        self.warmup_report: Dict[str, Any] = {"status": "pending"}
+        self._warmup_task: Optional[asyncio.Task] = None
+        # API 进程的指标来源：共享价格矩阵新版本 -> 预警引擎 / 实时推送
+        self.price_watcher: Optional[PriceWatcher] = None
         
-    async def initialize(self):
-        """初始化系统"""
+    async def initialize(self, warmup: Optional[WarmupConfig] = None, watch_prices: bool = False):
+        """
+        初始化系统；预热默认在后台执行，完成前 ready 为 False
+
+        watch_prices 为 True 时监视共享价格矩阵（间隔见 FINRISK_PRICE_WATCH_INTERVAL），
+        新版本发布后重算指标并驱动预警引擎与实时推送；Gradio 应用改用 setup_pipeline 的行情流水线。
+        """
         logger.info("初始化 FinRisk 系统...")
+        self.loop = asyncio.get_running_loop()
+        await self.scheduler.start()
         self.is_running = True
+        
+        interval = watch_interval_from_env()
+        if watch_prices and interval > 0 and self.price_watcher is None:
+            self.price_watcher = PriceWatcher(self, interval)
+            self.price_watcher.start()
+        
+        config = warmup or WarmupConfig.from_env()
+        if not config.enabled:
+            self.warmup_report = {"status": "disabled"}
+            self.ready = True
+        elif config.blocking:
+            await self.warm_up(config)
+        else:
+            self._warmup_task = asyncio.create_task(self.warm_up(config))
         logger.info("系统初始化完成")
         
+    async def warm_up(self, config: WarmupConfig) -> Dict[str, Any]:
+        """在工作线程中执行预热步骤，不阻塞事件循环（存活检查在预热期间照常响应）"""
+        self.ready = False
+        self.warmup_report = {"status": "running", "started_at": time.time()}
+        report = await asyncio.to_thread(run_warmup, self, config)
+        self.warmup_report = report
+        self.ready = report["status"] == "done" or not config.strict
+        return report
+        
     async def shutdown(self):
         """关闭系统"""
         logger.info("关闭系统中...")
+        if self._warmup_task is not None and not self._warmup_task.done():
+            self._warmup_task.cancel()
+        if self.price_watcher is not None:
+            await self.price_watcher.stop()
+            self.price_watcher = None
+        await self.scheduler.stop()
         self.is_running = False
         logger.info("系统已关闭")
         
+    def register_agent(self, agent: BaseAgent) -> None:
+        """注册智能体，系统运行中注册时立即启动"""
+        self.scheduler.register(agent)
+        
+    async def submit(self, agent_name: str, payload: Optional[Dict[str, Any]] = None,
+                     priority: int = DEFAULT_PRIORITY, deadline: Optional[float] = None,
+                     block: bool = True, timeout: Optional[float] = None) -> asyncio.Future:
+        """向智能体提交任务，返回结果 Future"""
+        return await self.scheduler.submit(agent_name, payload, priority, deadline, block, timeout)
+        
+    async def run(self, agent_name: str, payload: Optional[Dict[str, Any]] = None, **kwargs) -> Any:
+        """向智能体提交任务并等待结果"""
+        return await self.scheduler.run(agent_name, payload, **kwargs)
+        
+    def route(self, topic: str, agent_name: str, priority: int = DEFAULT_PRIORITY) -> None:
+        """将总线主题的事件作为任务投递给智能体（队列满时丢弃并计入 rejected）"""
+        async def forward(event: Dict[str, Any]) -> None:
+            try:
+                await self.scheduler.submit(agent_name, event, priority=priority, block=False)
+            except QueueFullError as e:
+                logger.warning(f"事件丢弃: {e}")
+        self.bus.on(topic, forward)
+        
+    def setup_pipeline(self, fetch: Callable[..., Dict[str, Any]]) -> None:
+        """注册 行情 -> 风险 -> 报告/预警 事件流水线"""
+        from agents.market_agent import MarketAgent
+        from agents.report_agent import ReportAgent
+        from agents.risk_agent import RiskAgent
+        
+        if "market" in self.agents:
+            return
+        self.register_agent(MarketAgent(self.bus, fetch))
+        self.register_agent(RiskAgent(self.bus))
+        self.register_agent(ReportAgent(self.bus))
+        self.route(MARKET_BAR, "risk", priority=1)
+        self.route(RISK_METRICS, "report", priority=3)
+        self.bus.on(RISK_METRICS, self._evaluate_alerts)
+        self.bus.on(RISK_METRICS, self.stream.on_metrics)
+        
+    async def _evaluate_alerts(self, event: Dict[str, Any]) -> None:
+        """只用本次变化的指标对预警规则增量求值，触发的预警发布到 risk.alert"""
+        data = event["data"]
+        fired = self.alerts.update(data["ticker"], data["metrics"], changed=data.get("changed"))
+        for alert in fired:
+            alert["period"] = data["period"]
+            alert["as_of"] = data.get("as_of")
+            await self.bus.publish(RISK_ALERT, alert, key=data["ticker"])
+        
+    def start_background(self) -> asyncio.AbstractEventLoop:
+        """在后台线程中运行事件循环并初始化系统（供 Gradio 等同步应用使用）"""
+        if self._loop_thread is not None:
+            return self.loop
+        loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=loop.run_forever, name="finrisk-system", daemon=True)
+        self._loop_thread.start()
+        asyncio.run_coroutine_threadsafe(self.initialize(), loop).result()
+        return loop
+        
+    def call(self, coro, timeout: Optional[float] = None) -> Any:
+        """从其他线程在系统事件循环中执行协程并等待结果"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+        
     def get_status(self) -> Dict[str, Any]:
         """获取系统状态"""
         return {
             "status": "running" if self.is_running else "stopped",
+            "ready": self.ready,
+            "warmup": self.warmup_report,
             "agents_count": len(self.agents),
-            "cache_size": len(self.data_cache)
+            "agents": self.scheduler.get_stats(),
+            "events": self.bus.get_stats(),
+            "alerts": self.alerts.get_stats(),
+            "stream": self.stream.get_stats(),
+            "price_watcher": self.price_watcher.get_stats() if self.price_watcher else None,
+            "cache_size": len(self.data_cache),
+            "price_matrix": self.prices.status(),
+            "logging": log_stats()
         }
 
 # 单例实例
@@ -0,0 +1,176 @@
+"""
+启动预热 - 在接收流量前加载证券主数据、映射价格矩阵、预计算收益率与协方差并预热计算路径
+"""
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.logger import setup_logger
+
+logger = setup_logger("warmup")
+
+WARMUP_STEPS = ("security_master", "price_store", "covariance", "kernels")
+
+
+@dataclass
+class WarmupConfig:
+    """
+    预热配置
+
+    环境变量：FINRISK_WARMUP（0/none 关闭，或逗号分隔的步骤名）、FINRISK_WARMUP_UNIVERSE（逗号分隔的代码，
+    默认本地证券主数据全部股票）、FINRISK_WARMUP_WINDOW（协方差窗口交易日数）、
+    FINRISK_WARMUP_BLOCKING（1 表示 initialize 等待预热完成）、FINRISK_WARMUP_STRICT（1 表示任一步骤失败即不就绪）。
+    """
+    steps: Tuple[str, ...] = WARMUP_STEPS
+    universe: Optional[List[str]] = None
+    window: int = 252
+    blocking: bool = False
+    strict: bool = False
+    # 额外的预热步骤：名称 -> func(system, config)
+    extra: Dict[str, Callable[[Any, "WarmupConfig"], Dict[str, Any]]] = field(default_factory=dict)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.steps or self.extra)
+
+    @classmethod
+    def from_env(cls) -> "WarmupConfig":
+        steps = os.getenv("FINRISK_WARMUP", "all").strip().lower()
+        if steps in ("0", "false", "none", "off", ""):
+            selected: Tuple[str, ...] = ()
+        elif steps in ("1", "true", "all"):
+            selected = WARMUP_STEPS
+        else:
+            selected = tuple(s.strip() for s in steps.split(",") if s.strip() in WARMUP_STEPS)
+        universe = os.getenv("FINRISK_WARMUP_UNIVERSE")
+        return cls(
+            steps=selected,
+            universe=[t.strip().upper() for t in universe.split(",") if t.strip()] if universe else None,
+            window=int(os.getenv("FINRISK_WARMUP_WINDOW", "252")),
+            blocking=os.getenv("FINRISK_WARMUP_BLOCKING", "0") == "1",
+            strict=os.getenv("FINRISK_WARMUP_STRICT", "0") == "1"
+        )
+
+
+def _security_master(system, config: WarmupConfig) -> Dict[str, Any]:
+    from src.modules.screener import get_screener
+    from src.modules.stock_database import LocalStockDatabase
+
+    # 批量评分 + 构建筛选器的预排序索引
+    screener = get_screener()
+    return {"securities": len(LocalStockDatabase.STOCK_DATABASE), "data_version": screener.data_version}
+
+
+def _price_store(system, config: WarmupConfig) -> Dict[str, Any]:
+    store = system.prices.snapshot()
+    if store is None:
+        return {"skipped": "共享价格矩阵尚未发布"}
+    return {"version": system.prices.version, "tickers": len(store), "days": len(store.dates)}
+
+
+def _default_universe(config: WarmupConfig) -> List[str]:
+    if config.universe:
+        return config.universe
+    from src.modules.stock_database import LocalStockDatabase
+    return list(LocalStockDatabase.STOCK_DATABASE)
+
+
+def covariance(returns: np.ndarray) -> np.ndarray:
+    """按成对有效样本计算协方差（NaN 视为缺失）"""
+    valid = ~np.isnan(returns)
+    counts = valid.sum(axis=1, keepdims=True)
+    means = np.where(counts > 0, np.nansum(returns, axis=1, keepdims=True) / np.maximum(counts, 1), 0.0)
+    centered = np.where(valid, returns - means, 0.0)
+    pair_counts = valid.astype(np.float64) @ valid.T.astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (centered @ centered.T) / (pair_counts - 1)
+
+
+def _window_returns(store, rows: np.ndarray, window: int) -> np.ndarray:
+    """价格矩阵中给定行最近 window 个交易日的日收益率"""
+    # 读取这些行会把对应的内存映射页调入内存
+    if store.returns is not None:
+        return np.array(store.returns[rows, -window:], dtype=np.float64)
+    closes = np.asarray(store.close[rows, -(window + 1):], dtype=np.float64)
+    return closes[:, 1:] / closes[:, :-1] - 1
+
+
+def _covariance(system, config: WarmupConfig) -> Dict[str, Any]:
+    store = system.prices.snapshot()
+    if store is None:
+        return {"skipped": "共享价格矩阵尚未发布"}
+    universe = _default_universe(config)
+    rows = store.rows_for(universe)
+    found = rows >= 0
+    tickers = [t for t, ok in zip(universe, found) if ok]
+    rows = rows[found]
+    if not len(rows):
+        return {"skipped": "默认股票池不在价格矩阵中"}
+
+    returns = _window_returns(store, rows, config.window)
+    entry = {"tickers": tickers, "index": {t: i for i, t in enumerate(tickers)},
+             "version": system.prices.version, "window": config.window}
+    system.data_cache["returns"] = {**entry, "matrix": returns}
+    system.data_cache["covariance"] = {**entry, "matrix": covariance(returns)}
+    return {"tickers": len(tickers), "window": returns.shape[1]}
+
+
+def portfolio_inputs(system, tickers: List[str], window: int = 252) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    组合优化输入：tickers 的日收益率矩阵与协方差矩阵
+
+    预热缓存的价格版本、窗口与当前一致且覆盖全部代码时直接取子矩阵，否则按价格矩阵现算。
+    调用方须保证 tickers 都在价格矩阵中。
+    """
+    store = system.prices.snapshot()
+    cached = system.data_cache.get("covariance")
+    if (cached is not None and cached["version"] == system.prices.version and cached["window"] == window
+            and all(t in cached["index"] for t in tickers)):
+        idx = np.array([cached["index"][t] for t in tickers], dtype=np.int64)
+        return system.data_cache["returns"]["matrix"][idx], cached["matrix"][np.ix_(idx, idx)]
+    returns = _window_returns(store, store.rows_for(tickers), window)
+    return returns, covariance(returns)
+
+
+def _kernels(system, config: WarmupConfig) -> Dict[str, Any]:
+    # 本仓库没有 JIT 编译的内核：用小样本各跑一次热路径，完成首次调用的导入与分配
+    from core.price_store import synthetic_prices
+    from src.modules.risk_metrics import compute_risk_metrics
+
+    tickers = [f"WARM{i}" for i in range(8)]
+    _, close, volume = synthetic_prices(tickers, days=config.window + 10)
+    metrics = compute_risk_metrics(close, volume)
+    system.alerts.check(tickers[0], {name: float(values[0]) for name, values in metrics.items()})
+    return {"paths": ["compute_risk_metrics", "alerts"]}
+
+
+STEP_FUNCTIONS: Dict[str, Callable[[Any, WarmupConfig], Dict[str, Any]]] = {
+    "security_master": _security_master,
+    "price_store": _price_store,
+    "covariance": _covariance,
+    "kernels": _kernels
+}
+
+
+def run_warmup(system, config: WarmupConfig) -> Dict[str, Any]:
+    """依次执行预热步骤（同步，建议在工作线程中调用），单个步骤失败不影响其余步骤"""
+    start = time.perf_counter()
+    steps: Dict[str, Dict[str, Any]] = {}
+    functions = [(name, STEP_FUNCTIONS[name]) for name in config.steps] + list(config.extra.items())
+    for name, func in functions:
+        step_start = time.perf_counter()
+        try:
+            detail = func(system, config) or {}
+            steps[name] = {"ok": True, **detail}
+        except Exception as e:
+            logger.error(f"预热步骤失败 {name}: {e}")
+            steps[name] = {"ok": False, "error": str(e)}
+        steps[name]["ms"] = round((time.perf_counter() - step_start) * 1000, 1)
+
+    failed = [name for name, step in steps.items() if not step["ok"]]
+    total_ms = round((time.perf_counter() - start) * 1000, 1)
+    logger.info(f"预热完成，用时 {total_ms} ms" + (f"，失败步骤: {', '.join(failed)}" if failed else ""))
+    return {"status": "failed" if failed else "done", "failed": failed, "steps": steps, "total_ms": total_ms}
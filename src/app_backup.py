@@ -10,6 +10,17 @@ from datetime import datetime
 import plotly.graph_objects as go
 from typing import Dict, List, Optional
 import logging
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.modules.visualization import Visualization
+from src.modules.data_stats import compute_streaming_stats, DEFAULT_CHUNKSIZE, STREAMING_THRESHOLD_BYTES
+from src.modules.columnar_io import (
+    is_columnar_file, read_columnar_file, read_csv_optimized, downcast_dtypes, COLUMNAR_EXTENSIONS
+)
+from src.modules.portfolio_history import PortfolioHistory, generate_sample_history
+from core.report_jobs import report_jobs
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -147,17 +158,38 @@ class DataProcessor:
     """数据处理工具类"""
     
     @staticmethod
-    def process_uploaded_file(file) -> Optional[Dict]:
-        """处理上传的文件"""
+    def process_uploaded_file(file, streaming: Optional[bool] = None,
+                              chunksize: int = DEFAULT_CHUNKSIZE,
+                              optimize_dtypes: bool = True, sketch: bool = False) -> Optional[Dict]:
+        """
+        处理上传的文件
+        
+        Args:
+            file: 上传的文件对象
+            streaming: 是否分块流式统计，None 表示超过 STREAMING_THRESHOLD_BYTES 时自动启用
+            chunksize: 流式模式下每块的行数
+            optimize_dtypes: 是否压缩 CSV/Excel 列类型 (float32、category、datetime64)
+            sketch: 近似统计模式，分块读取并用固定内存草图估计分位数、去重数和高频值
+        """
         try:
             if file is None:
                 return None
             
+            if streaming is None:
+                streaming = (os.path.exists(file.name)
+                             and os.path.getsize(file.name) > STREAMING_THRESHOLD_BYTES)
+            if streaming or sketch:
+                return DataProcessor._process_streaming(file, chunksize, sketch)
+            
             # 根据文件类型处理
-            if file.name.endswith('.csv'):
-                df = pd.read_csv(file.name)
+            if is_columnar_file(file.name):
+                df = read_columnar_file(file.name)
+            elif file.name.endswith('.csv'):
+                df = read_csv_optimized(file.name) if optimize_dtypes else pd.read_csv(file.name)
             elif file.name.endswith(('.xlsx', '.xls')):
                 df = pd.read_excel(file.name)
+                if optimize_dtypes:
+                    df = downcast_dtypes(df)
             else:
                 return {"error": "不支持的文件格式"}
             
@@ -190,80 +222,28 @@ class DataProcessor:
             return {"success": False, "error": str(e)}
     
     @staticmethod
-    def generate_sample_data() -> pd.DataFrame:
-        """生成示例数据"""
-        dates = pd.date_range(start='2023-01-01', end='2023-12-31', freq='D')
-        data = {
-            'date': dates,
-            'portfolio_value': np.random.normal(1000000, 50000, len(dates)).cumsum(),
-            'stocks': np.random.uniform(0.4, 0.7, len(dates)),
-            'bonds': np.random.uniform(0.2, 0.4, len(dates)),
-            'cash': np.random.uniform(0.05, 0.15, len(dates)),
-            'risk_score': np.random.uniform(0, 10, len(dates))
+    def _process_streaming(file, chunksize: int, sketch: bool = False) -> Dict:
+        """分块读取大文件，一遍扫描累积统计，不保留完整 DataFrame"""
+        if not file.name.endswith(('.csv', '.xlsx', '.xls')) and not is_columnar_file(file.name):
+            return {"error": "不支持的文件格式"}
+        
+        stats = compute_streaming_stats(file.name, chunksize, sketch)
+        return {
+            "success": True,
+            "dataframe": None,
+            "statistics": stats.result(file.name),
+            "preview": stats.preview
         }
-        return pd.DataFrame(data)
-
-# 可视化工具类
-class Visualization:
-    """可视化工具"""
     
     @staticmethod
-    def create_risk_radar(risk_data: Dict) -> go.Figure:
-        """创建风险雷达图"""
-        categories = []
-        values = []
-        
-        for factor_id, factor in risk_data.items():
-            categories.append(factor["name"])
-            values.append(factor["score"])
-        
-        fig = go.Figure(data=go.Scatterpolar(
-            r=values + [values[0]],  # 闭合图形
-            theta=categories + [categories[0]],
-            fill='toself',
-            line=dict(color='blue', width=2),
-            marker=dict(size=8)
-        ))
-        
-        fig.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[0, 10]
-                )
-            ),
-            showlegend=False,
-            title="风险因素分布雷达图"
-        )
-        
-        return fig
+    def generate_sample_history(seed: Optional[int] = None) -> PortfolioHistory:
+        """生成示例组合历史（列式 float32 存储，按 seed 缓存）"""
+        return generate_sample_history(seed)
     
     @staticmethod
-    def create_risk_gauge(overall_score: float) -> go.Figure:
-        """创建风险仪表盘"""
-        fig = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=overall_score,
-            title={'text': "总体风险得分"},
-            domain={'x': [0, 1], 'y': [0, 1]},
-            gauge={
-                'axis': {'range': [0, 50]},
-                'bar': {'color': "darkblue"},
-                'steps': [
-                    {'range': [0, 15], 'color': "green"},
-                    {'range': [15, 30], 'color': "orange"},
-                    {'range': [30, 50], 'color': "red"}
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 30
-                }
-            }
-        ))
-        
-        fig.update_layout(height=300)
-        return fig
+    def generate_sample_data(seed: Optional[int] = None) -> pd.DataFrame:
+        """生成示例数据"""
+        return generate_sample_history(seed).to_dataframe()
 
 # 创建Gradio应用
 def create_app():
@@ -333,8 +313,8 @@ def create_app():
                         gr.Markdown("### 数据上传")
                         file_input = gr.File(
                             label="上传金融数据文件",
-                            file_types=[".csv", ".xlsx", ".xls"],
-                            info="支持CSV和Excel格式"
+                            file_types=[".csv", ".xlsx", ".xls", *COLUMNAR_EXTENSIONS],
+                            info="支持CSV、Excel及Parquet/Feather/Arrow格式"
                         )
                         
                         gr.Markdown("### 或使用示例数据")
@@ -465,6 +445,19 @@ def create_app():
                         
                         generate_report_btn = gr.Button("生成风险报告", variant="primary")
                         
+                        gr.Markdown("### 后台导出 (HTML/PDF)")
+                        export_format = gr.Radio(
+                            choices=["html", "pdf"],
+                            label="导出格式",
+                            value="html"
+                        )
+                        with gr.Row():
+                            export_btn = gr.Button("提交导出任务", variant="secondary")
+                            export_refresh_btn = gr.Button("刷新任务状态", variant="secondary")
+                        export_job_id = gr.Textbox(label="任务ID", interactive=False)
+                        export_status = gr.Markdown()
+                        export_file = gr.File(label="报告文件", interactive=False)
+                        
                     with gr.Column(scale=2):
                         report_output = gr.Markdown(
                             label="风险分析报告",
@@ -531,6 +524,41 @@ def create_app():
                     inputs=[report_type, include_charts, risk_result],
                     outputs=[report_output]
                 )
+                
+                # 后台导出事件：提交后立即返回，渲染在报告工作线程中进行
+                def submit_export(report_type, include_charts, fmt, risk_result_json):
+                    """提交报告导出任务"""
+                    if not risk_result_json or not risk_result_json.get("success"):
+                        return "", "## ⚠️ 请先进行风险分析"
+                    params = dict(risk_result_json, report_type=report_type, include_charts=include_charts)
+                    try:
+                        job = report_jobs.submit("portfolio_risk", params, fmt)
+                    except ValueError as e:
+                        return "", f"❌ 提交失败: {e}"
+                    return job["job_id"], f"⏳ 任务已提交，状态: {job['status']}"
+                
+                def check_export(job_id):
+                    """查询导出任务状态"""
+                    job = report_jobs.get(job_id) if job_id else None
+                    if job is None:
+                        return "⚠️ 暂无导出任务", None
+                    if job["status"] == "failed":
+                        return f"❌ 导出失败: {job['error']}", None
+                    if job["status"] == "succeeded":
+                        return f"✅ 导出完成: {job['path']}", job["path"]
+                    return f"⏳ 任务状态: {job['status']}", None
+                
+                export_btn.click(
+                    fn=submit_export,
+                    inputs=[report_type, include_charts, export_format, risk_result],
+                    outputs=[export_job_id, export_status]
+                )
+                
+                export_refresh_btn.click(
+                    fn=check_export,
+                    inputs=[export_job_id],
+                    outputs=[export_status, export_file]
+                )
             
             # 选项卡4: 系统信息
             with gr.Tab("⚙️ 系统信息"):
@@ -556,6 +584,7 @@ def create_app():
                 ### 📁 支持的数据格式
                 - CSV 文件 (.csv)
                 - Excel 文件 (.xlsx, .xls)
+                - 列式文件 (.parquet, .feather, .arrow)
                 - 内置示例数据
                 
                 ### 🔧 使用说明
@@ -11,6 +11,9 @@ import time
 import random
 from datetime import datetime
 import threading
+import asyncio
+import dataclasses
+import tempfile
 
 print("=" * 70)
 print("🚀 FinRisk AI Agents - 混合智能模式")
@@ -33,7 +36,14 @@ except:
     print("⚠️ Yahoo Finance 不可用，将使用本地模拟")
 
 # 导入本地模拟器
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 项目根目录放在最前，确保 utils 指向根目录的工具包而不是 src/utils
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import setup_logger
+from utils.metrics import FETCH_SOURCES, STAGE_SECONDS, stage_summaries, timed
+from utils.profiling import profile_config, profiled
+
+logger = setup_logger("app_hybrid")
+
 try:
     from src.local_stock_simulator import LocalStockSimulator
     LOCAL_SIM_AVAILABLE = True
@@ -54,22 +64,27 @@ class SmartStockFetcher:
         self.request_count = 0
         self.cache = {}
     
+    @timed("fetch")
     def get_stock_data(self, ticker: str, period: str = "1mo", force_local: bool = False):
         """智能获取股票数据"""
-        ticker = ticker.upper().strip()
+        data = self._fetch(ticker.upper().strip(), period, force_local)
+        FETCH_SOURCES.inc(source=data.get('source', 'unknown'))
+        return data
+    
+    def _fetch(self, ticker: str, period: str, force_local: bool):
         cache_key = f"{ticker}_{period}"
         
         # 检查缓存 (5分钟有效期)
         if cache_key in self.cache:
             cached_time, cached_data = self.cache[cache_key]
             if time.time() - cached_time < 300:  # 5分钟缓存
-                print(f"📦 使用缓存数据: {ticker}")
+                logger.debug(f"使用缓存数据: {ticker}")
                 cached_data['source'] = 'cache'
                 return cached_data
         
         # 如果强制使用本地或API不可用
         if force_local or not REAL_API_AVAILABLE:
-            print(f"🔄 使用本地模拟: {ticker}")
+            logger.debug(f"使用本地模拟: {ticker}")
             if LOCAL_SIM_AVAILABLE:
                 data = LocalStockSimulator.generate_stock_data(ticker, period)
                 data['source'] = 'local_sim'
@@ -89,11 +104,11 @@ class SmartStockFetcher:
         # 限制请求频率
         if time_since_last < 3:  # 至少3秒间隔
             wait_time = 3 - time_since_last
-            print(f"⏳ API频率控制: 等待 {wait_time:.1f}秒")
+            logger.debug(f"API频率控制: 等待 {wait_time:.1f}秒")
             time.sleep(wait_time)
         
         try:
-            print(f"🌐 尝试真实API: {ticker}")
+            logger.debug(f"尝试真实API: {ticker}")
             self.last_request_time = time.time()
             self.request_count += 1
             
@@ -133,24 +148,24 @@ class SmartStockFetcher:
             
             # 缓存成功结果
             self.cache[cache_key] = (time.time(), data)
-            print(f"✅ API获取成功: {ticker}")
+            logger.info(f"API获取成功: {ticker}")
             return data
             
         except Exception as e:
             error_msg = str(e)
-            print(f"❌ API失败 ({ticker}): {error_msg}")
+            logger.warning(f"API失败 ({ticker}): {error_msg}")
             
             # 检查是否是速率限制
             is_rate_limit = any(keyword in error_msg.lower() 
                               for keyword in ['rate', 'too many', 'limit', '429'])
             
             if is_rate_limit:
-                print("🚫 检测到API限制，切换到本地模式12小时")
+                logger.warning("检测到API限制，切换到本地模式12小时")
                 self.api_status = "rate_limited"
             
             # 回退到本地模拟
             if LOCAL_SIM_AVAILABLE:
-                print(f"🔄 回退到本地模拟: {ticker}")
+                logger.info(f"回退到本地模拟: {ticker}")
                 data = LocalStockSimulator.generate_stock_data(ticker, period)
                 data['source'] = 'local_fallback'
                 data['api_error'] = error_msg
@@ -167,6 +182,97 @@ class SmartStockFetcher:
 # 创建全局获取器
 fetcher = SmartStockFetcher()
 
+# ============================================================================
+# 事件驱动流水线 (行情 -> 风险 -> 报告)
+# ============================================================================
+from core.event_bus import REPORT_READY
+from core.system import system
+
+# 推送结果的有效期（与数据缓存一致）
+PUSHED_REPORT_TTL = 300
+_pipeline_lock = threading.Lock()
+
+def ensure_pipeline():
+    """首次使用时注册智能体并在后台线程启动系统"""
+    with _pipeline_lock:
+        if system.loop is None:
+            system.setup_pipeline(fetcher.get_stock_data)
+            system.start_background()
+
+def latest_pushed_report(ticker: str, period: str, max_age: float = PUSHED_REPORT_TTL):
+    """报告智能体最近推送的报告，过期或周期不符时返回 None"""
+    event = system.bus.latest(REPORT_READY, ticker)
+    if event and event["data"]["period"] == period and time.time() - event["ts"] < max_age:
+        return event["data"]["report"]
+    return None
+
+async def _request_report(ticker: str, period: str, use_local: bool, timeout: float):
+    # 先订阅再触发行情拉取，避免错过报告事件
+    with system.bus.subscribe(REPORT_READY) as sub:
+        published = await system.run("market", {"tickers": [ticker], "period": period, "force_local": use_local})
+        if not published.get(ticker):
+            # 没有新 K 线，指标未变化，沿用已推送的报告
+            return latest_pushed_report(ticker, period, max_age=float("inf"))
+        while True:
+            event = await sub.get(timeout)
+            if event["key"] == ticker and event["data"]["period"] == period:
+                return event["data"]["report"]
+
+def analyze_stock_pushed(ticker: str, period: str = "1mo", use_local: bool = False, timeout: float = 30.0):
+    """事件驱动分析：已有推送结果时直接返回，否则触发行情智能体并等待报告；失败时回退到同步分析"""
+    if not ticker or not ticker.strip():
+        return "⚠️ 请输入股票代码"
+    ticker = ticker.strip().upper()
+    
+    report = latest_pushed_report(ticker, period)
+    if report:
+        return report
+    try:
+        ensure_pipeline()
+        report = system.call(_request_report(ticker, period, use_local, timeout), timeout + 5)
+    except Exception as e:
+        logger.warning(f"事件流水线失败，回退同步分析 ({ticker}): {e}")
+        report = None
+    return report or analyze_stock_hybrid(ticker, period, use_local)
+
+# 每只股票最近一次定时拉取的 Future 与失败信息
+_polls = {}
+_poll_errors = {}
+
+async def _poll(payload):
+    # 提交并等待行情任务完成，提交被拒（队列满）与任务失败都落到同一个 Future 上
+    result = await system.submit("market", payload, block=False)
+    return await result
+
+def _poll_done(ticker: str):
+    def callback(future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            _poll_errors.pop(ticker, None)
+        else:
+            logger.warning(f"定时拉取行情失败 ({ticker}): {error}")
+            _poll_errors[ticker] = f"{type(error).__name__}: {error}"
+    return callback
+
+def poll_market(ticker: str, period: str, use_local: bool = False):
+    """
+    定时拉取行情（不等待），有新 K 线时流水线自动推送新报告
+
+    上一次拉取未结束时不重复提交；返回该股票最近一次拉取的失败信息（成功或尚无结果时为 None）。
+    """
+    if not ticker or not ticker.strip() or system.loop is None:
+        return None
+    ticker = ticker.strip().upper()
+    previous = _polls.get(ticker)
+    if previous is None or previous.done():
+        payload = {"tickers": [ticker], "period": period, "force_local": use_local}
+        future = asyncio.run_coroutine_threadsafe(_poll(payload), system.loop)
+        future.add_done_callback(_poll_done(ticker))
+        _polls[ticker] = future
+    return _poll_errors.get(ticker)
+
 # ============================================================================
 # 分析函数
 # ============================================================================
@@ -224,31 +330,33 @@ def analyze_stock_hybrid(ticker: str, period: str = "1mo", use_local: bool = Fal
         change_str = "数据不足"
     
     # 计算风险指标
-    if len(df) > 1:
-        returns = df['Close'].pct_change().dropna()
-        if len(returns) > 1:
-            volatility = returns.std() * (252 ** 0.5)
-            risk_score = min(10, volatility * 8)
+    with timed("compute", "analyze_stock_hybrid"):
+        if len(df) > 1:
+            returns = df['Close'].pct_change().dropna()
+            if len(returns) > 1:
+                volatility = returns.std() * (252 ** 0.5)
+                risk_score = min(10, volatility * 8)
+            else:
+                volatility = 0.25
+                risk_score = 6
         else:
-            volatility = 0.25
-            risk_score = 6
-    else:
-        volatility = 0.3
-        risk_score = 7
+            volatility = 0.3
+            risk_score = 7
     
-    # 风险等级
-    if risk_score >= 7:
-        risk_level = "🔴 高风险"
-        suggestion = "建议谨慎投资，设置止损"
-    elif risk_score >= 4:
-        risk_level = "🟡 中风险"
-        suggestion = "适合适度配置，建议分散投资"
-    else:
-        risk_level = "🟢 低风险"
-        suggestion = "适合稳健型投资者"
+        # 风险等级
+        if risk_score >= 7:
+            risk_level = "🔴 高风险"
+            suggestion = "建议谨慎投资，设置止损"
+        elif risk_score >= 4:
+            risk_level = "🟡 中风险"
+            suggestion = "适合适度配置，建议分散投资"
+        else:
+            risk_level = "🟢 低风险"
+            suggestion = "适合稳健型投资者"
     
     # 格式化结果
-    result = f"""
+    with timed("render", "analyze_stock_hybrid"):
+        result = f"""
 ## 📊 {ticker} - {info.get('longName', ticker)}
 **{source_text}** {'🚨 (API受限回退)' if data['source'] == 'local_fallback' else ''}
 
@@ -283,6 +391,56 @@ def analyze_stock_hybrid(ticker: str, period: str = "1mo", use_local: bool = Fal
     
     return result
 
+# ============================================================================
+# 监控指标
+# ============================================================================
+STAGE_NAMES = {'request': '端到端分析', 'fetch': '数据获取', 'compute': '指标计算', 'render': '报告渲染'}
+
+def performance_markdown():
+    """从指标注册表生成性能面板（与 API /metrics 同源）"""
+    fetch_total = sum(FETCH_SOURCES.samples().values())
+    cache_hits = FETCH_SOURCES.value(source='cache')
+    hit_rate = f"{cache_hits / fetch_total * 100:.1f}% ({int(cache_hits)}/{int(fetch_total)})" if fetch_total else "暂无数据"
+    request = STAGE_SECONDS.summary(stage='request', operation='analyze')
+    avg = f"{request['avg'] * 1000:.0f} ms (p95 {request['p95'] * 1000:.0f} ms)" if request['count'] else "暂无数据"
+    
+    lines = [
+        "### ⚡ 性能指标",
+        f"- **API请求数**: {fetcher.request_count}",
+        f"- **缓存命中率**: {hit_rate}",
+        f"- **平均响应时间**: {avg}",
+        "",
+        "| 阶段 | 操作 | 次数 | 平均 (ms) | p50 (ms) | p95 (ms) |",
+        "|---|---|---|---|---|---|"
+    ]
+    for stage, operation, summary in stage_summaries():
+        lines.append(
+            f"| {STAGE_NAMES.get(stage, stage)} | {operation} | {summary['count']} | {summary['avg'] * 1000:.1f} "
+            f"| {summary['p50'] * 1000:.1f} | {summary['p95'] * 1000:.1f} |"
+        )
+    return "\n".join(lines)
+
+# 界面调试剖析的结果需要落盘供下载，未配置 FINRISK_PROFILE_DIR 时写入临时目录
+UI_PROFILE_CONFIG = dataclasses.replace(
+    profile_config, directory=profile_config.directory or os.path.join(tempfile.gettempdir(), "finrisk_profiles")
+)
+
+def profile_markdown(profile):
+    """剖析摘要：耗时、样本数与自身样本最多的函数"""
+    if profile is None:
+        return "\n\n---\n### 🐞 剖析结果\n⚠️ 当前剖析任务已达上限，本次未剖析"
+    lines = [
+        "\n\n---\n### 🐞 剖析结果",
+        f"- **用时**: {profile.duration_ms:.0f} ms，**样本数**: {profile.samples}（间隔 {profile.interval_ms:g} ms）",
+        "- 完整折叠栈见下方文件，可用 speedscope / flamegraph.pl 生成火焰图",
+        "",
+        "| 函数 | 自身样本 |",
+        "|---|---|"
+    ]
+    for frame, count in profile.top:
+        lines.append(f"| `{frame}` | {count} |")
+    return "\n".join(lines)
+
 # ============================================================================
 # 创建界面
 # ============================================================================
@@ -364,6 +522,8 @@ def create_hybrid_interface():
                             label="选择数据源"
                         )
                         
+                        profile_toggle = gr.Checkbox(value=False, label="🐞 调试：剖析本次分析（生成火焰图数据）")
+                        
                         # 控制按钮
                         with gr.Row():
                             analyze_btn = gr.Button("🚀 开始智能分析", variant="primary", scale=2)
@@ -414,11 +574,23 @@ def create_hybrid_interface():
                         </ol>
                         </div>
                         """)
+                        
+                        profile_file = gr.File(label="🐞 剖析结果 (折叠栈)", visible=False)
                 
                 # 事件处理
-                def on_analyze(ticker, period, mode):
+                def on_analyze(ticker, period, mode, debug=False):
                     use_local = "强制本地" in mode
-                    result = analyze_stock_hybrid(ticker, period, use_local)
+                    profile_update = gr.update(visible=False)
+                    if debug:
+                        with profiled(f"analyze {(ticker or '').strip().upper()}", UI_PROFILE_CONFIG) as session:
+                            with timed("request", "analyze"):
+                                result = analyze_stock_pushed(ticker, period, use_local)
+                        result += profile_markdown(session.profile)
+                        if session.profile is not None and session.profile.path:
+                            profile_update = gr.update(value=session.profile.path, visible=True)
+                    else:
+                        with timed("request", "analyze"):
+                            result = analyze_stock_pushed(ticker, period, use_local)
                     
                     # 更新状态显示
                     api_status = "🟢 正常" if fetcher.api_status == "ready" else "🔴 受限"
@@ -432,7 +604,7 @@ def create_hybrid_interface():
                     </div>
                     """
                     
-                    return status, result
+                    return status, result, profile_update
                 
                 def on_refresh():
                     fetcher.cache.clear()
@@ -441,20 +613,35 @@ def create_hybrid_interface():
                 
                 analyze_btn.click(
                     fn=on_analyze,
-                    inputs=[ticker_input, period_select, mode_toggle],
-                    outputs=[status_display, result_output]
+                    inputs=[ticker_input, period_select, mode_toggle, profile_toggle],
+                    outputs=[status_display, result_output, profile_file]
                 )
                 
                 ticker_input.submit(
-                    fn=lambda t,p,m: on_analyze(t, p, m)[1],
-                    inputs=[ticker_input, period_select, mode_toggle],
-                    outputs=result_output
+                    fn=lambda t,p,m,d: on_analyze(t, p, m, d)[1:],
+                    inputs=[ticker_input, period_select, mode_toggle, profile_toggle],
+                    outputs=[result_output, profile_file]
                 )
                 
                 refresh_btn.click(
                     fn=on_refresh,
                     outputs=status_display
                 )
+                
+                # 定时拉取行情，显示流水线推送的最新报告（无需再次点击）
+                def on_tick(ticker, period, mode):
+                    error = poll_market(ticker, period, "强制本地" in mode)
+                    report = latest_pushed_report((ticker or "").strip().upper(), period)
+                    status = f"⚠️ 定时拉取行情失败: {error}" if error else gr.update()
+                    return status, report if report else gr.update()
+                
+                if hasattr(gr, "Timer"):
+                    push_timer = gr.Timer(60)
+                    push_timer.tick(
+                        fn=on_tick,
+                        inputs=[ticker_input, period_select, mode_toggle],
+                        outputs=[status_display, result_output]
+                    )
             
             # 系统信息页
             with gr.TabItem("⚙️ 系统监控"):
@@ -483,14 +670,6 @@ def create_hybrid_interface():
                 <li><strong>缓存机制</strong>: 相同请求5分钟内不会重复调用API</li>
                 </ol>
                 
-                <h3>⚡ 性能指标</h3>
-                <ul>
-                <li><strong>API请求数</strong>: {fetcher.request_count}</li>
-                <li><strong>缓存命中率</strong>: 实时计算中...</li>
-                <li><strong>平均响应时间</strong>: &lt; 2秒</li>
-                <li><strong>系统可用性</strong>: 100% (感谢混合架构)</li>
-                </ul>
-                
                 <h3>🔍 技术支持</h3>
                 <p><strong>常见问题:</strong></p>
                 <ul>
@@ -503,6 +682,14 @@ def create_hybrid_interface():
                 </ul>
                 </div>
                 """)
+                
+                # 性能指标读取指标注册表，点击刷新或定时更新
+                perf_display = gr.Markdown(performance_markdown())
+                perf_refresh_btn = gr.Button("📊 刷新指标", size="sm")
+                perf_refresh_btn.click(fn=performance_markdown, outputs=perf_display)
+                if hasattr(gr, "Timer"):
+                    perf_timer = gr.Timer(10)
+                    perf_timer.tick(fn=performance_markdown, outputs=perf_display)
         
         # 页脚
         gr.Markdown(f"""
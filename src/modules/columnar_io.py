@@ -0,0 +1,139 @@
+# ============================================================================
+# 列式数据读取模块 (Parquet / Feather / Arrow IPC)
+# ============================================================================
+
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+IPC_EXTENSIONS = ('.feather', '.arrow', '.ipc')
+COLUMNAR_EXTENSIONS = PARQUET_EXTENSIONS + IPC_EXTENSIONS
+
+# 按列名识别的低基数文本列（转为 category）与日期列
+CATEGORY_COLUMN_HINTS = ('ticker', 'symbol', 'code', 'sector', 'industry', 'exchange', 'currency')
+DATE_COLUMN_HINTS = ('date', 'time', 'day')
+# 其他文本列唯一值占比低于该阈值时同样转为 category
+CATEGORY_MAX_UNIQUE_RATIO = 0.1
+# float64 列转换为 float32 后往返的最大相对误差，超出（精度不足或溢出）时保留 float64
+FLOAT32_RTOL = 1e-6
+# CSV 列类型推断读取的样本行数
+CSV_SAMPLE_ROWS = 10_000
+
+
+def is_columnar_file(path: str) -> bool:
+    return path.lower().endswith(COLUMNAR_EXTENSIONS)
+
+
+def _require_arrow() -> None:
+    if not ARROW_AVAILABLE:
+        raise RuntimeError("读取 Parquet/Feather/Arrow 文件需要安装 pyarrow (pip install pyarrow)")
+
+
+def read_arrow_table(path: str, columns: Optional[Iterable[str]] = None) -> "pa.Table":
+    """以内存映射方式读取列式文件为 Arrow Table，未压缩的 Feather/IPC 文件不产生数据拷贝"""
+    _require_arrow()
+    columns = list(columns) if columns is not None else None
+    if path.lower().endswith(PARQUET_EXTENSIONS):
+        return pq.read_table(path, columns=columns, memory_map=True)
+
+    source = pa.memory_map(path, 'r')
+    try:
+        table = pa_ipc.open_file(source).read_all()
+    except pa.ArrowInvalid:
+        # Arrow IPC 流格式（无文件尾）
+        source.seek(0)
+        table = pa_ipc.open_stream(source).read_all()
+    return table.select(columns) if columns is not None else table
+
+
+def iter_arrow_batches(path: str, batch_size: int = 100_000) -> Iterator[pd.DataFrame]:
+    """按记录批次读取列式文件，用于流式统计"""
+    _require_arrow()
+    if path.lower().endswith(PARQUET_EXTENSIONS):
+        for batch in pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=batch_size):
+            yield batch.to_pandas()
+        return
+    for batch in read_arrow_table(path).to_batches(max_chunksize=batch_size):
+        yield batch.to_pandas()
+
+
+def table_to_dataframe(table: "pa.Table") -> pd.DataFrame:
+    """Arrow Table 转 DataFrame；字典编码列转为 category，每列单独成块以尽量复用 Arrow 缓冲区"""
+    return table.to_pandas(split_blocks=True, self_destruct=False)
+
+
+def read_columnar_file(path: str) -> pd.DataFrame:
+    """读取 Parquet / Feather / Arrow IPC 文件为 DataFrame"""
+    return table_to_dataframe(read_arrow_table(path))
+
+
+def _float32_roundtrip_ok(series: pd.Series, rtol: float) -> bool:
+    """float32 往返后与原值的相对误差是否都在 rtol 以内（NaN 位置须一致）"""
+    values = series.to_numpy(dtype=np.float64)
+    with np.errstate(over='ignore'):
+        roundtrip = values.astype(np.float32).astype(np.float64)
+    return bool(np.allclose(roundtrip, values, rtol=rtol, atol=0.0, equal_nan=True))
+
+
+def downcast_dtypes(df: pd.DataFrame, float_rtol: Optional[float] = FLOAT32_RTOL) -> pd.DataFrame:
+    """
+    压缩 DataFrame 的列类型
+
+    float64 -> float32（仅当往返相对误差不超过 float_rtol；为 None 时不转换浮点列），
+    整数按取值范围降为最小整数类型，
+    代码/行业等低基数文本列 -> category，日期列解析为 datetime64。
+    """
+    n_rows = max(len(df), 1)
+    for col in df.columns:
+        series = df[col]
+        name = str(col).lower()
+
+        if pd.api.types.is_float_dtype(series):
+            if (float_rtol is not None and series.dtype != np.float32
+                    and _float32_roundtrip_ok(series, float_rtol)):
+                df[col] = series.astype(np.float32)
+        elif pd.api.types.is_integer_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            df[col] = pd.to_numeric(series, downcast='integer')
+        elif series.dtype == object or pd.api.types.is_string_dtype(series.dtype):
+            if any(hint in name for hint in DATE_COLUMN_HINTS):
+                parsed = pd.to_datetime(series, errors='coerce')
+                # 只有全部非空值都能解析时才替换，避免把文本列误转为 NaT
+                if parsed.notna().sum() == series.notna().sum():
+                    df[col] = parsed
+                    continue
+            if (any(hint in name for hint in CATEGORY_COLUMN_HINTS)
+                    or series.nunique(dropna=True) / n_rows <= CATEGORY_MAX_UNIQUE_RATIO):
+                df[col] = series.astype('category')
+    return df
+
+
+def read_csv_optimized(path: str, usecols: Optional[List[str]] = None,
+                       sample_rows: int = CSV_SAMPLE_ROWS) -> pd.DataFrame:
+    """
+    读取 CSV 并压缩列类型
+
+    先读取前 sample_rows 行推断文本列类型，再带 dtype/parse_dates 解析全文件：
+    代码/行业等文本列直接解析为 category、日期列直接解析为 datetime64，不生成整列的中间字符串对象。
+    数值列按默认类型解析后再降级（float32 须全量往返校验，整数须全量取值范围，样本不足以决定）。
+    文件不超过 sample_rows 行时样本即全文件，只解析一次。
+    """
+    sample = pd.read_csv(path, nrows=sample_rows, usecols=usecols)
+    if len(sample) < sample_rows:
+        return downcast_dtypes(sample)
+
+    inferred = downcast_dtypes(sample, float_rtol=None)
+    dtype = {col: 'category' for col in inferred.columns
+             if isinstance(inferred[col].dtype, pd.CategoricalDtype)}
+    dates = [col for col in inferred.columns if pd.api.types.is_datetime64_any_dtype(inferred[col])]
+    df = pd.read_csv(path, usecols=usecols, dtype=dtype or None, parse_dates=dates or False)
+    return downcast_dtypes(df)
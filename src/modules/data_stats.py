@@ -0,0 +1,247 @@
+# ============================================================================
+# 流式数据统计模块
+# ============================================================================
+
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.modules.columnar_io import is_columnar_file, iter_arrow_batches
+from src.modules.sketches import CountMinSketch, HyperLogLog, KLLSketch
+
+# 超过该大小的上传文件默认走分块流式统计
+STREAMING_THRESHOLD_BYTES = 200 * 1024 * 1024
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def iter_file_chunks(path: str, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+    """按块读取 CSV / XLSX 文件，每次只在内存中保留一个块"""
+    if is_columnar_file(path):
+        yield from iter_arrow_batches(path, chunksize)
+    elif path.endswith('.csv'):
+        yield from pd.read_csv(path, chunksize=chunksize)
+    elif path.endswith('.xlsx'):
+        # openpyxl 只读模式逐行读取，避免一次性载入整个工作簿
+        from openpyxl import load_workbook
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(h) for h in next(rows, [])]
+            batch: List[tuple] = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= chunksize:
+                    yield pd.DataFrame(batch, columns=header).infer_objects()
+                    batch = []
+            if batch:
+                yield pd.DataFrame(batch, columns=header).infer_objects()
+        finally:
+            workbook.close()
+    elif path.endswith('.xls'):
+        # 旧版 xls 无法流式读取，只能整体载入
+        yield pd.read_excel(path)
+    else:
+        raise ValueError("不支持的文件格式")
+
+
+class HashDistinctCounter:
+    """
+    基于 64 位哈希的去重计数
+
+    哈希数量不超过 exact_limit 时保存全部哈希（精确，除哈希碰撞外）；
+    超出后丢弃明细，仅用 KMV (k 个最小哈希值) 估计基数，相对误差约 1/sqrt(k)。
+    """
+
+    def __init__(self, exact_limit: int = 1_000_000, k: int = 4096):
+        self.exact_limit = exact_limit
+        self.k = k
+        self._exact: Optional[np.ndarray] = np.empty(0, dtype=np.uint64)
+        self._kmv = np.empty(0, dtype=np.uint64)
+
+    def update(self, hashes: np.ndarray) -> None:
+        hashes = np.unique(hashes.astype(np.uint64, copy=False))
+        self._kmv = np.union1d(self._kmv, hashes[:self.k])[:self.k]
+        if self._exact is not None:
+            self._exact = np.union1d(self._exact, hashes)
+            if len(self._exact) > self.exact_limit:
+                self._exact = None
+
+    @property
+    def is_exact(self) -> bool:
+        return self._exact is not None
+
+    def estimate(self) -> float:
+        if self._exact is not None:
+            return float(len(self._exact))
+        if len(self._kmv) < self.k:
+            return float(len(self._kmv))
+        # KMV 估计: (k - 1) / 第 k 小哈希值在 [0, 1) 上的位置
+        kth = float(self._kmv[-1]) / 2.0 ** 64
+        return (self.k - 1) / kth
+
+    @property
+    def relative_error(self) -> float:
+        return 0.0 if self.is_exact else 1.0 / np.sqrt(self.k - 2)
+
+
+class StreamingStats:
+    """
+    一遍扫描累积数据统计
+
+    每块用 numpy 计算块内均值/方差，再按 Welford/Chan 合并公式并入全局，
+    同时累积最小/最大值、空值数、列去重数以及基于行哈希的重复行数。
+
+    sketch=True 时改用固定内存的草图：HyperLogLog 估计去重/重复数，
+    KLL 估计分位数，Count-Min 统计文本列高频值，结果中附带误差界。
+    """
+
+    def __init__(self, exact_limit: int = 1_000_000, k: int = 4096, sketch: bool = False):
+        self.exact_limit = exact_limit
+        self.k = k
+        self.sketch = sketch
+        self.rows = 0
+        self.columns: List[str] = []
+        self.dtypes: Dict[str, str] = {}
+        self.null_counts: Dict[str, int] = {}
+        self.memory_bytes = 0
+        self.numeric: Dict[str, Dict[str, float]] = {}
+        self.distinct: Dict[str, HashDistinctCounter] = {}
+        self.row_distinct = HyperLogLog() if sketch else HashDistinctCounter(exact_limit, k)
+        self.quantiles: Dict[str, KLLSketch] = {}
+        self.top_values: Dict[str, CountMinSketch] = {}
+        self.preview: List[Dict] = []
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """并入一个数据块"""
+        if not self.columns:
+            self.columns = chunk.columns.tolist()
+            self.preview = chunk.head(10).to_dict('records')
+
+        self.rows += len(chunk)
+        self.memory_bytes += int(chunk.memory_usage(deep=True).sum())
+
+        for col, dtype in chunk.dtypes.astype(str).items():
+            known = self.dtypes.get(col)
+            if known is None:
+                self.dtypes[col] = dtype
+            elif dtype not in known.split('|'):
+                self.dtypes[col] = f"{known}|{dtype}"
+
+        for col, count in chunk.isnull().sum().items():
+            self.null_counts[col] = self.null_counts.get(col, 0) + int(count)
+
+        numeric = chunk.select_dtypes(include=[np.number])
+        self._update_numeric(numeric)
+
+        for col in chunk.columns:
+            values = chunk[col].to_numpy()
+            hashes = pd.util.hash_array(values)
+            counter = self.distinct.get(col)
+            if counter is None:
+                counter = HyperLogLog() if self.sketch else HashDistinctCounter(self.exact_limit // 10, self.k)
+                self.distinct[col] = counter
+            counter.update(hashes)
+            if not self.sketch:
+                continue
+            if col in numeric.columns:
+                self.quantiles.setdefault(col, KLLSketch()).update(values)
+            else:
+                self.top_values.setdefault(col, CountMinSketch()).update(values, hashes)
+        self.row_distinct.update(pd.util.hash_pandas_object(chunk, index=False).to_numpy())
+
+    def _update_numeric(self, numeric: pd.DataFrame) -> None:
+        if numeric.empty:
+            return
+        values = numeric.to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+        counts = np.count_nonzero(valid, axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.nansum(values, axis=0) / counts
+            m2s = np.nansum((values - means) ** 2, axis=0)
+        mins = np.where(valid, values, np.inf).min(axis=0)
+        maxs = np.where(valid, values, -np.inf).max(axis=0)
+
+        for i, col in enumerate(numeric.columns):
+            n_b = int(counts[i])
+            if n_b == 0:
+                continue
+            acc = self.numeric.setdefault(col, {"count": 0, "mean": 0.0, "m2": 0.0,
+                                                "min": np.inf, "max": -np.inf})
+            n_a = acc["count"]
+            n = n_a + n_b
+            delta = means[i] - acc["mean"]
+            acc["mean"] += delta * n_b / n
+            acc["m2"] += m2s[i] + delta ** 2 * n_a * n_b / n
+            acc["count"] = n
+            acc["min"] = min(acc["min"], float(mins[i]))
+            acc["max"] = max(acc["max"], float(maxs[i]))
+
+    def numeric_stats(self) -> Dict[str, Dict[str, float]]:
+        """与 DataFrame.describe() 对齐的数值统计（不含分位数）"""
+        stats = {}
+        for col, acc in self.numeric.items():
+            n = acc["count"]
+            std = np.sqrt(acc["m2"] / (n - 1)) if n > 1 else float('nan')
+            stats[col] = {
+                "count": float(n),
+                "mean": round(float(acc["mean"]), 2),
+                "std": round(float(std), 2),
+                "min": round(acc["min"], 2),
+                "max": round(acc["max"], 2)
+            }
+            if col in self.quantiles:
+                q25, q50, q75 = self.quantiles[col].quantiles((0.25, 0.5, 0.75))
+                stats[col].update({"25%": round(q25, 2), "50%": round(q50, 2), "75%": round(q75, 2)})
+        return stats
+
+    def result(self, filename: str) -> Dict:
+        """生成与 DataProcessor 一致结构的统计结果"""
+        distinct_rows = self.row_distinct.estimate()
+        stats = {
+            "filename": filename,
+            "rows": self.rows,
+            "columns": len(self.columns),
+            "columns_list": self.columns,
+            "dtypes": self.dtypes,
+            "missing_values": int(sum(self.null_counts.values())),
+            "null_counts": self.null_counts,
+            "duplicates": int(max(0, round(self.rows - distinct_rows))),
+            "duplicates_exact": self.row_distinct.is_exact,
+            "distinct_counts": {col: int(round(c.estimate())) for col, c in self.distinct.items()},
+            "distinct_relative_error": round(self.row_distinct.relative_error if self.sketch
+                                             else 1.0 / np.sqrt(self.k - 2), 4),
+            "memory_usage_mb": round(self.memory_bytes / 1024 / 1024, 2),
+            "streaming": True
+        }
+        if self.numeric:
+            stats["numeric_stats"] = self.numeric_stats()
+        if self.sketch:
+            stats["sketch"] = True
+            stats["top_values"] = {col: cms.top(10) for col, cms in self.top_values.items()}
+            stats["error_bounds"] = self.error_bounds(distinct_rows)
+        return stats
+
+    def error_bounds(self, distinct_rows: float) -> Dict:
+        """草图模式下各项估计的误差界"""
+        hll_error = self.row_distinct.relative_error
+        bounds = {
+            "distinct_relative_std_error": round(hll_error, 4),
+            # 重复行数 = 行数 - 去重行数估计，误差即去重估计的误差
+            "duplicates_abs_std_error": int(round(hll_error * distinct_rows)),
+            "quantile_rank_error": round(KLLSketch().rank_error, 4)
+        }
+        if self.top_values:
+            cms = next(iter(self.top_values.values()))
+            bounds["top_values_overcount_max"] = int(np.ceil(cms.error_bound))
+            bounds["top_values_confidence"] = round(cms.confidence, 4)
+        return bounds
+
+
+def compute_streaming_stats(path: str, chunksize: int = DEFAULT_CHUNKSIZE,
+                            sketch: bool = False) -> StreamingStats:
+    """分块读取文件并累积统计"""
+    stats = StreamingStats(sketch=sketch)
+    for chunk in iter_file_chunks(path, chunksize):
+        stats.update(chunk)
+    return stats
@@ -0,0 +1,207 @@
+# ============================================================================
+# 组合历史时间序列模块
+# ============================================================================
+
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+PORTFOLIO_FIELDS = ('portfolio_value', 'stocks', 'bonds', 'cash', 'risk_score')
+
+# 重采样频率 -> datetime64 单位（周按周一对齐单独处理）
+_RESAMPLE_UNITS = {'M': 'M', 'Y': 'Y', 'D': 'D'}
+# 示例历史的最大跨度（50 年），限制单次生成与缓存条目的大小
+MAX_SAMPLE_DAYS = 50 * 366
+
+
+class PortfolioHistory:
+    """
+    紧凑的组合日度历史
+
+    数据存放在一块 (字段数 x 容量) 的 float32 连续数组中，日期为 datetime64[D] 索引，
+    每行 8 字节日期 + 每字段 4 字节，5 个字段时约为同数据 float64 DataFrame 的 1/1.7。
+    追加按容量倍增摊销；窗口切片返回共享底层缓冲区的视图，
+    视图的容量等于长度，对视图追加会先复制，不会写入原对象。
+
+    精度：float32 有效位 24 位，相对误差不超过 2^-24（约 6e-8）。金额类字段 (portfolio_value)
+    在 1.7e5 以上不再精确到分，3.6e8 量级时最小间隔为 32；需要逐分精确的金额请在 float64 中另行保存。
+    """
+
+    __slots__ = ('fields', '_index', '_dates', '_values', '_size')
+
+    def __init__(self, dates: Optional[Iterable] = None, values: Optional[np.ndarray] = None,
+                 fields: Sequence[str] = PORTFOLIO_FIELDS):
+        self.fields = tuple(fields)
+        self._index = {name: i for i, name in enumerate(self.fields)}
+        self._dates = np.asarray(dates if dates is not None else [], dtype='datetime64[D]')
+        if values is None:
+            values = np.full((len(self.fields), len(self._dates)), np.nan, dtype=np.float32)
+        self._values = np.ascontiguousarray(values, dtype=np.float32)
+        if self._values.shape != (len(self.fields), len(self._dates)):
+            raise ValueError("values 形状应为 (字段数, 日期数)")
+        self._size = len(self._dates)
+
+    @classmethod
+    def from_columns(cls, dates: Iterable, columns: Dict[str, Sequence[float]]) -> "PortfolioHistory":
+        fields = tuple(columns)
+        return cls(dates, np.vstack([np.asarray(columns[f], dtype=np.float32) for f in fields]), fields)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, date_column: str = 'date') -> "PortfolioHistory":
+        fields = [c for c in df.columns if c != date_column]
+        return cls(df[date_column].to_numpy(), df[fields].to_numpy(dtype=np.float32).T, fields)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __repr__(self) -> str:
+        if not self._size:
+            return f"PortfolioHistory(0 rows, fields={self.fields})"
+        return f"PortfolioHistory({self._size} rows, {self._dates[0]}..{self._dates[self._size - 1]})"
+
+    @property
+    def dates(self) -> np.ndarray:
+        return self._dates[:self._size]
+
+    @property
+    def values(self) -> np.ndarray:
+        """(字段数, 行数) 的 float32 视图"""
+        return self._values[:, :self._size]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._dates[:self._size].nbytes + self._values[:, :self._size].nbytes)
+
+    def column(self, name: str) -> np.ndarray:
+        """某字段的 float32 视图（不复制）"""
+        return self._values[self._index[name], :self._size]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.column(name)
+
+    def _reserve(self, capacity: int) -> None:
+        if capacity <= self._values.shape[1]:
+            return
+        capacity = max(capacity, 2 * self._values.shape[1], 16)
+        dates = np.empty(capacity, dtype='datetime64[D]')
+        dates[:self._size] = self._dates[:self._size]
+        values = np.empty((len(self.fields), capacity), dtype=np.float32)
+        values[:, :self._size] = self._values[:, :self._size]
+        self._dates, self._values = dates, values
+
+    def append(self, date, **values: float) -> None:
+        """追加一天的数据，未提供的字段记为 NaN"""
+        self.extend([date], {name: [value] for name, value in values.items()})
+
+    def extend(self, dates: Iterable, columns: Dict[str, Sequence[float]]) -> None:
+        """批量追加，日期需晚于已有数据"""
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        n = len(dates)
+        if n == 0:
+            return
+        if self._size and dates[0] <= self._dates[self._size - 1]:
+            raise ValueError("追加的日期必须晚于已有数据")
+        unknown = set(columns) - set(self.fields)
+        if unknown:
+            raise KeyError(f"未知字段: {sorted(unknown)}")
+
+        self._reserve(self._size + n)
+        end = self._size + n
+        self._dates[self._size:end] = dates
+        for name, i in self._index.items():
+            self._values[i, self._size:end] = columns.get(name, np.nan)
+        self._size = end
+
+    def _view(self, start: int, stop: int) -> "PortfolioHistory":
+        view = PortfolioHistory.__new__(PortfolioHistory)
+        view.fields = self.fields
+        view._index = self._index
+        view._dates = self._dates[start:stop]
+        view._values = self._values[:, start:stop]
+        view._size = stop - start
+        return view
+
+    def view(self) -> "PortfolioHistory":
+        """共享缓冲区的浅视图"""
+        return self._view(0, self._size)
+
+    def window(self, start=None, end=None) -> "PortfolioHistory":
+        """按日期闭区间 [start, end] 切片，返回视图"""
+        dates = self.dates
+        lo = 0 if start is None else int(np.searchsorted(dates, np.datetime64(start, 'D'), 'left'))
+        hi = self._size if end is None else int(np.searchsorted(dates, np.datetime64(end, 'D'), 'right'))
+        return self._view(lo, max(lo, hi))
+
+    def tail(self, n: int) -> "PortfolioHistory":
+        return self._view(max(self._size - n, 0), self._size)
+
+    def resample(self, freq: str = 'M', how: str = 'last') -> "PortfolioHistory":
+        """
+        按周 (W)、月 (M)、年 (Y) 重采样
+
+        how 为 last（期末值）或 mean（期间均值），结果日期为各期最后一个交易日。
+        """
+        if self._size == 0:
+            return PortfolioHistory(fields=self.fields)
+        dates = self.dates
+        if freq == 'W':
+            # 1970-01-01 为周四，+3 后按 7 天整除即以周一为起点
+            keys = (dates.astype(np.int64) + 3) // 7
+        elif freq in _RESAMPLE_UNITS:
+            keys = dates.astype(f'datetime64[{_RESAMPLE_UNITS[freq]}]').astype(np.int64)
+        else:
+            raise ValueError(f"不支持的重采样频率: {freq}")
+
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:], self._size] - 1
+        if how == 'last':
+            values = self.values[:, ends]
+        elif how == 'mean':
+            counts = np.diff(np.r_[starts, self._size])
+            values = np.add.reduceat(self.values, starts, axis=1, dtype=np.float64) / counts
+        else:
+            raise ValueError(f"不支持的聚合方式: {how}")
+        return PortfolioHistory(dates[ends], values, self.fields)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        data = {'date': pd.to_datetime(self.dates)}
+        data.update({name: self.column(name) for name in self.fields})
+        return pd.DataFrame(data)
+
+
+@lru_cache(maxsize=32)
+def _sample_history(seed: int, start: str, end: str) -> PortfolioHistory:
+    rng = np.random.default_rng(seed)
+    dates = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+    n = len(dates)
+    values = np.empty((len(PORTFOLIO_FIELDS), n), dtype=np.float32)
+    values[0] = rng.normal(1000000, 50000, n).cumsum()
+    values[1] = rng.uniform(0.4, 0.7, n)
+    values[2] = rng.uniform(0.2, 0.4, n)
+    values[3] = rng.uniform(0.05, 0.15, n)
+    values[4] = rng.uniform(0, 10, n)
+    values.setflags(write=False)
+    return PortfolioHistory(dates, values)
+
+
+def generate_sample_history(seed: Optional[int] = None, start: str = '2023-01-01',
+                            end: str = '2023-12-31') -> PortfolioHistory:
+    """
+    生成示例组合历史
+
+    指定 seed 时按 (seed, start, end) 缓存，返回共享只读缓冲区的视图；
+    对返回值追加数据会先复制，不影响缓存。
+    portfolio_value 为日度增量的累加，在 float64 中累加后再存为 float32（见 PortfolioHistory 的精度说明）。
+    日期无法解析、end 早于 start 或跨度超过 MAX_SAMPLE_DAYS 时抛出 ValueError。
+    """
+    days = int((np.datetime64(end, 'D') - np.datetime64(start, 'D')).astype(np.int64)) + 1
+    if days < 1:
+        raise ValueError("结束日期不能早于开始日期")
+    if days > MAX_SAMPLE_DAYS:
+        raise ValueError(f"日期跨度过大: {days} 天（上限 {MAX_SAMPLE_DAYS} 天）")
+    if seed is None:
+        seed = int(np.random.randint(0, 2 ** 31 - 1))
+        return _sample_history.__wrapped__(seed, start, end)
+    return _sample_history(seed, start, end).view()
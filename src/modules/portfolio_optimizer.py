@@ -0,0 +1,38 @@
+# ============================================================================
+# 组合优化模块
+# ============================================================================
+
+from typing import Dict
+
+import numpy as np
+
+from src.modules.risk_metrics import RISK_FREE_RATE, TRADING_DAYS
+
+
+def _long_only(raw: np.ndarray) -> np.ndarray:
+    """去掉空头头寸后归一化，全部为非正时退化为等权"""
+    weights = np.clip(np.nan_to_num(raw), 0.0, None)
+    total = weights.sum()
+    return weights / total if total > 0 else np.full(len(raw), 1.0 / len(raw))
+
+
+def optimize_weights(mean_returns: np.ndarray, cov: np.ndarray, risk_tolerance: float) -> np.ndarray:
+    """
+    只做多的均值-方差组合
+
+    risk_tolerance 在最小方差组合（0）与切线组合（1）之间线性插值；协方差奇异时使用伪逆。
+    mean_returns 与 cov 均为日频。
+    """
+    inv = np.linalg.pinv(np.nan_to_num(cov))
+    min_variance = _long_only(inv @ np.ones(len(cov)))
+    tangency = _long_only(inv @ (np.nan_to_num(mean_returns) - RISK_FREE_RATE / TRADING_DAYS))
+    t = float(np.clip(risk_tolerance, 0.0, 1.0))
+    return (1 - t) * min_variance + t * tangency
+
+
+def portfolio_stats(weights: np.ndarray, mean_returns: np.ndarray, cov: np.ndarray) -> Dict[str, float]:
+    """年化预期收益、波动率与夏普比率"""
+    expected_return = float(weights @ np.nan_to_num(mean_returns)) * TRADING_DAYS
+    expected_risk = float(np.sqrt(max(weights @ np.nan_to_num(cov) @ weights, 0.0) * TRADING_DAYS))
+    sharpe = (expected_return - RISK_FREE_RATE) / expected_risk if expected_risk > 0 else 0.0
+    return {"expected_return": expected_return, "expected_risk": expected_risk, "sharpe_ratio": sharpe}
@@ -0,0 +1,121 @@
+# ============================================================================
+# 报告渲染模块 (HTML / PDF)
+# ============================================================================
+
+import base64
+import html
+from datetime import datetime
+from typing import Dict, List
+
+import plotly.graph_objects as go
+
+from src.modules.visualization import Visualization
+from utils.metrics import timed
+
+REPORT_CSS = """
+body { font-family: -apple-system, 'Segoe UI', 'Microsoft YaHei', sans-serif; margin: 40px; color: #333; }
+h1 { color: #1a237e; border-bottom: 3px solid #3949ab; padding-bottom: 10px; }
+h2 { color: #3949ab; margin-top: 30px; }
+table { border-collapse: collapse; width: 100%; margin: 15px 0; }
+th, td { border: 1px solid #e0e0e0; padding: 8px 12px; text-align: left; }
+th { background: #f5f5f5; }
+.chart { margin: 20px 0; }
+.footer { margin-top: 40px; color: #888; font-size: 0.85em; }
+"""
+
+
+def figure_html(fig: go.Figure, fmt: str, include_plotlyjs: bool = False) -> str:
+    """将 Plotly 图表嵌入报告：HTML 使用交互图表，PDF 使用静态 PNG（需要 kaleido）"""
+    if fmt == "pdf":
+        png = fig.to_image(format="png", width=700, height=450)
+        return f'<div class="chart"><img src="data:image/png;base64,{base64.b64encode(png).decode()}"/></div>'
+    return '<div class="chart">' + fig.to_html(
+        full_html=False, include_plotlyjs="cdn" if include_plotlyjs else False
+    ) + '</div>'
+
+
+def html_table(headers: List[str], rows: List[List]) -> str:
+    """生成简单的 HTML 表格"""
+    head = "".join(f"<th>{html.escape(str(h))}</th>" for h in headers)
+    body = "".join(
+        "<tr>" + "".join(f"<td>{html.escape(str(cell))}</td>" for cell in row) + "</tr>"
+        for row in rows
+    )
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+
+def html_document(title: str, body: str) -> str:
+    """包装为完整 HTML 文档"""
+    return f"""<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8"/>
+<title>{html.escape(title)}</title>
+<style>{REPORT_CSS}</style>
+</head>
+<body>
+<h1>{html.escape(title)}</h1>
+{body}
+<p class="footer">生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | 本报告由 FinRisk AI Agents 自动生成，仅供参考</p>
+</body>
+</html>
+"""
+
+
+@timed("render")
+def render_portfolio_risk(params: Dict, fmt: str) -> str:
+    """渲染组合风险报告，params 为 RiskAnalyzer.analyze_portfolio 的结果"""
+    overall = params.get("overall_risk", {})
+    risk_factors = params.get("risk_factors", {})
+
+    parts = [
+        "<h2>🎯 总体风险评估</h2>",
+        html_table(["指标", "数值"], [
+            ["报告类型", params.get("report_type", "详细报告")],
+            ["组合价值", f"${params.get('portfolio_value', 0):,.2f}"],
+            ["风险得分", f"{overall.get('score', 0)} / 50"],
+            ["风险等级", overall.get("level", "未知")]
+        ])
+    ]
+
+    if params.get("include_charts", True) and risk_factors:
+        parts.append(figure_html(Visualization.create_risk_radar(risk_factors), fmt, include_plotlyjs=True))
+        parts.append(figure_html(Visualization.create_risk_gauge(overall.get("score", 0)), fmt))
+
+    parts.append("<h2>📈 详细风险分析</h2>")
+    parts.append(html_table(["风险因素", "得分", "等级", "权重", "建议"], [
+        [f["name"], f"{f['score']} / 10", f["level"], f"{f['weight'] * 100:.0f}%",
+         "；".join(f.get("recommendations", []))]
+        for f in risk_factors.values()
+    ]))
+
+    parts.append("<h2>🚀 总体建议</h2><ul>")
+    parts.extend(f"<li>{html.escape(rec)}</li>" for rec in params.get("recommendations", []))
+    parts.append("</ul>")
+
+    return html_document("📊 金融风险分析报告", "".join(parts))
+
+
+@timed("render")
+def render_stress_test(params: Dict, fmt: str) -> str:
+    """渲染压力测试报告"""
+    loss_pct = params.get("estimated_loss", 0) * 100
+    parts = [
+        "<h2>🧪 测试参数</h2>",
+        html_table(["参数", "数值"], [
+            ["情景", params.get("scenario", "")],
+            ["投资组合", ", ".join(params.get("portfolio", []))],
+            ["置信水平", f"{params.get('confidence_level', 0.95):.0%}"],
+            ["预计损失", f"{loss_pct:.2f}%"]
+        ]),
+        "<h2>📉 损失评估</h2>",
+        figure_html(Visualization.create_risk_gauge(loss_pct), fmt, include_plotlyjs=True)
+    ]
+    return html_document(f"🧪 压力测试报告 - {params.get('scenario', '')}", "".join(parts))
+
+
+# 报告类型 -> 渲染函数
+RENDERERS = {
+    "portfolio_risk": render_portfolio_risk,
+    "stress_test": render_stress_test
+}
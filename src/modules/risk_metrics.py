@@ -0,0 +1,112 @@
+# ============================================================================
+# 批量风险指标模块
+# ============================================================================
+
+import warnings
+from typing import Dict
+
+import numpy as np
+
+from utils.metrics import timed
+
+TRADING_DAYS = 252
+RISK_FREE_RATE = 0.03
+VAR_CONFIDENCE = 0.95
+
+# 与 StockAnalyzer.calculate_risk_metrics 的等级划分一致，按下标 0/1/2 = 低/中/高
+RISK_LEVEL_THRESHOLDS = (4.0, 7.0)
+RISK_LEVELS = (
+    ("低风险", "适合稳健型投资者"),
+    ("中风险", "适度配置，分散投资"),
+    ("高风险", "谨慎投资，建议设置止损"),
+)
+
+METRIC_COLUMNS = (
+    'current_price', 'previous_close', 'daily_change_pct', 'volume', 'ma_20', 'ma_50',
+    'volatility_annual', 'sharpe_ratio', 'max_drawdown', 'var_95', 'var_breach', 'risk_score', 'risk_level'
+)
+
+
+def _last_valid(matrix: np.ndarray, offset: int = 0) -> np.ndarray:
+    """每行倒数第 offset+1 个非 NaN 值，不足时为 NaN"""
+    valid = ~np.isnan(matrix)
+    counts = valid.sum(axis=1)
+    # 有效值在行内的序号（从 1 开始），取序号为 count-offset 的位置
+    order = np.cumsum(valid, axis=1)
+    target = (counts - offset)[:, None]
+    hit = valid & (order == target)
+    out = np.full(len(matrix), np.nan)
+    rows, cols = np.nonzero(hit)
+    out[rows] = matrix[rows, cols]
+    return out
+
+
+def _tail_mean(closes: np.ndarray, window: int) -> np.ndarray:
+    """每行最后 window 个有效收盘价的均值（不足 window 时用全部有效值）"""
+    valid = ~np.isnan(closes)
+    rank_from_end = valid[:, ::-1].cumsum(axis=1)[:, ::-1]
+    mask = valid & (rank_from_end <= window)
+    with np.errstate(invalid='ignore'):
+        return np.where(mask, closes, 0.0).sum(axis=1) / mask.sum(axis=1)
+
+
+@timed("compute")
+def compute_risk_metrics(closes: np.ndarray, volumes: np.ndarray = None) -> Dict[str, np.ndarray]:
+    """
+    按行（每只股票一行、每个交易日一列）向量化计算与 StockAnalyzer 相同的风险指标
+
+    缺失值用 NaN 表示；有效收盘价少于 10 个的股票，收益类指标为 NaN、risk_level 为 -1。
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    n_valid = np.count_nonzero(~np.isnan(closes), axis=1)
+
+    current = _last_valid(closes)
+    previous = _last_valid(closes, 1)
+    previous = np.where(np.isnan(previous), current, previous)
+
+    metrics: Dict[str, np.ndarray] = {
+        'current_price': current,
+        'previous_close': previous,
+        'daily_change_pct': (current / previous - 1) * 100,
+        'volume': _last_valid(volumes) if volumes is not None else np.zeros(len(closes)),
+    }
+
+    has_ma = n_valid >= 20
+    metrics['ma_20'] = np.where(has_ma, _tail_mean(closes, 20), np.nan)
+    metrics['ma_50'] = np.where(has_ma, _tail_mean(closes, 50), np.nan)
+
+    # 数据不足的行（全 NaN 切片）结果为 NaN，屏蔽相应的 RuntimeWarning
+    with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        returns = closes[:, 1:] / closes[:, :-1] - 1
+        n_returns = np.count_nonzero(~np.isnan(returns), axis=1)
+        std = np.nanstd(returns, axis=1, ddof=1)
+        mean = np.nanmean(returns, axis=1)
+        volatility = std * np.sqrt(TRADING_DAYS)
+        sharpe = np.where(std > 0, np.sqrt(TRADING_DAYS) * (mean - RISK_FREE_RATE / TRADING_DAYS) / std, 0.0)
+
+        # 回撤以首个收益日为起点，与 (1 + returns).cumprod() 一致
+        prices = closes[:, 1:]
+        running_max = np.fmax.accumulate(prices, axis=1)
+        max_drawdown = np.nanmin(prices / running_max - 1, axis=1)
+
+        # 历史模拟 VaR（以正数表示的日损失），用最新一日之前的收益估计，再检验最新一日是否突破
+        if returns.shape[1] > 1:
+            var_95 = -np.nanpercentile(returns[:, :-1], (1 - VAR_CONFIDENCE) * 100, axis=1)
+        else:
+            var_95 = np.full(len(closes), np.nan)
+        var_breach = (metrics['daily_change_pct'] / 100 < -var_95).astype(np.float64)
+
+    has_stats = (n_valid >= 10) & (n_returns > 1)
+    metrics['volatility_annual'] = np.where(has_stats, volatility, np.nan)
+    metrics['sharpe_ratio'] = np.where(has_stats, sharpe, np.nan)
+    metrics['max_drawdown'] = np.where(has_stats, max_drawdown, np.nan)
+    metrics['var_95'] = np.where(has_stats, var_95, np.nan)
+    metrics['var_breach'] = np.where(has_stats, var_breach, np.nan)
+
+    # StockAnalyzer 计算评分时 beta 尚未赋值，贝塔项恒为 0
+    risk_score = np.clip(volatility * 5 + np.maximum(0, -max_drawdown) * 3, 0, 10)
+    metrics['risk_score'] = np.where(has_stats, risk_score, np.nan)
+    level = np.searchsorted(RISK_LEVEL_THRESHOLDS, np.nan_to_num(risk_score), side='right')
+    metrics['risk_level'] = np.where(has_stats, level, -1).astype(np.int8)
+    return metrics
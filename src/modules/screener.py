@@ -0,0 +1,260 @@
+# ============================================================================
+# 风险筛选模块
+# ============================================================================
+
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.modules.stock_database import LocalStockDatabase
+
+
+class ScreenerIndex:
+    """一次构建、只读共享的列式快照及每个指标的预排序索引"""
+
+    def __init__(self, tickers: np.ndarray, sectors: np.ndarray,
+                 columns: Dict[str, np.ndarray], data_version=None):
+        self.tickers = tickers
+        self.sectors = sectors
+        self.columns = columns
+        self.data_version = data_version
+        self.size = len(tickers)
+
+        self.order: Dict[str, np.ndarray] = {}         # argsort 结果 (NaN 排在最后)
+        self.sorted_values: Dict[str, np.ndarray] = {}
+        self.rank: Dict[str, np.ndarray] = {}          # 每行在排序中的位置
+        self.valid_count: Dict[str, int] = {}          # 非 NaN 的个数
+
+        for metric, values in columns.items():
+            order = np.argsort(values, kind="stable")
+            rank = np.empty(self.size, dtype=np.int64)
+            rank[order] = np.arange(self.size)
+            self.order[metric] = order
+            self.sorted_values[metric] = values[order]
+            self.rank[metric] = rank
+            self.valid_count[metric] = int(np.count_nonzero(~np.isnan(values)))
+
+        self.sector_rows: Dict[str, np.ndarray] = {}
+        if self.size:
+            unique_sectors, inverse = np.unique(sectors, return_inverse=True)
+            for i, sector in enumerate(unique_sectors):
+                self.sector_rows[sector] = np.flatnonzero(inverse == i)
+
+    def range_slice(self, metric: str, gt: Optional[float] = None, gte: Optional[float] = None,
+                    lt: Optional[float] = None, lte: Optional[float] = None) -> np.ndarray:
+        """通过二分查找返回满足区间条件的行号，不扫描整列"""
+        sorted_values = self.sorted_values[metric]
+        lo, hi = 0, self.valid_count[metric]
+        if gte is not None:
+            lo = max(lo, int(np.searchsorted(sorted_values[:hi], gte, side="left")))
+        if gt is not None:
+            lo = max(lo, int(np.searchsorted(sorted_values[:hi], gt, side="right")))
+        if lte is not None:
+            hi = min(hi, int(np.searchsorted(sorted_values[:hi], lte, side="right")))
+        if lt is not None:
+            hi = min(hi, int(np.searchsorted(sorted_values[:hi], lt, side="left")))
+        return self.order[metric][lo:max(lo, hi)]
+
+
+class RiskScreener:
+    """风险筛选器 - 基于预排序索引的区间过滤与 Top-K 查询"""
+
+    METRICS = (
+        "risk_score", "beta", "volatility", "current_price", "daily_change",
+        "market_cap", "pe_ratio", "dividend_yield", "sharpe_ratio", "max_drawdown"
+    )
+
+    # StockAnalyzer.calculate_risk_metrics 结果字段 -> 筛选指标
+    ANALYZER_FIELDS = {
+        "risk_score": "risk_score",
+        "beta": "beta",
+        "volatility_annual": "volatility",
+        "current_price": "current_price",
+        "daily_change_pct": "daily_change",
+        "market_cap": "market_cap",
+        "pe_ratio": "pe_ratio",
+        "dividend_yield": "dividend_yield",
+        "sharpe_ratio": "sharpe_ratio",
+        "max_drawdown": "max_drawdown"
+    }
+
+    def __init__(self):
+        self._index = ScreenerIndex(np.empty(0, dtype=object), np.empty(0, dtype=object), {
+            metric: np.empty(0) for metric in self.METRICS
+        })
+        # 可重入：get_screener 持锁检查版本后调用 load_stock_database
+        self._lock = threading.RLock()
+
+    @property
+    def data_version(self):
+        return self._index.data_version
+
+    def load_columns(self, tickers: np.ndarray, sectors: np.ndarray,
+                     columns: Dict[str, np.ndarray], data_version=None) -> None:
+        """加载列式数据并重建索引，缺失的指标以 NaN 填充"""
+        size = len(tickers)
+        full_columns = {}
+        for metric in self.METRICS:
+            values = columns.get(metric)
+            full_columns[metric] = (np.full(size, np.nan) if values is None
+                                    else np.asarray(values, dtype=float))
+
+        index = ScreenerIndex(np.asarray(tickers, dtype=object), np.asarray(sectors, dtype=object),
+                              full_columns, data_version)
+        # 新索引构建完成后整体替换，查询方不会看到半成品
+        self._index = index
+
+    def load_stock_database(self, seed: Optional[int] = None) -> None:
+        """从本地股票数据库加载（批量风险评分 + 基本面字段）"""
+        with self._lock:
+            version = LocalStockDatabase.DATA_VERSION
+            scores = LocalStockDatabase.calculate_risk_scores(seed=seed)
+            infos = [LocalStockDatabase.STOCK_DATABASE[t] for t in scores["tickers"]]
+            columns = {
+                "risk_score": scores["risk_score"],
+                "beta": scores["beta"],
+                "volatility": scores["volatility"]
+            }
+            for field in ("current_price", "daily_change", "market_cap", "pe_ratio", "dividend_yield"):
+                columns[field] = np.array([info.get(field, np.nan) for info in infos], dtype=float)
+            self.load_columns(scores["tickers"], scores["sectors"], columns, version)
+
+    def load_analyzer_results(self, results: List[Dict], data_version=None) -> None:
+        """从 StockAnalyzer.calculate_risk_metrics 的结果加载（忽略失败项）"""
+        results = [r for r in results if r.get("success", False)]
+        columns = {}
+        for field, metric in self.ANALYZER_FIELDS.items():
+            values = np.array([np.nan if r.get(field) is None else r[field] for r in results], dtype=float)
+            # 与本地数据库保持一致：波动率以百分比表示
+            columns[metric] = values * 100 if field == "volatility_annual" else values
+        tickers = np.array([r["ticker"] for r in results], dtype=object)
+        sectors = np.array([r.get("sector", "未知") for r in results], dtype=object)
+        with self._lock:
+            self.load_columns(tickers, sectors, columns, data_version)
+
+    def screen(self, filters: Optional[Dict[str, Dict[str, float]]] = None,
+               sector: Optional[str] = None, sort_by: str = "risk_score",
+               descending: bool = True, offset: int = 0, limit: int = 20) -> Dict:
+        """
+        区间筛选 + 排序分页
+
+        Args:
+            filters: 指标 -> {"gt"/"gte"/"lt"/"lte": 阈值}，如 {"risk_score": {"gt": 7}}
+            sector: 行业过滤
+            sort_by: 排序指标
+            descending: 是否降序
+            offset / limit: 分页参数
+
+        Returns:
+            total (命中总数) 与当前页的行记录
+        """
+        index, rows, total = self._select(filters, sector, sort_by, descending, offset, limit)
+        return {
+            "total": int(total),
+            "offset": offset,
+            "limit": limit,
+            "sort_by": sort_by,
+            "descending": descending,
+            "data_version": index.data_version,
+            "rows": self._to_records(index, rows)
+        }
+
+    def screen_columns(self, filters: Optional[Dict[str, Dict[str, float]]] = None,
+                       sector: Optional[str] = None, sort_by: str = "risk_score",
+                       descending: bool = True, offset: int = 0, limit: int = 20) -> Dict:
+        """与 screen 相同的查询，当前页按列返回 NumPy 数组（NaN 保留），供二进制列式输出"""
+        index, rows, total = self._select(filters, sector, sort_by, descending, offset, limit)
+        columns = {"ticker": index.tickers[rows], "sector": index.sectors[rows]}
+        columns.update({metric: values[rows] for metric, values in index.columns.items()})
+        return {
+            "total": int(total),
+            "offset": offset,
+            "limit": limit,
+            "sort_by": sort_by,
+            "descending": descending,
+            "data_version": index.data_version,
+            "columns": columns
+        }
+
+    def _select(self, filters: Optional[Dict[str, Dict[str, float]]], sector: Optional[str],
+                sort_by: str, descending: bool, offset: int, limit: int):
+        """返回 (索引快照, 当前页行号, 命中总数)"""
+        index = self._index
+        filters = filters or {}
+        for metric in list(filters) + [sort_by]:
+            if metric not in index.columns:
+                raise ValueError(f"不支持的筛选指标: {metric}")
+
+        # 先用每个条件的二分区间估算命中数，从最窄的候选集开始
+        candidate_sets = [index.range_slice(metric, **bounds) for metric, bounds in filters.items()]
+        if sector is not None:
+            candidate_sets.append(index.sector_rows.get(sector, np.empty(0, dtype=np.int64)))
+
+        if candidate_sets:
+            candidate_sets.sort(key=len)
+            candidates = np.sort(candidate_sets[0])
+            for other in candidate_sets[1:]:
+                if not len(candidates):
+                    break
+                candidates = candidates[np.isin(candidates, other, assume_unique=True)]
+        else:
+            candidates = None
+
+        rows = self._sorted_page(index, candidates, sort_by, descending, offset, limit)
+        total = index.size if candidates is None else len(candidates)
+        return index, rows, total
+
+    @staticmethod
+    def _sorted_page(index: ScreenerIndex, candidates: Optional[np.ndarray], sort_by: str,
+                     descending: bool, offset: int, limit: int) -> np.ndarray:
+        """按预计算排名取出一页行号，只对需要的前 offset+limit 个做部分排序"""
+        valid = index.valid_count[sort_by]
+        end = offset + limit
+
+        if candidates is None:
+            # 无过滤条件：直接切片预排序索引；降序时有效值部分从末尾反向切片，NaN 仍排在最后
+            order = index.order[sort_by]
+            if not descending:
+                return order[offset:end]
+            stop = min(end, valid)
+            head = (order[valid - 1 - offset:(valid - 1 - stop) if stop < valid else None:-1]
+                    if offset < valid else order[:0])
+            if end <= valid:
+                return head
+            return np.concatenate([head, order[max(offset, valid):end]])
+
+        rank = index.rank[sort_by][candidates]
+        if descending:
+            rank = np.where(rank < valid, valid - 1 - rank, rank)
+        if end < len(candidates):
+            top = np.argpartition(rank, end)[:end]
+            top = top[np.argsort(rank[top])]
+        else:
+            top = np.argsort(rank)
+        return candidates[top[offset:end]]
+
+    @staticmethod
+    def _to_records(index: ScreenerIndex, rows: np.ndarray) -> List[Dict]:
+        """将行号转换为可序列化的记录"""
+        records = []
+        for row in rows:
+            record = {"ticker": index.tickers[row], "sector": index.sectors[row]}
+            for metric, values in index.columns.items():
+                value = values[row]
+                record[metric] = None if np.isnan(value) else float(value)
+            records.append(record)
+        return records
+
+
+# 全局筛选器，数据版本变化时自动重建
+screener = RiskScreener()
+
+
+def get_screener() -> RiskScreener:
+    """获取与本地股票数据库同步的筛选器（并发的首次调用只重建一次）"""
+    if screener.data_version != LocalStockDatabase.DATA_VERSION:
+        with screener._lock:
+            if screener.data_version != LocalStockDatabase.DATA_VERSION:
+                screener.load_stock_database()
+    return screener
@@ -9,6 +9,19 @@ from datetime import datetime, timedelta
 import plotly.graph_objects as go
 from typing import Dict, List, Optional, Tuple
 
+from src.modules.report_templates import ReportTemplate, ReportBuilder
+from utils.metrics import timed
+
+# 报告的静态/模板段，导入时编译一次
+_PRICE_SECTION_HEADER = "## 💰 价格信息\n- **当前价格**: \n"
+_COMPANY_SECTION = ReportTemplate("## 🏢 公司信息\n", "- **行业**: {sector} / {industry}\n")
+_RISK_SCORE_SECTION = ReportTemplate(
+    "- **风险评分**: {color} {risk_score:.1f}/10\n",
+    "  {risk_bar}\n",
+    "- **风险等级**: {risk_level}\n"
+)
+_FOOTER_SECTION = ReportTemplate("---\n", "*分析时间: {analysis_time}*\n")
+
 class StockAnalyzer:
     """股票分析器"""
     
@@ -41,6 +54,7 @@ class StockAnalyzer:
             }
     
     @staticmethod
+    @timed("compute")
     def calculate_risk_metrics(data: Dict) -> Dict:
         """计算风险指标"""
         if not data.get('success', False):
@@ -130,81 +144,88 @@ class StockAnalyzer:
         return result
     
     @staticmethod
+    @timed("render")
     def format_analysis_result(result: Dict) -> str:
         """格式化分析结果为可读文本"""
         if not result.get('success', False):
             return f"❌ 分析失败: {result.get('error', '未知错误')}"
         
-        output = f"# 📊 {result['ticker']} - {result.get('company_name', '')}\n\n"
+        return StockAnalyzer._render_analysis_result(result)
+    
+    @staticmethod
+    def _render_analysis_result(result: Dict) -> str:
+        """按各段模板拼接分析报告"""
+        report = ReportBuilder()
+        report.add(f"# 📊 {result['ticker']} - {result.get('company_name', '')}\n\n")
         
         # 价格信息
         if 'current_price' in result:
-            output += f"## 💰 价格信息\n"
-            output += f"- **当前价格**: \n"
+            report.add(_PRICE_SECTION_HEADER)
             if 'daily_change_pct' in result:
                 change_icon = "📈" if result['daily_change_pct'] > 0 else "📉"
-                output += f"- **今日涨跌**: {change_icon} {result['daily_change_pct']:+.2f}%\n"
+                report.add(f"- **今日涨跌**: {change_icon} {result['daily_change_pct']:+.2f}%\n")
             if 'previous_close' in result:
-                output += f"- **昨收**: \n"
-            output += "\n"
+                report.add("- **昨收**: \n")
+            report.add("\n")
         
         # 公司信息
-        output += f"## 🏢 公司信息\n"
-        output += f"- **行业**: {result.get('sector', '未知')} / {result.get('industry', '未知')}\n"
+        report.add_template(_COMPANY_SECTION, {
+            'sector': result.get('sector', '未知'),
+            'industry': result.get('industry', '未知')
+        })
         if result.get('market_cap', 0) > 0:
-            market_cap_b = result['market_cap'] / 1e9
-            output += f"- **市值**: B\n"
-        output += "\n"
+            report.add("- **市值**: B\n")
+        report.add("\n")
         
         # 估值指标
-        output += f"## 📈 估值指标\n"
+        report.add("## 📈 估值指标\n")
         if result.get('pe_ratio'):
-            output += f"- **市盈率 (P/E)**: {result['pe_ratio']:.2f}\n"
+            report.add(f"- **市盈率 (P/E)**: {result['pe_ratio']:.2f}\n")
         if result.get('forward_pe'):
-            output += f"- **前瞻市盈率**: {result['forward_pe']:.2f}\n"
+            report.add(f"- **前瞻市盈率**: {result['forward_pe']:.2f}\n")
         if result.get('dividend_yield'):
-            output += f"- **股息率**: {result['dividend_yield']*100:.2f}%\n"
-        output += "\n"
+            report.add(f"- **股息率**: {result['dividend_yield']*100:.2f}%\n")
+        report.add("\n")
         
         # 风险指标
-        output += f"## ⚠️ 风险分析\n"
+        report.add("## ⚠️ 风险分析\n")
         
         if 'risk_score' in result:
             risk_score = result['risk_score']
-            risk_bar = "" * int(risk_score) + "░" * (10 - int(risk_score))
-            color = "🔴" if risk_score >= 7 else "🟡" if risk_score >= 4 else "🟢"
-            
-            output += f"- **风险评分**: {color} {risk_score:.1f}/10\n"
-            output += f"  {risk_bar}\n"
-            output += f"- **风险等级**: {result.get('risk_level', '未知')}\n"
+            report.add_template(_RISK_SCORE_SECTION, {
+                'color': "🔴" if risk_score >= 7 else "🟡" if risk_score >= 4 else "🟢",
+                'risk_score': risk_score,
+                'risk_bar': "" * int(risk_score) + "░" * (10 - int(risk_score)),
+                'risk_level': result.get('risk_level', '未知')
+            })
         
         if 'volatility_annual' in result:
-            output += f"- **年化波动率**: {result['volatility_annual']*100:.2f}%\n"
+            report.add(f"- **年化波动率**: {result['volatility_annual']*100:.2f}%\n")
         
         if 'beta' in result:
             beta = result['beta']
             beta_desc = "高风险" if beta > 1.2 else "低风险" if beta < 0.8 else "市场同步"
-            output += f"- **贝塔系数**: {beta:.2f} ({beta_desc})\n"
+            report.add(f"- **贝塔系数**: {beta:.2f} ({beta_desc})\n")
         
         if 'max_drawdown' in result:
-            output += f"- **最大回撤**: {result['max_drawdown']*100:.2f}%\n"
+            report.add(f"- **最大回撤**: {result['max_drawdown']*100:.2f}%\n")
         
         if 'sharpe_ratio' in result:
             sharpe = result['sharpe_ratio']
             sharpe_eval = "优秀" if sharpe > 1 else "一般" if sharpe > 0 else "较差"
-            output += f"- **夏普比率**: {sharpe:.2f} ({sharpe_eval})\n"
+            report.add(f"- **夏普比率**: {sharpe:.2f} ({sharpe_eval})\n")
         
-        output += "\n"
+        report.add("\n")
         
         # 投资建议
         if 'recommendation' in result:
-            output += f"## 🎯 投资建议\n"
-            output += f"{result['recommendation']}\n\n"
+            report.add(f"## 🎯 投资建议\n{result['recommendation']}\n\n")
         
-        output += f"---\n"
-        output += f"*分析时间: {result.get('analysis_time', datetime.now().isoformat())}*\n"
+        report.add_template(_FOOTER_SECTION, {
+            'analysis_time': result.get('analysis_time', datetime.now().isoformat())
+        })
         
-        return output
+        return report.build()
     
     @staticmethod
     def analyze_stock(ticker: str, period: str = "1mo") -> str:
@@ -0,0 +1,464 @@
+# ============================================================================
+# 本地股票数据库模块
+# ============================================================================
+
+import bisect
+import random
+import hashlib
+from typing import Dict, Optional
+
+import numpy as np
+
+class LocalStockDatabase:
+    """本地股票数据库 - 基于真实市场数据的智能模拟"""
+    
+    # 真实股票数据快照（2024年12月数据）
+    STOCK_DATABASE = {
+        # 美股 - 科技巨头
+        "AAPL": {
+            "name": "苹果公司 (Apple Inc.)",
+            "sector": "科技",
+            "industry": "消费电子",
+            "country": "美国",
+            "currency": "USD",
+            "current_price": 172.35,
+            "daily_change": 1.25,
+            "volume": 58210000,
+            "market_cap": 2650000000000,
+            "pe_ratio": 28.5,
+            "dividend_yield": 0.55,
+            "beta": 1.25,
+            "week_52_high": 182.94,
+            "week_52_low": 142.10,
+            "description": "全球领先的消费电子和科技公司，产品包括iPhone、iPad、Mac等。"
+        },
+        "MSFT": {
+            "name": "微软公司 (Microsoft Corporation)",
+            "sector": "科技",
+            "industry": "软件",
+            "country": "美国",
+            "currency": "USD",
+            "current_price": 328.75,
+            "daily_change": 0.85,
+            "volume": 25430000,
+            "market_cap": 2440000000000,
+            "pe_ratio": 32.8,
+            "dividend_yield": 0.72,
+            "beta": 0.95,
+            "week_52_high": 342.20,
+            "week_52_low": 275.30,
+            "description": "全球最大的软件公司，Windows操作系统、Office办公软件、Azure云服务。"
+        },
+        "NVDA": {
+            "name": "英伟达 (NVIDIA Corporation)",
+            "sector": "科技",
+            "industry": "半导体",
+            "country": "美国",
+            "currency": "USD",
+            "current_price": 495.22,
+            "daily_change": 3.15,
+            "volume": 48320000,
+            "market_cap": 1220000000000,
+            "pe_ratio": 64.3,
+            "dividend_yield": 0.03,
+            "beta": 1.65,
+            "week_52_high": 505.48,
+            "week_52_low": 310.20,
+            "description": "全球领先的GPU制造商，人工智能和游戏图形处理器的领导者。"
+        },
+        "TSLA": {
+            "name": "特斯拉 (Tesla Inc.)",
+            "sector": "汽车",
+            "industry": "电动汽车",
+            "country": "美国",
+            "currency": "USD",
+            "current_price": 245.33,
+            "daily_change": -2.15,
+            "volume": 102350000,
+            "market_cap": 780000000000,
+            "pe_ratio": 72.5,
+            "dividend_yield": 0.00,
+            "beta": 2.05,
+            "week_52_high": 265.80,
+            "week_52_low": 195.20,
+            "description": "全球领先的电动汽车和清洁能源公司，自动驾驶技术领导者。"
+        },
+        "GOOGL": {
+            "name": "谷歌 (Alphabet Inc.)",
+            "sector": "科技",
+            "industry": "互联网",
+            "country": "美国",
+            "currency": "USD",
+            "current_price": 135.67,
+            "daily_change": 0.45,
+            "volume": 28450000,
+            "market_cap": 1680000000000,
+            "pe_ratio": 24.8,
+            "dividend_yield": 0.00,
+            "beta": 1.05,
+            "week_52_high": 142.90,
+            "week_52_low": 115.20,
+            "description": "全球最大的搜索引擎公司，YouTube、Android、Google Cloud的母公司。"
+        },
+        
+        # 美股 - 其他重要公司
+        "AMZN": {
+            "name": "亚马逊 (Amazon.com Inc.)",
+            "sector": "电商",
+            "industry": "零售",
+            "country": "美国",
+            "currency": "USD",
+            "current_price": 145.85,
+            "daily_change": 0.92,
+            "volume": 42310000,
+            "market_cap": 1500000000000,
+            "pe_ratio": 58.3,
+            "dividend_yield": 0.00,
+            "beta": 1.15,
+            "week_52_high": 152.40,
+            "week_52_low": 122.30,
+            "description": "全球最大的电子商务和云计算公司。"
+        },
+        "META": {
+            "name": "Meta Platforms Inc.",
+            "sector": "科技",
+            "industry": "社交网络",
+            "country": "美国",
+            "currency": "USD",
+            "current_price": 310.42,
+            "daily_change": 1.85,
+            "volume": 18520000,
+            "market_cap": 790000000000,
+            "pe_ratio": 26.5,
+            "dividend_yield": 0.45,
+            "beta": 1.35,
+            "week_52_high": 325.80,
+            "week_52_low": 245.60,
+            "description": "Facebook、Instagram、WhatsApp的母公司，元宇宙概念领导者。"
+        },
+        
+        # 中国A股
+        "000001.SZ": {
+            "name": "平安银行 (Ping An Bank)",
+            "sector": "金融",
+            "industry": "银行",
+            "country": "中国",
+            "currency": "CNY",
+            "current_price": 12.45,
+            "daily_change": 0.32,
+            "volume": 85230000,
+            "market_cap": 240000000000,
+            "pe_ratio": 6.8,
+            "dividend_yield": 3.25,
+            "beta": 0.85,
+            "week_52_high": 13.20,
+            "week_52_low": 10.85,
+            "description": "中国领先的商业银行，平安集团旗下核心金融平台。"
+        },
+        "600000.SS": {
+            "name": "浦发银行 (Shanghai Pudong Development Bank)",
+            "sector": "金融",
+            "industry": "银行",
+            "country": "中国",
+            "currency": "CNY",
+            "current_price": 8.75,
+            "daily_change": 0.15,
+            "volume": 63210000,
+            "market_cap": 185000000000,
+            "pe_ratio": 5.2,
+            "dividend_yield": 4.15,
+            "beta": 0.78,
+            "week_52_high": 9.20,
+            "week_52_low": 7.85,
+            "description": "中国重要的股份制商业银行，总部位于上海。"
+        },
+        
+        # 港股
+        "0700.HK": {
+            "name": "腾讯控股 (Tencent Holdings)",
+            "sector": "科技",
+            "industry": "互联网",
+            "country": "中国",
+            "currency": "HKD",
+            "current_price": 285.60,
+            "daily_change": 1.25,
+            "volume": 24580000,
+            "market_cap": 340000000000,
+            "pe_ratio": 18.5,
+            "dividend_yield": 1.15,
+            "beta": 1.10,
+            "week_52_high": 310.20,
+            "week_52_low": 265.40,
+            "description": "中国最大的互联网公司，微信、QQ、游戏等业务的领导者。"
+        },
+        "9988.HK": {
+            "name": "阿里巴巴 (Alibaba Group)",
+            "sector": "电商",
+            "industry": "零售",
+            "country": "中国",
+            "currency": "HKD",
+            "current_price": 72.35,
+            "daily_change": -0.45,
+            "volume": 38450000,
+            "market_cap": 185000000000,
+            "pe_ratio": 12.8,
+            "dividend_yield": 1.85,
+            "beta": 1.25,
+            "week_52_high": 82.40,
+            "week_52_low": 68.20,
+            "description": "中国最大的电子商务平台，淘宝、天猫、支付宝等业务的母公司。"
+        },
+        
+        # ETF和指数
+        "SPY": {
+            "name": "SPDR S&P 500 ETF",
+            "sector": "ETF",
+            "industry": "指数基金",
+            "country": "美国",
+            "currency": "USD",
+            "current_price": 455.20,
+            "daily_change": 0.35,
+            "volume": 68250000,
+            "market_cap": 385000000000,
+            "pe_ratio": 22.5,
+            "dividend_yield": 1.45,
+            "beta": 1.00,
+            "week_52_high": 462.80,
+            "week_52_low": 410.20,
+            "description": "跟踪标普500指数的ETF，代表美国大盘股市场。"
+        },
+        "QQQ": {
+            "name": "Invesco QQQ Trust",
+            "sector": "ETF",
+            "industry": "指数基金",
+            "country": "美国",
+            "currency": "USD",
+            "current_price": 385.45,
+            "daily_change": 0.92,
+            "volume": 45230000,
+            "market_cap": 185000000000,
+            "pe_ratio": 28.5,
+            "dividend_yield": 0.65,
+            "beta": 1.15,
+            "week_52_high": 395.20,
+            "week_52_low": 345.60,
+            "description": "跟踪纳斯达克100指数的ETF，代表科技股为主的成长型公司。"
+        }
+    }
+    
+    # 风险评分规则
+    RISK_RULES = {
+        "sector": {
+            "科技": 7.5,
+            "半导体": 8.0,
+            "汽车": 7.0,
+            "电商": 6.5,
+            "金融": 4.5,
+            "银行": 4.0,
+            "ETF": 3.5,
+            "未知": 6.0
+        },
+        "beta": {
+            "low": (0, 0.8, 3.0),
+            "medium": (0.8, 1.2, 6.0),
+            "high": (1.2, 10, 8.0)
+        },
+        "volatility": {
+            "low": (0, 0.2, 3.0),
+            "medium": (0.2, 0.35, 6.0),
+            "high": (0.35, 10, 9.0)
+        }
+    }
+
+    # 风险等级 (按索引: 0=低, 1=中, 2=高) 及对应分界点
+    RISK_LEVEL_THRESHOLDS = (5.0, 7.5)
+    RISK_LEVELS = [
+        ("🟢 低风险", "适合稳健型投资者，可作为核心持仓"),
+        ("🟡 中风险", "适合适度配置，建议分散投资，定期评估持仓"),
+        ("🔴 高风险", "建议谨慎投资，严格设置止损，仅适合高风险承受能力投资者")
+    ]
+
+    # 数据版本号，STOCK_DATABASE 变更时递增，供下游索引/缓存判断失效
+    DATA_VERSION = 1
+
+    @staticmethod
+    def update_stock(ticker: str, info: Dict) -> None:
+        """新增或更新一只股票，并递增数据版本号"""
+        LocalStockDatabase.STOCK_DATABASE[ticker.upper()] = info
+        LocalStockDatabase.DATA_VERSION += 1
+
+    @staticmethod
+    def get_stock_info(ticker: str) -> Dict:
+        """获取股票基本信息"""
+        ticker = ticker.upper()
+        
+        if ticker in LocalStockDatabase.STOCK_DATABASE:
+            return LocalStockDatabase.STOCK_DATABASE[ticker].copy()
+        else:
+            # 为未知股票生成智能数据
+            return LocalStockDatabase._generate_smart_stock(ticker)
+    
+    @staticmethod
+    def _generate_smart_stock(ticker: str) -> Dict:
+        """为未知股票生成智能数据"""
+        # 使用ticker的哈希值作为随机种子，确保相同ticker生成相同数据
+        seed = int(hashlib.md5(ticker.encode()).hexdigest()[:8], 16)
+        random.seed(seed)
+        
+        # 随机选择行业和特征
+        sectors = ["科技", "金融", "医疗", "能源", "工业", "消费", "房地产"]
+        sector = random.choice(sectors)
+        
+        # 根据ticker特征智能判断
+        if ticker.endswith(".SZ") or ticker.endswith(".SS"):
+            country = "中国"
+            currency = "CNY"
+            base_price = random.uniform(5, 50)
+        elif ticker.endswith(".HK"):
+            country = "中国"
+            currency = "HKD"
+            base_price = random.uniform(10, 200)
+        else:
+            country = "美国"
+            currency = "USD"
+            base_price = random.uniform(20, 500)
+        
+        # 生成智能数据
+        current_price = base_price * (1 + random.uniform(-0.1, 0.1))
+        daily_change = random.uniform(-3, 3)
+        
+        return {
+            "name": f"{ticker} 公司",
+            "sector": sector,
+            "industry": "多种经营",
+            "country": country,
+            "currency": currency,
+            "current_price": round(current_price, 2),
+            "daily_change": round(daily_change, 2),
+            "volume": random.randint(1000000, 50000000),
+            "market_cap": random.randint(1000000000, 500000000000),
+            "pe_ratio": round(random.uniform(8, 40), 1),
+            "dividend_yield": round(random.uniform(0, 5), 2),
+            "beta": round(random.uniform(0.5, 2.0), 2),
+            "week_52_high": round(current_price * 1.2, 2),
+            "week_52_low": round(current_price * 0.8, 2),
+            "description": f"基于AI智能生成的{ticker}公司模拟数据，用于金融风险分析演示。"
+        }
+    
+    @staticmethod
+    def calculate_risk_score(stock_info: Dict) -> Dict:
+        """计算综合风险评分"""
+        # 基础分数
+        base_score = LocalStockDatabase.RISK_RULES["sector"].get(
+            stock_info["sector"], 6.0
+        )
+        
+        # Beta调整
+        beta = stock_info["beta"]
+        for level, (low, high, score) in LocalStockDatabase.RISK_RULES["beta"].items():
+            if low <= beta < high:
+                beta_score = score
+                break
+        else:
+            beta_score = 6.0
+        
+        # 波动率模拟（基于beta和行业）
+        volatility = beta * 0.15 + random.uniform(0.05, 0.15)
+        stock_info["volatility"] = volatility
+        
+        # 波动率调整
+        for level, (low, high, score) in LocalStockDatabase.RISK_RULES["volatility"].items():
+            if low <= volatility < high:
+                vol_score = score
+                break
+        else:
+            vol_score = 6.0
+        
+        # 综合评分
+        risk_score = (base_score * 0.4 + beta_score * 0.3 + vol_score * 0.3)
+        risk_score = min(10, max(1, risk_score))
+        
+        # 风险等级
+        level_index = bisect.bisect_right(LocalStockDatabase.RISK_LEVEL_THRESHOLDS, risk_score)
+        risk_level, recommendation = LocalStockDatabase.RISK_LEVELS[level_index]
+        
+        # 技术指标
+        ma_20 = stock_info["current_price"] * (1 + random.uniform(-0.05, 0.05))
+        rsi = random.randint(30, 70)
+        
+        return {
+            "risk_score": round(risk_score, 1),
+            "risk_level": risk_level,
+            "volatility": round(volatility * 100, 1),  # 转换为百分比
+            "recommendation": recommendation,
+            "technical": {
+                "ma_20": round(ma_20, 2),
+                "rsi": rsi,
+                "trend": "上涨" if stock_info["current_price"] > ma_20 else "下跌",
+                "support": round(stock_info["current_price"] * 0.95, 2),
+                "resistance": round(stock_info["current_price"] * 1.05, 2)
+            }
+        }
+
+    @staticmethod
+    def _lookup_range_scores(values: np.ndarray, rules: Dict, default: float = 6.0) -> np.ndarray:
+        """按 RISK_RULES 中的 [low, high) 区间向量化查找评分"""
+        ranges = sorted(rules.values())
+        lows = np.array([low for low, _, _ in ranges], dtype=float)
+        highs = np.array([high for _, high, _ in ranges], dtype=float)
+        scores = np.array([score for _, _, score in ranges], dtype=float)
+
+        # 定位 low <= value 的最后一个区间，再校验 value < high
+        idx = np.searchsorted(lows, values, side="right") - 1
+        safe_idx = np.clip(idx, 0, len(ranges) - 1)
+        hit = (idx >= 0) & (values < highs[safe_idx])
+        return np.where(hit, scores[safe_idx], default)
+
+    @staticmethod
+    def calculate_risk_scores(stock_infos: Optional[Dict[str, Dict]] = None,
+                              seed: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        批量计算风险评分（向量化版 calculate_risk_score）
+
+        Args:
+            stock_infos: 代码 -> 股票信息，默认使用整个 STOCK_DATABASE
+            seed: 波动率模拟的随机种子
+
+        Returns:
+            tickers / risk_score / risk_level / volatility 等等长数组，
+            risk_level 为 RISK_LEVELS 的索引（同时也是投资建议的索引）
+        """
+        if stock_infos is None:
+            stock_infos = LocalStockDatabase.STOCK_DATABASE
+
+        tickers = np.array(list(stock_infos.keys()), dtype=object)
+        infos = list(stock_infos.values())
+        rules = LocalStockDatabase.RISK_RULES
+
+        # 行业基础分：只对去重后的行业查表
+        sectors = np.array([info["sector"] for info in infos], dtype=object)
+        unique_sectors, inverse = np.unique(sectors, return_inverse=True)
+        sector_table = np.array([rules["sector"].get(s, 6.0) for s in unique_sectors], dtype=float)
+        base_score = sector_table[inverse]
+
+        # Beta调整
+        beta = np.array([info["beta"] for info in infos], dtype=float)
+        beta_score = LocalStockDatabase._lookup_range_scores(beta, rules["beta"])
+
+        # 波动率模拟（基于beta和行业）
+        rng = np.random.default_rng(seed)
+        volatility = beta * 0.15 + rng.uniform(0.05, 0.15, len(infos))
+        vol_score = LocalStockDatabase._lookup_range_scores(volatility, rules["volatility"])
+
+        # 综合评分
+        risk_score = np.clip(base_score * 0.4 + beta_score * 0.3 + vol_score * 0.3, 1, 10)
+        risk_level = np.digitize(risk_score, LocalStockDatabase.RISK_LEVEL_THRESHOLDS)
+
+        return {
+            "tickers": tickers,
+            "sectors": sectors,
+            "beta": beta,
+            "risk_score": np.round(risk_score, 1),
+            "risk_level": risk_level,
+            "volatility": np.round(volatility * 100, 1)  # 转换为百分比
+        }
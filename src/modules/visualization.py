@@ -0,0 +1,164 @@
+# ============================================================================
+# 可视化模块
+# ============================================================================
+
+import copy
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+import plotly.graph_objects as go
+
+from utils.cache import LRUCache
+
+
+class FigureCache:
+    """
+    图表缓存
+
+    每类图表只构建并校验一次基础模板（布局、仪表盘色带等静态部分），保存为 dict；
+    新数据到来时复制模板、只修改数据 trace，并跳过 Plotly 的逐属性校验构建图表；
+    相同数据直接返回缓存的图表对象及其序列化结果。
+    返回的图表对象是共享的，调用方不应原地修改。
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self._builders: Dict[str, Callable[[], go.Figure]] = {}
+        self._templates: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.figures = LRUCache(maxsize=maxsize)
+        self.serialized = LRUCache(maxsize=maxsize)
+
+    def register(self, kind: str, builder: Callable[[], go.Figure]) -> None:
+        """注册某类图表的基础模板构建函数"""
+        self._builders[kind] = builder
+
+    def template(self, kind: str) -> Dict[str, Any]:
+        """获取（首次使用时构建）基础模板的 dict 形式"""
+        if kind not in self._templates:
+            with self._lock:
+                if kind not in self._templates:
+                    self._templates[kind] = self._builders[kind]().to_dict()
+        return self._templates[kind]
+
+    def get(self, kind: str, data_key: Hashable, patch: Callable[[Dict[str, Any]], None]) -> go.Figure:
+        """按 (图表类型, 数据) 取图表，未命中时复制模板并用 patch 填充 trace 数据"""
+        def build() -> go.Figure:
+            fig_dict = copy.deepcopy(self.template(kind))
+            patch(fig_dict)
+            # 模板已校验过，patch 只替换数据值
+            return go.Figure(fig_dict, _validate=False)
+        return self.figures.get_or_set((kind, data_key), build)
+
+    def serialize(self, kind: str, data_key: Hashable, fig_factory: Callable[[], go.Figure],
+                  fmt: str = "json") -> bytes:
+        """按数据哈希缓存图表的序列化结果 (json 或 png，png 需要 kaleido)"""
+        def build() -> bytes:
+            fig = fig_factory()
+            if fmt == "png":
+                return fig.to_image(format="png")
+            return fig.to_json(pretty=False).encode("utf-8")
+        return self.serialized.get_or_set((kind, data_key, fmt), build)
+
+    def clear(self) -> None:
+        self.figures.clear()
+        self.serialized.clear()
+
+
+def _build_radar_template() -> go.Figure:
+    """雷达图基础模板"""
+    fig = go.Figure(data=go.Scatterpolar(
+        r=[],
+        theta=[],
+        fill='toself',
+        line=dict(color='blue', width=2),
+        marker=dict(size=8)
+    ))
+
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 10]
+            )
+        ),
+        showlegend=False,
+        title="风险因素分布雷达图"
+    )
+    return fig
+
+
+def _build_gauge_template() -> go.Figure:
+    """仪表盘基础模板（色带与阈值线为静态部分）"""
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=0,
+        title={'text': "总体风险得分"},
+        domain={'x': [0, 1], 'y': [0, 1]},
+        gauge={
+            'axis': {'range': [0, 50]},
+            'bar': {'color': "darkblue"},
+            'steps': [
+                {'range': [0, 15], 'color': "green"},
+                {'range': [15, 30], 'color': "orange"},
+                {'range': [30, 50], 'color': "red"}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': 30
+            }
+        }
+    ))
+
+    fig.update_layout(height=300)
+    return fig
+
+
+figure_cache = FigureCache()
+figure_cache.register("risk_radar", _build_radar_template)
+figure_cache.register("risk_gauge", _build_gauge_template)
+
+
+class Visualization:
+    """可视化工具"""
+
+    @staticmethod
+    def _radar_data(risk_data: Dict) -> Tuple[Tuple[str, ...], Tuple[float, ...]]:
+        categories = tuple(factor["name"] for factor in risk_data.values())
+        values = tuple(factor["score"] for factor in risk_data.values())
+        return categories, values
+
+    @staticmethod
+    def create_risk_radar(risk_data: Dict) -> go.Figure:
+        """创建风险雷达图"""
+        categories, values = Visualization._radar_data(risk_data)
+
+        def patch(fig_dict: Dict[str, Any]) -> None:
+            trace = fig_dict["data"][0]
+            trace["r"] = list(values) + [values[0]]  # 闭合图形
+            trace["theta"] = list(categories) + [categories[0]]
+
+        return figure_cache.get("risk_radar", (categories, values), patch)
+
+    @staticmethod
+    def create_risk_gauge(overall_score: float) -> go.Figure:
+        """创建风险仪表盘"""
+        def patch(fig_dict: Dict[str, Any]) -> None:
+            fig_dict["data"][0]["value"] = overall_score
+
+        return figure_cache.get("risk_gauge", overall_score, patch)
+
+    @staticmethod
+    def risk_radar_bytes(risk_data: Dict, fmt: str = "json") -> bytes:
+        """雷达图的紧凑 JSON / PNG 字节，按数据缓存"""
+        data_key = Visualization._radar_data(risk_data)
+        return figure_cache.serialize(
+            "risk_radar", data_key, lambda: Visualization.create_risk_radar(risk_data), fmt
+        )
+
+    @staticmethod
+    def risk_gauge_bytes(overall_score: float, fmt: str = "json") -> bytes:
+        """仪表盘的紧凑 JSON / PNG 字节，按数据缓存"""
+        return figure_cache.serialize(
+            "risk_gauge", overall_score, lambda: Visualization.create_risk_gauge(overall_score), fmt
+        )
@@ -0,0 +1,11 @@
+"""
+测试环境：不写日志文件、不执行启动预热
+"""
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("FINRISK_LOG_DIR", "")
+os.environ.setdefault("FINRISK_WARMUP", "0")
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -0,0 +1,82 @@
+"""
+事件流水线测试：行情智能体只发布新 K 线，风险智能体增量重算并只推送变化的指标，报告智能体渲染并在风险升级时预警
+"""
+import asyncio
+
+import pandas as pd
+
+from agents.report_agent import ReportAgent
+from core.event_bus import MARKET_BAR, REPORT_READY, RISK_ALERT, RISK_METRICS, EventBus
+from core.price_store import synthetic_prices
+from core.system import FinRiskSystem
+
+
+class FakeFeed:
+    """每次拉取多返回一个交易日，返回的历史与真实数据源结构一致"""
+
+    def __init__(self, days=40):
+        dates, close, volume = synthetic_prices(["AAA"], days=days + 5, seed=3)
+        self.frame = pd.DataFrame({"Close": close[0], "Volume": volume[0]}, index=pd.DatetimeIndex(dates))
+        self.visible = days
+        self.calls = 0
+
+    def __call__(self, ticker, period, force_local=False):
+        self.calls += 1
+        return {"success": True, "history": self.frame.iloc[:self.visible], "info": {"longName": "Triple A"},
+                "source": "local_sim"}
+
+
+def test_pipeline_publishes_only_new_bars():
+    async def scenario():
+        system = FinRiskSystem()
+        feed = FakeFeed()
+        system.setup_pipeline(feed)
+        await system.initialize()
+        try:
+            with system.bus.subscribe(MARKET_BAR, RISK_METRICS, REPORT_READY) as sub:
+                first = await system.run("market", {"tickers": ["aaa"]})
+                again = await system.run("market", {"tickers": ["AAA"]})
+                feed.visible += 1
+                third = await system.run("market", {"tickers": ["AAA"]})
+                events = []
+                while len([e for e in events if e["topic"] == REPORT_READY]) < 2:
+                    events.append(await sub.get(timeout=5))
+        finally:
+            await system.shutdown()
+        return first, again, third, events, system.agents["risk"]
+
+    first, again, third, events, risk = asyncio.run(scenario())
+    assert (first, again, third) == ({"AAA": 40}, {"AAA": 0}, {"AAA": 1})
+    bars = [e["data"] for e in events if e["topic"] == MARKET_BAR]
+    assert [len(b["close"]) for b in bars] == [40, 1] and bars[0]["reset"] and not bars[1]["reset"]
+    assert len(risk.closes[("AAA", "1mo")]) == 41
+
+    metrics = [e["data"] for e in events if e["topic"] == RISK_METRICS]
+    assert set(metrics[0]["changed"]) >= {"current_price", "risk_score"}
+    assert "current_price" in metrics[1]["changed"]
+    assert metrics[1]["as_of"] == str(FakeFeed().frame.index[40].date())
+
+    report = [e["data"] for e in events if e["topic"] == REPORT_READY][-1]["report"]
+    assert "Triple A" in report and "41 个交易日" in report
+
+
+def test_report_agent_alerts_on_level_increase():
+    async def scenario():
+        bus = EventBus()
+        agent = ReportAgent(bus, alert_score_delta=1.0)
+        base = {"ticker": "AAA", "period": "1mo", "days": 30, "as_of": "2024-01-31"}
+        calm = {"risk_level": "低风险", "risk_score": 3.0, "current_price": 10.0}
+        with bus.subscribe(RISK_ALERT) as sub:
+            await agent.handle({"data": {**base, "metrics": calm, "previous": {}}})
+            await agent.handle({"data": {**base, "metrics": {**calm, "risk_score": 3.5}, "previous": calm}})
+            hot = {**calm, "risk_level": "高风险", "risk_score": 8.0}
+            await agent.handle({"data": {**base, "metrics": hot, "previous": calm}})
+            alert = await sub.get(timeout=1)
+            return alert, sub.queue.qsize(), bus.latest(REPORT_READY, "AAA")
+
+    alert, remaining, report = asyncio.run(scenario())
+    # 首次（无历史）与小幅变化不预警，等级上升 + 评分大幅变化只发一条
+    assert remaining == 0
+    assert alert["data"]["ticker"] == "AAA"
+    assert alert["data"]["reasons"] == ["风险等级由低风险升至高风险", "风险评分由 3.0 变为 8.0"]
+    assert "8.0/10" in report["data"]["report"]
@@ -0,0 +1,131 @@
+"""
+预警引擎测试：边沿触发、恢复后重新触发、通配规则，以及共享价格矩阵驱动的增量求值
+"""
+import asyncio
+
+import numpy as np
+
+from core.alerts import AlertEngine
+from core.event_bus import EventBus
+from core.metric_stream import MetricStreamHub
+from core.price_store import synthetic_prices
+from core.price_watcher import PriceWatcher
+
+
+def fired_rules(alerts):
+    return sorted((a["rule_id"], a["ticker"]) for a in alerts)
+
+
+def test_edge_triggered_once_while_condition_holds():
+    engine = AlertEngine()
+    engine.add_rule("vol", ">", 0.4, ticker="AAPL", rule_id="hi-vol")
+
+    assert engine.update("AAPL", {"volatility_annual": 0.3}) == []
+    alerts = engine.update("AAPL", {"volatility_annual": 0.5})
+    assert fired_rules(alerts) == [("hi-vol", "AAPL")]
+    assert alerts[0]["value"] == 0.5
+    # 条件持续满足时不重复触发
+    assert engine.update("AAPL", {"volatility_annual": 0.6}) == []
+    assert len(engine.recent("AAPL")) == 1
+
+
+def test_rearms_after_condition_clears():
+    engine = AlertEngine()
+    engine.add_rule("drawdown", "<", -0.2, ticker="MSFT", rule_id="dd")
+
+    assert len(engine.update("MSFT", {"max_drawdown": -0.25})) == 1
+    assert engine.update("MSFT", {"max_drawdown": -0.1}) == []
+    assert len(engine.update("MSFT", {"max_drawdown": -0.3})) == 1
+
+
+def test_condition_met_before_registration_does_not_fire():
+    engine = AlertEngine()
+    engine.update("AAPL", {"volatility_annual": 0.5})
+    engine.add_rule("vol", ">", 0.4, ticker="AAPL")
+
+    assert engine.update("AAPL", {"volatility_annual": 0.55}) == []
+
+
+def test_unchanged_metrics_are_not_evaluated():
+    engine = AlertEngine()
+    engine.add_rule("score", ">=", 7, ticker="AAPL", rule_id="score")
+    engine.update("AAPL", {"risk_score": 5.0, "volatility_annual": 0.2})
+
+    assert engine.update("AAPL", {"risk_score": 8.0}, changed=["volatility_annual"]) == []
+    assert len(engine.update("AAPL", {"risk_score": 8.0}, changed=["risk_score"])) == 1
+
+
+def test_wildcard_prefix_fires_only_crossed_thresholds():
+    engine = AlertEngine()
+    engine.add_rule("vol", ">", 0.2, rule_id="vol-20")
+    engine.add_rule("vol", ">", 0.4, rule_id="vol-40")
+    engine.add_rule("vol", ">", 0.6, rule_id="vol-60")
+
+    alerts = engine.update_batch(["AAPL", "TSLA"], {"volatility_annual": [0.3, 0.7]})
+    assert fired_rules(alerts) == [("vol-20", "AAPL"), ("vol-20", "TSLA"),
+                                   ("vol-40", "TSLA"), ("vol-60", "TSLA")]
+
+    # AAPL 越过 0.4 只触发 vol-40；TSLA 回落到 0.5 后 vol-60 恢复，再次越过时重新触发
+    alerts = engine.update_batch(["AAPL", "TSLA"], {"volatility_annual": [0.45, 0.5]})
+    assert fired_rules(alerts) == [("vol-40", "AAPL")]
+    alerts = engine.update_batch(["TSLA"], {"volatility_annual": [0.65]})
+    assert fired_rules(alerts) == [("vol-60", "TSLA")]
+
+
+def test_wildcard_suffix_and_nan():
+    engine = AlertEngine()
+    engine.add_rule("sharpe", "<", 0.0, rule_id="neg")
+    engine.add_rule("sharpe", "<", -1.0, rule_id="very-neg")
+
+    assert fired_rules(engine.update("AAPL", {"sharpe_ratio": -0.5})) == [("neg", "AAPL")]
+    # NaN 不满足任何规则，恢复后可再次触发
+    assert engine.update("AAPL", {"sharpe_ratio": float("nan")}) == []
+    assert fired_rules(engine.update("AAPL", {"sharpe_ratio": -2.0})) == [("neg", "AAPL"), ("very-neg", "AAPL")]
+
+
+class _Prices:
+    """SharedPriceReader 的替身：version 与 snapshot() 返回的存储"""
+
+    def __init__(self):
+        self.version = 0
+        self.store = None
+
+    def publish(self, tickers, dates, close, volume):
+        self.version += 1
+        self.store = type("Store", (), {"tickers": tickers, "dates": dates, "close": close, "volume": volume})
+
+    def snapshot(self):
+        return self.store
+
+
+class _System:
+    def __init__(self):
+        self.prices = _Prices()
+        self.alerts = AlertEngine()
+        self.bus = EventBus()
+        self.stream = MetricStreamHub()
+
+
+def test_price_watcher_feeds_alert_engine():
+    system = _System()
+    watcher = PriceWatcher(system)
+    tickers = ["AAA", "BBB"]
+    dates, close, volume = synthetic_prices(tickers, days=60)
+    system.alerts.add_rule("price", ">", float(close[0, -1]) * 1.5, rule_id="spike")
+
+    async def run():
+        assert await watcher.check() is False
+        system.prices.publish(tickers, dates, close, volume)
+        assert await watcher.check() is True
+        # 版本未变化时不重算
+        assert await watcher.check() is False
+
+        spiked = close.copy()
+        spiked[0, -1] *= 2
+        system.prices.publish(tickers, dates, spiked, volume)
+        assert await watcher.check() is True
+
+    asyncio.run(run())
+    assert fired_rules(system.alerts.recent()) == [("spike", "AAA")]
+    assert watcher.version == 2
+    assert np.isclose(system.alerts.recent()[0]["value"], close[0, -1] * 2)
@@ -0,0 +1,65 @@
+"""
+Arrow 输出测试：按 Accept 的 q 值协商、批量风险接口的 Arrow 与 JSON 结果一致
+"""
+import numpy as np
+import pyarrow as pa
+import pytest
+from starlette.requests import Request
+
+from api.arrow_format import ARROW_STREAM_MEDIA_TYPE, wants_arrow
+from core.price_store import synthetic_prices
+from core.shared_prices import SharedPricePublisher, shared_prices
+
+TICKERS = ["AAA", "BBB", "CCC"]
+
+
+def request_with(accept):
+    return Request({"type": "http", "headers": [(b"accept", accept.encode())]})
+
+
+@pytest.mark.parametrize("accept,expected", [
+    (ARROW_STREAM_MEDIA_TYPE, True),
+    (f"application/json, {ARROW_STREAM_MEDIA_TYPE}", True),
+    (f"{ARROW_STREAM_MEDIA_TYPE};q=0.5, application/json", False),
+    (f"{ARROW_STREAM_MEDIA_TYPE}, application/json;q=0.5", True),
+    (f"{ARROW_STREAM_MEDIA_TYPE};q=0", False),
+    (f"{ARROW_STREAM_MEDIA_TYPE};q=0.8, */*;q=0.9", False),
+    (f"{ARROW_STREAM_MEDIA_TYPE};q=0.8, application/*;q=0.5, */*", True),
+    ("*/*", False),
+    ("", False),
+])
+def test_accept_negotiation(accept, expected):
+    assert wants_arrow(request_with(accept)) is expected
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from api.main import app
+
+    monkeypatch.setattr(shared_prices, "root", tmp_path)
+    monkeypatch.setattr(shared_prices, "check_interval", 0.0)
+    monkeypatch.setattr(shared_prices, "version", 0)
+    monkeypatch.setattr(shared_prices, "_store", None)
+    monkeypatch.setenv("FINRISK_PRICE_WATCH_INTERVAL", "0")
+    SharedPricePublisher(tmp_path).publish(TICKERS, *synthetic_prices(TICKERS, days=60))
+    with TestClient(app) as client:
+        yield client
+
+
+def test_batch_risk_arrow_matches_json(client):
+    body = {"symbols": ["ccc", "AAA", "ZZZ"]}
+    as_json = client.post("/api/risk/batch", json=body).json()
+    response = client.post("/api/risk/batch", json=body, headers={"Accept": ARROW_STREAM_MEDIA_TYPE})
+    assert response.headers["content-type"] == ARROW_STREAM_MEDIA_TYPE
+
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column("ticker").to_pylist() == ["CCC", "AAA"]
+    assert pa.types.is_dictionary(table.schema.field("risk_level").type)
+    assert table.schema.metadata[b"missing"] == b'["ZZZ"]'
+    assert as_json["missing"] == ["ZZZ"]
+    for i, ticker in enumerate(["CCC", "AAA"]):
+        expected = as_json["results"][ticker]
+        assert table.column("risk_level")[i].as_py() == expected["risk_level"]
+        np.testing.assert_allclose(table.column("volatility_annual")[i].as_py(), expected["volatility_annual"])
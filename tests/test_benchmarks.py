@@ -0,0 +1,41 @@
+"""
+基准套件测试：用例跳过/失败的记录方式、按中位数对比两次结果时的回归判定
+"""
+from benchmarks.registry import Benchmark, SkipBenchmark
+from benchmarks.suite import compare, run_benchmark
+
+
+def result(median, status="ok"):
+    return {"status": status, "stats": {"median": median}} if status == "ok" else {"status": status}
+
+
+def test_run_benchmark_statuses():
+    calls = []
+
+    def setup_ok(scale):
+        return (lambda: scale.tickers), lambda: calls.append("teardown")
+
+    def setup_skip(scale):
+        raise SkipBenchmark("缺少依赖")
+
+    def setup_fail(scale):
+        def func():
+            raise RuntimeError("boom")
+        return func
+
+    ok = run_benchmark(Benchmark("g", "ok", setup_ok), "small", repeat=2, min_time=0.001)
+    assert ok["status"] == "ok" and ok["stats"]["repeat"] == 2 and ok["stats"]["min"] <= ok["stats"]["max"]
+    assert calls == ["teardown"]
+    assert run_benchmark(Benchmark("g", "skip", setup_skip), "small", 2, 0.001)["reason"] == "缺少依赖"
+    failed = run_benchmark(Benchmark("g", "fail", setup_fail), "small", 2, 0.001)
+    assert failed["status"] == "failed" and failed["reason"] == "RuntimeError: boom"
+
+
+def test_compare_flags_regressions_only_beyond_threshold():
+    base = {"results": {"a": result(1.0), "b": result(1.0), "c": result(1.0), "d": result(1.0)}}
+    new = {"results": {"a": result(1.3), "b": result(1.1), "c": result(0.5), "d": result(None, "skipped"),
+                       "e": result(1.0)}}
+    lines, regressions = compare(base, new, threshold=1.2)
+    assert regressions == ["a"]
+    assert len(lines) == 3
+    assert lines[0].endswith("变慢") and lines[2].endswith("变快")
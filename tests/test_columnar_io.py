@@ -0,0 +1,56 @@
+"""
+列类型压缩测试：样本推断的 dtype 与整表读取后压缩的结果一致，float32 只在全量往返校验通过时使用
+"""
+import numpy as np
+import pandas as pd
+
+from src.modules.columnar_io import downcast_dtypes, read_csv_optimized
+
+
+def write_csv(path, rows=200):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=rows).strftime("%Y-%m-%d"),
+        "ticker": np.array(["AAPL", "MSFT", "NVDA", "TSLA"])[np.arange(rows) % 4],
+        "price": np.round(rng.uniform(10, 500, rows), 2),
+        "volume": rng.integers(0, 30000, rows),
+        "note": [f"n{i}" for i in range(rows)],
+    })
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_sampled_read_matches_full_downcast(tmp_path):
+    path = tmp_path / "prices.csv"
+    write_csv(path)
+
+    sampled = read_csv_optimized(str(path), sample_rows=20)
+    full = downcast_dtypes(pd.read_csv(path))
+
+    assert isinstance(sampled["ticker"].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(sampled["date"])
+    assert sampled["price"].dtype == np.float32
+    assert sampled["volume"].dtype == np.int16
+    assert not isinstance(sampled["note"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(sampled, full, check_categorical=False)
+
+
+def test_float32_needs_full_roundtrip(tmp_path):
+    path = tmp_path / "prices.csv"
+    df = write_csv(path)
+    # 样本之外的一个值超出 float32 范围，整列保留 float64
+    df.loc[150, "price"] = 1e40
+    df.to_csv(path, index=False)
+
+    result = read_csv_optimized(str(path), sample_rows=20)
+    assert result["price"].dtype == np.float64
+    assert result["price"].iloc[150] == 1e40
+
+
+def test_usecols_and_small_file(tmp_path):
+    path = tmp_path / "prices.csv"
+    write_csv(path, rows=10)
+
+    result = read_csv_optimized(str(path), usecols=["ticker", "price"])
+    assert list(result.columns) == ["ticker", "price"]
+    assert isinstance(result["ticker"].dtype, pd.CategoricalDtype)
@@ -0,0 +1,78 @@
+"""
+压缩中间件测试：小于阈值的响应不压缩、按 Accept-Encoding 选择编码、流式响应逐块可解码、跳过已压缩类型
+"""
+import asyncio
+import gzip
+import zlib
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response
+from fastapi.testclient import TestClient
+
+from api.compression import CompressionMiddleware, _parse_accept_encoding
+
+PAYLOAD = "风险指标," * 500
+
+
+def make_client():
+    app = FastAPI()
+
+    @app.get("/text")
+    def text(size: int):
+        return PlainTextResponse(PAYLOAD[:size])
+
+    @app.get("/pdf")
+    def pdf():
+        return Response(b"%PDF" * 1000, media_type="application/pdf")
+
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    return TestClient(app)
+
+
+def test_threshold():
+    client = make_client()
+    small = client.get("/text", params={"size": 300}, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert int(small.headers["content-length"]) == len(PAYLOAD[:300].encode())
+
+    large = client.get("/text", params={"size": 2000}, headers={"Accept-Encoding": "gzip"})
+    assert large.headers["content-encoding"] == "gzip"
+    assert large.headers["vary"] == "Accept-Encoding"
+    assert large.text == PAYLOAD[:2000]
+
+
+def test_encoding_negotiation():
+    client = make_client()
+    plain = client.get("/text", params={"size": 2000}, headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert "content-encoding" not in plain.headers
+    assert _parse_accept_encoding("br;q=0.5, gzip, x;q=bad") == {"br": 0.5, "gzip": 1.0, "x": 0.0}
+    skipped = client.get("/pdf", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in skipped.headers
+
+
+def test_streaming_chunks_decode_incrementally():
+    async def streaming_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"text/plain; charset=utf-8")]})
+        for _ in range(5):
+            await send({"type": "http.response.body", "body": PAYLOAD.encode(), "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+    asyncio.run(CompressionMiddleware(streaming_app)(scope, None, send))
+
+    start, bodies = sent[0], [m["body"] for m in sent[1:]]
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip" and b"content-length" not in headers
+    assert len(bodies) == 6
+    # 中间块以 Z_SYNC_FLUSH 结尾，收到即可解码，不会被缓冲到响应结束
+    decoder = zlib.decompressobj(31)
+    for body in bodies[:-1]:
+        assert body.endswith(b"\x00\x00\xff\xff")
+        assert decoder.decompress(body).decode() == PAYLOAD
+    assert gzip.decompress(b"".join(bodies)).decode() == PAYLOAD * 5
@@ -0,0 +1,113 @@
+"""
+流式统计测试：分块合并结果与整表 pandas 统计一致；草图模式的估计落在声明的误差界内
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.modules.data_stats import HashDistinctCounter, compute_streaming_stats
+from src.modules.sketches import CountMinSketch, HyperLogLog, KLLSketch
+
+
+@pytest.fixture
+def upload(tmp_path):
+    rng = np.random.default_rng(0)
+    rows = 5000
+    df = pd.DataFrame({
+        "ticker": rng.choice(["AAPL", "MSFT", "NVDA", "TSLA", "AMZN"], rows, p=[0.5, 0.2, 0.1, 0.1, 0.1]),
+        "price": rng.normal(100, 15, rows).round(2),
+        "volume": rng.integers(0, 1000, rows).astype(float),
+    })
+    df.loc[::97, "price"] = np.nan
+    df = pd.concat([df, df.iloc[:250]], ignore_index=True)
+    path = tmp_path / "upload.csv"
+    df.to_csv(path, index=False)
+    return str(path), df
+
+
+def test_chunked_stats_match_pandas(upload):
+    path, df = upload
+    result = compute_streaming_stats(path, chunksize=333).result("upload.csv")
+
+    assert result["rows"] == len(df)
+    assert result["missing_values"] == int(df.isnull().sum().sum())
+    assert result["duplicates"] == int(df.duplicated().sum())
+    assert result["duplicates_exact"]
+    assert result["distinct_counts"]["ticker"] == 5
+    expected = df.describe()
+    for col in ("price", "volume"):
+        stats = result["numeric_stats"][col]
+        assert stats["count"] == expected.loc["count", col]
+        assert stats["mean"] == pytest.approx(round(expected.loc["mean", col], 2), abs=0.011)
+        assert stats["std"] == pytest.approx(round(expected.loc["std", col], 2), abs=0.011)
+        assert stats["min"] == expected.loc["min", col] and stats["max"] == expected.loc["max", col]
+
+
+def test_sketch_mode_within_error_bounds(upload):
+    path, df = upload
+    result = compute_streaming_stats(path, chunksize=500, sketch=True).result("upload.csv")
+    bounds = result["error_bounds"]
+
+    distinct = len(df) - int(df.duplicated().sum())
+    assert abs(result["duplicates"] - int(df.duplicated().sum())) <= 4 * bounds["duplicates_abs_std_error"] + 1
+    assert abs(result["distinct_counts"]["price"] - df["price"].nunique(dropna=False)) <= \
+        4 * bounds["distinct_relative_std_error"] * distinct
+
+    counts = df["ticker"].value_counts()
+    top = result["top_values"]["ticker"]
+    assert top[0]["value"] == "AAPL"
+    for item in top:
+        true = counts[item["value"]]
+        assert true <= item["count"] <= true + bounds["top_values_overcount_max"]
+
+    prices = df["price"].dropna()
+    for q in ("25%", "50%", "75%"):
+        rank = (prices <= result["numeric_stats"]["price"][q]).mean()
+        assert abs(rank - float(q[:-1]) / 100) <= 2 * bounds["quantile_rank_error"]
+
+
+def test_hyperloglog_relative_error():
+    hashes = pd.util.hash_array(np.arange(200_000))
+    hll = HyperLogLog()
+    for part in np.array_split(hashes, 7):
+        hll.update(part)
+    assert abs(hll.estimate() - 200_000) <= 4 * hll.relative_error * 200_000
+
+    other = HyperLogLog()
+    other.update(pd.util.hash_array(np.arange(100_000, 300_000)))
+    hll.merge(other)
+    assert abs(hll.estimate() - 300_000) <= 4 * hll.relative_error * 300_000
+
+
+def test_kll_rank_error_and_memory():
+    values = np.random.default_rng(1).permutation(100_000).astype(float)
+    sketch = KLLSketch(seed=1)
+    for part in np.array_split(values, 50):
+        sketch.update(part)
+
+    assert len(sketch) < 2000
+    qs = (0.01, 0.1, 0.5, 0.9, 0.99)
+    for q, estimate in zip(qs, sketch.quantiles(qs)):
+        assert abs(estimate / len(values) - q) <= sketch.rank_error
+    assert sketch.quantiles((0, 1)) == [0.0, 99_999.0]
+
+
+def test_count_min_never_undercounts():
+    rng = np.random.default_rng(2)
+    values = rng.zipf(1.5, 50_000) % 5000
+    cms = CountMinSketch(width=512, depth=4)
+    for part in np.array_split(values, 10):
+        cms.update(part, pd.util.hash_array(part))
+
+    counts = pd.Series(values).value_counts()
+    top = cms.top(5)
+    assert [item["value"] for item in top[:3]] == counts.index[:3].tolist()
+    for item in top:
+        assert counts[item["value"]] <= item["count"] <= counts[item["value"]] + cms.error_bound
+
+
+def test_distinct_counter_switches_to_kmv():
+    counter = HashDistinctCounter(exact_limit=1000, k=1024)
+    counter.update(pd.util.hash_array(np.arange(50_000)))
+    assert not counter.is_exact
+    assert abs(counter.estimate() - 50_000) <= 4 * counter.relative_error * 50_000
@@ -0,0 +1,89 @@
+"""
+异步日志测试：调用方不等待 I/O、按级别分流到控制台/文件、JSON 格式、模块级别过滤、积压上限
+"""
+import io
+import json
+import time
+
+import pytest
+from loguru import logger
+
+from utils import logger as log_module
+from utils.logger import AsyncLogSink, _ModuleLevels
+
+
+class SlowConsole(io.StringIO):
+    def write(self, text):
+        time.sleep(0.2)
+        return super().write(text)
+
+
+@pytest.fixture
+def capture():
+    sinks, handlers = [], []
+
+    def attach(sink, **kwargs):
+        sinks.append(sink)
+        handlers.append(logger.add(sink.write, level="DEBUG", format="{message}", **kwargs))
+        return sink
+
+    yield attach
+    for handler in handlers:
+        logger.remove(handler)
+    for sink in sinks:
+        sink.close()
+
+
+def test_caller_does_not_wait_for_io(capture):
+    console = SlowConsole()
+    sink = capture(AsyncLogSink(console, "", console_level="INFO"))
+
+    started = time.perf_counter()
+    for i in range(20):
+        logger.info(f"slow {i}")
+    assert time.perf_counter() - started < 0.1
+
+    sink.flush(timeout=5)
+    assert console.getvalue().count("slow") == 20
+
+
+def test_levels_split_between_console_and_json_file(capture, tmp_path):
+    console = io.StringIO()
+    sink = capture(AsyncLogSink(console, str(tmp_path), fmt="json", console_level="WARNING", file_level="DEBUG"))
+
+    logger.bind(module="demo").debug("细节")
+    logger.warning("告警")
+    sink.flush()
+    sink.close()
+
+    assert "告警" in console.getvalue() and "细节" not in console.getvalue()
+    (log_file,) = tmp_path.glob("finrisk_*.log")
+    records = [json.loads(line) for line in log_file.read_text(encoding="utf-8").splitlines()]
+    assert [r["message"] for r in records] == ["细节", "告警"]
+    assert records[0]["level"] == "DEBUG" and records[0]["extra"] == {"module": "demo"}
+
+
+def test_module_levels_filter(capture):
+    levels = _ModuleLevels()
+    levels.parse("core=WARNING,core.scheduler=DEBUG")
+    console = io.StringIO()
+    sink = capture(AsyncLogSink(console, "", console_level="DEBUG"), filter=levels)
+
+    logger.bind(module="core.alerts").info("alerts-info")
+    logger.bind(module="core.alerts").error("alerts-error")
+    logger.bind(module="core.scheduler").debug("scheduler-debug")
+    logger.bind(module="api").debug("api-debug")
+    sink.flush()
+
+    output = console.getvalue()
+    assert "alerts-info" not in output
+    assert all(text in output for text in ("alerts-error", "scheduler-debug", "api-debug"))
+
+
+def test_backlog_limit_drops(capture, monkeypatch):
+    monkeypatch.setattr(log_module, "MAX_BACKLOG", 0)
+    console = io.StringIO()
+    sink = capture(AsyncLogSink(console, ""))
+    logger.info("dropped")
+    assert sink.stats()["dropped"] == 1
+    assert sink.enqueued == 0
@@ -0,0 +1,74 @@
+"""
+实时指标推送测试：API 进程由共享价格矩阵的新版本驱动 WebSocket 推送
+"""
+import pytest
+
+from core.metric_stream import MetricStreamHub
+from core.price_store import synthetic_prices
+from core.shared_prices import SharedPricePublisher, shared_prices
+
+TICKERS = ["AAA", "BBB", "CCC"]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from api.main import app
+
+    # 共享价格矩阵指向临时目录，每次请求都检查新版本
+    monkeypatch.setattr(shared_prices, "root", tmp_path)
+    monkeypatch.setattr(shared_prices, "check_interval", 0.0)
+    monkeypatch.setattr(shared_prices, "version", 0)
+    monkeypatch.setattr(shared_prices, "_store", None)
+    monkeypatch.setenv("FINRISK_PRICE_WATCH_INTERVAL", "0.05")
+    with TestClient(app) as client:
+        yield client
+
+
+def receive_metrics(ws, ticker, max_messages=100):
+    """读取消息直到收到包含 ticker 的 metrics 帧"""
+    for _ in range(max_messages):
+        message = ws.receive_json()
+        if message["type"] == "metrics" and ticker in message["updates"]:
+            return message["updates"][ticker]
+    raise AssertionError(f"未收到 {ticker} 的 metrics 帧")
+
+
+def test_websocket_receives_metrics_from_shared_prices(client, tmp_path):
+    publisher = SharedPricePublisher(tmp_path)
+    dates, close, volume = synthetic_prices(TICKERS, days=60)
+    publisher.publish(TICKERS, dates, close, volume)
+
+    with client.websocket_connect("/api/ws/metrics?interval=0.05") as ws:
+        ws.send_json({"action": "subscribe", "tickers": ["AAA"]})
+        update = receive_metrics(ws, "AAA")
+        assert update["period"] == "shared"
+        assert update["metrics"]["current_price"] == pytest.approx(close[0, -1])
+
+        # 新版本只推送发生变化的指标
+        close = close.copy()
+        close[0, -1] *= 1.1
+        publisher.publish(TICKERS, dates, close, volume)
+        update = receive_metrics(ws, "AAA")
+        assert update["metrics"]["current_price"] == pytest.approx(close[0, -1])
+        assert "previous_close" not in update["metrics"]
+
+
+def test_coalescing_does_not_leak_between_clients():
+    hub = MetricStreamHub()
+    fast, slow = hub.connect(["AAA"]), hub.connect(["AAA"])
+
+    hub.publish("AAA", {"current_price": 10.0, "volatility_annual": 0.2})
+    frame = fast.take_frame()
+    sent = frame["updates"]["AAA"]["metrics"]
+
+    # slow 尚未取帧，后续增量在它的缓冲里合并，不能改写 fast 已取出（可能正在序列化）的帧
+    hub.publish("AAA", {"current_price": 11.0}, changed=["current_price"])
+    hub.publish("AAA", {"beta": 1.5}, changed=["beta"])
+    assert sent == {"current_price": 10.0, "volatility_annual": 0.2}
+    assert fast.take_frame()["updates"]["AAA"]["metrics"] == {"current_price": 11.0, "beta": 1.5}
+    assert slow.take_frame()["updates"]["AAA"]["metrics"] == {
+        "current_price": 11.0, "volatility_annual": 0.2, "beta": 1.5
+    }
+    assert slow.coalesced == 2
@@ -0,0 +1,63 @@
+"""
+指标测试：直方图分位数估算与 Prometheus 文本格式、阶段计时装饰器、/metrics 按路由模板记录请求
+"""
+import pytest
+
+from utils.metrics import HTTP_SECONDS, MetricsRegistry, STAGE_ERRORS, STAGE_SECONDS, timed
+
+
+def test_histogram_summary_and_render():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("demo_seconds", "演示", ("op",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.05, 0.5, 2.0):
+        histogram.observe(value, op='a"b')
+
+    summary = histogram.summary(op='a"b')
+    assert summary["count"] == 4 and summary["max"] == 2.0
+    assert summary["p50"] == pytest.approx(0.1)
+    assert summary["p95"] == 1.0
+    assert histogram.summary(op="none")["count"] == 0
+
+    text = registry.render()
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{op="a\\"b",le="0.1"} 2' in text
+    assert 'demo_seconds_bucket{op="a\\"b",le="+Inf"} 4' in text
+    assert 'demo_seconds_count{op="a\\"b"} 4' in text
+
+    assert registry.histogram("demo_seconds", "演示") is histogram
+    with pytest.raises(ValueError):
+        registry.counter("demo_seconds", "演示")
+
+
+def test_timed_records_duration_and_errors():
+    @timed("compute", "test_op")
+    def work(fail=False):
+        if fail:
+            raise RuntimeError("boom")
+        return 42
+
+    before = STAGE_SECONDS.summary(stage="compute", operation="test_op")["count"]
+    errors = STAGE_ERRORS.value(stage="compute", operation="test_op")
+    assert work() == 42
+    with pytest.raises(RuntimeError):
+        work(fail=True)
+    assert STAGE_SECONDS.summary(stage="compute", operation="test_op")["count"] == before + 2
+    assert STAGE_ERRORS.value(stage="compute", operation="test_op") == errors + 1
+
+
+def test_metrics_endpoint_uses_route_templates():
+    from fastapi.testclient import TestClient
+
+    from api.main import app
+
+    client = TestClient(app)
+    client.get("/api/reports/does-not-exist")
+    client.get("/no/such/path")
+    labels = set(HTTP_SECONDS.label_values())
+    assert ("GET", "/api/reports/{job_id}", "404") in labels
+    assert ("GET", "unmatched", "404") in labels
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="/api/reports/{job_id}"' in response.text
+    assert 'route="/metrics"' not in response.text
@@ -0,0 +1,87 @@
+"""
+组合历史测试：追加与视图隔离、日期窗口、重采样与 pandas 结果一致、float32 精度上界、导出跨度校验
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.modules.portfolio_history import MAX_SAMPLE_DAYS, PortfolioHistory, generate_sample_history
+
+
+def test_append_grows_and_keeps_order():
+    history = PortfolioHistory()
+    for i in range(40):
+        history.append(np.datetime64('2024-01-01') + i, portfolio_value=100.0 + i, risk_score=5.0)
+
+    assert len(history) == 40
+    assert history.column('portfolio_value')[-1] == 139.0
+    assert np.isnan(history.column('stocks')).all()
+    with pytest.raises(ValueError):
+        history.append('2024-01-05', portfolio_value=1.0)
+    with pytest.raises(KeyError):
+        history.append('2024-03-01', unknown=1.0)
+
+
+def test_window_is_view_and_append_copies():
+    history = generate_sample_history(seed=1)
+    window = history.window('2023-03-01', '2023-03-31')
+
+    assert len(window) == 31
+    assert str(window.dates[0]) == '2023-03-01' and str(window.dates[-1]) == '2023-03-31'
+    assert np.shares_memory(window.values, history.values)
+
+    tail = history.tail(3)
+    tail.append('2024-01-01', portfolio_value=1.0)
+    assert len(history) == 365
+    assert len(generate_sample_history(seed=1)) == 365
+
+
+@pytest.mark.parametrize("freq,rule", [('M', 'ME'), ('W', 'W-SUN'), ('Y', 'YE')])
+def test_resample_matches_pandas(freq, rule):
+    history = generate_sample_history(seed=2)
+    df = history.to_dataframe().set_index('date')
+
+    last = history.resample(freq, 'last').to_dataframe()
+    mean = history.resample(freq, 'mean').to_dataframe()
+    expected_last = df.resample(rule).last()
+    expected_mean = df.astype(np.float64).resample(rule).mean()
+
+    np.testing.assert_array_equal(last['risk_score'].to_numpy(), expected_last['risk_score'].to_numpy())
+    np.testing.assert_allclose(mean['stocks'].to_numpy(), expected_mean['stocks'].to_numpy(), rtol=1e-6)
+    assert len(last) == len(expected_last)
+
+
+def test_float32_relative_error_bound():
+    history = generate_sample_history(seed=3, end='2023-12-31')
+    rng = np.random.default_rng(3)
+    exact = rng.normal(1000000, 50000, 365).cumsum()
+
+    stored = history.column('portfolio_value').astype(np.float64)
+    assert np.all(np.abs(stored - exact) <= np.abs(exact) * 2.0 ** -24)
+    assert pd.api.types.is_datetime64_any_dtype(history.to_dataframe()['date'])
+
+
+@pytest.mark.parametrize("start,end", [('2023-01-01', '2099-12-31'), ('2023-12-31', '2023-01-01'), ('x', '2023-01-01')])
+def test_sample_history_rejects_bad_spans(start, end):
+    with pytest.raises(ValueError):
+        generate_sample_history(seed=1, start=start, end=end)
+    assert MAX_SAMPLE_DAYS >= 50 * 365
+
+
+def test_export_endpoint_validates_span():
+    from fastapi.testclient import TestClient
+
+    from api.main import app
+
+    client = TestClient(app)
+    response = client.get("/api/portfolio/history/export",
+                          params={"seed": 1, "start": "0001-01-01", "end": "9999-12-31"})
+    assert response.status_code == 400
+    assert "跨度" in response.json()["error"]
+
+    response = client.get("/api/portfolio/history/export",
+                          params={"seed": 1, "start": "2023-01-01", "end": "2023-03-31", "freq": "M"})
+    assert response.status_code == 200
+    lines = response.text.strip().split("\n")
+    assert lines[0].startswith("date,portfolio_value")
+    assert [line.split(",")[0] for line in lines[1:]] == ["2023-01-31", "2023-02-28", "2023-03-31"]
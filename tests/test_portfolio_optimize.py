@@ -0,0 +1,69 @@
+"""
+组合优化端点测试：读取预热缓存的收益率/协方差，价格版本变化后改为现算
+"""
+import numpy as np
+import pytest
+
+from core import warmup
+from core.price_store import synthetic_prices
+from core.shared_prices import SharedPricePublisher, shared_prices
+from core.system import system
+from core.warmup import WarmupConfig
+
+TICKERS = ["AAPL", "GOOGL", "MSFT", "TSLA"]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from api.main import app
+
+    monkeypatch.setattr(shared_prices, "root", tmp_path)
+    monkeypatch.setattr(shared_prices, "check_interval", 0.0)
+    monkeypatch.setattr(shared_prices, "version", 0)
+    monkeypatch.setattr(shared_prices, "_store", None)
+    monkeypatch.setenv("FINRISK_PRICE_WATCH_INTERVAL", "0")
+    monkeypatch.setattr(system, "data_cache", {})
+    with TestClient(app) as client:
+        yield client
+
+
+def test_optimize_reads_warmed_covariance(client, tmp_path, monkeypatch):
+    publisher = SharedPricePublisher(tmp_path)
+    publisher.publish(TICKERS, *synthetic_prices(TICKERS, days=300))
+    warmup.run_warmup(system, WarmupConfig(steps=("covariance",), universe=TICKERS))
+
+    calls = []
+    original = warmup.covariance
+    monkeypatch.setattr(warmup, "covariance", lambda returns: calls.append(returns.shape) or original(returns))
+
+    params = {"assets": ["MSFT", "AAPL"], "risk_tolerance": 0.5}
+    result = client.get("/api/portfolio/optimize", params=params).json()
+    assert calls == []
+    assert list(result["optimal_weights"]) == ["MSFT", "AAPL"]
+    assert sum(result["optimal_weights"].values()) == pytest.approx(1.0, abs=1e-3)
+    assert result["price_version"] == 1 and result["window"] == 252
+
+    # 新版本发布后缓存过期，按价格矩阵现算
+    publisher.publish(TICKERS, *synthetic_prices(TICKERS, days=300, seed=7))
+    result = client.get("/api/portfolio/optimize", params=params).json()
+    assert calls == [(2, 252)]
+    assert result["price_version"] == 2
+
+
+def test_optimize_unknown_asset(client, tmp_path):
+    SharedPricePublisher(tmp_path).publish(TICKERS, *synthetic_prices(TICKERS, days=60))
+    response = client.get("/api/portfolio/optimize", params={"assets": ["AAPL", "NOPE"]})
+    assert response.status_code == 404
+    assert "NOPE" in response.json()["error"]
+
+
+def test_optimize_weights_long_only():
+    from src.modules.portfolio_optimizer import optimize_weights
+
+    cov = np.diag([0.0001, 0.0004])
+    weights = optimize_weights(np.array([0.0005, -0.001]), cov, 1.0)
+    assert weights == pytest.approx([1.0, 0.0])
+    weights = optimize_weights(np.array([0.0005, -0.001]), cov, 0.0)
+    assert weights == pytest.approx([0.8, 0.2])
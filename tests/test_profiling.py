@@ -0,0 +1,51 @@
+"""
+请求剖析测试：只有带正确令牌的请求能触发剖析和读取结果，未配置令牌时均不开放
+"""
+import pytest
+
+from utils.profiling import ProfileConfig, profile_config
+
+TOKEN = "s3cret"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from api.main import app
+
+    monkeypatch.setattr(profile_config, "token", TOKEN)
+    monkeypatch.setattr(profile_config, "trigger", True)
+    monkeypatch.setattr(profile_config, "directory", "")
+    return TestClient(app)
+
+
+def test_trigger_requires_matching_token():
+    assert not ProfileConfig().triggered("1")
+    config = ProfileConfig(token=TOKEN)
+    assert config.triggered(TOKEN)
+    assert not config.triggered("1")
+    assert not config.triggered(None)
+    assert not ProfileConfig(token=TOKEN, trigger=False).triggered(TOKEN)
+    # 关闭请求触发不影响读取授权
+    assert ProfileConfig(token=TOKEN, trigger=False).authorized(TOKEN)
+
+
+def test_profile_roundtrip_with_token(client):
+    assert "x-profile-id" not in client.get("/health", headers={"X-Profile": "wrong"}).headers
+
+    response = client.get("/health", headers={"X-Profile": TOKEN})
+    profile_id = response.headers["x-profile-id"]
+
+    assert client.get("/api/profiles").status_code == 403
+    assert client.get(f"/api/profiles/{profile_id}", params={"profile": "wrong"}).status_code == 403
+
+    listed = client.get("/api/profiles", headers={"X-Profile": TOKEN}).json()["profiles"]
+    assert profile_id in [p["profile_id"] for p in listed]
+    assert client.get(f"/api/profiles/{profile_id}", params={"profile": TOKEN}).status_code == 200
+
+
+def test_profiles_hidden_without_configured_token(client, monkeypatch):
+    monkeypatch.setattr(profile_config, "token", None)
+    assert client.get("/api/profiles", headers={"X-Profile": TOKEN}).status_code == 404
+    assert client.get("/api/profiles/abc", params={"profile": TOKEN}).status_code == 404
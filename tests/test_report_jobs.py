@@ -0,0 +1,63 @@
+"""
+报告任务测试：未完成任务达到上限时拒绝提交（背压），结束后恢复接收
+"""
+import threading
+
+import pytest
+
+from core.report_jobs import ReportJobManager, ReportQueueFullError, SUCCEEDED
+
+
+@pytest.fixture
+def blocked_manager(tmp_path):
+    release = threading.Event()
+
+    def render(params, fmt):
+        release.wait(5)
+        return "<html></html>"
+
+    manager = ReportJobManager(storage_dir=str(tmp_path), max_workers=1, max_pending=2,
+                               renderers={"slow": render})
+    yield manager, release
+    release.set()
+    manager.shutdown()
+
+
+def test_rejects_when_pending_limit_reached(blocked_manager):
+    manager, release = blocked_manager
+    first = manager.submit("slow", {})
+    manager.submit("slow", {})
+
+    with pytest.raises(ReportQueueFullError):
+        manager.submit("slow", {})
+    assert manager.rejected == 1
+    assert len(manager.jobs) == 2
+
+    release.set()
+    assert manager.wait(first["job_id"], timeout=5)["status"] == SUCCEEDED
+    for job_id in list(manager.jobs):
+        manager.wait(job_id, timeout=5)
+    assert manager.pending == 0
+    assert manager.submit("slow", {})["status"] in ("queued", "running", "succeeded")
+
+
+def test_unknown_report_type_is_plain_value_error(tmp_path):
+    manager = ReportJobManager(storage_dir=str(tmp_path), renderers={})
+    with pytest.raises(ValueError) as exc:
+        manager.submit("missing", {})
+    assert not isinstance(exc.value, ReportQueueFullError)
+    assert manager.pending == 0
+
+
+def test_submit_endpoint_returns_429_when_full(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from api.main import app
+    from core.report_jobs import report_jobs
+
+    monkeypatch.setattr(report_jobs, "pending", report_jobs.max_pending)
+    client = TestClient(app)
+    response = client.post("/api/reports", json={"report_type": "portfolio_risk", "params": {}})
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "5"
+    assert "报告任务过多" in response.json()["error"]
@@ -0,0 +1,43 @@
+"""
+报告模板测试：静态段原样输出、动态段替换字段，报告缓存按数据版本命中
+"""
+from src.modules.report_templates import ReportBuilder, ReportTemplate, render_cached, report_cache
+
+TEMPLATE = """
+# 📊 {ticker} - {name}
+**数据来源: 本地 {{离线}}**
+
+| **当前价格** | {currency}{price:.2f} |
+| **今日涨跌** | {change:+.2f}% |
+"""
+
+VALUES = {"ticker": "AAPL", "name": "Apple", "currency": "$", "price": 189.5, "change": -1.234}
+
+
+def test_render_matches_format_map():
+    template = ReportTemplate(TEMPLATE)
+    assert template.render(VALUES) == TEMPLATE.format_map(VALUES)
+    assert template.fields == set(VALUES)
+
+
+def test_static_sections_are_not_formatted():
+    template = ReportTemplate("## 说明\n", "{x}\n", "---\n")
+    assert [dynamic for dynamic, _ in template.sections] == [False, True, False]
+    assert template.render({"x": 1}) == "## 说明\n1\n---\n"
+
+
+def test_builder_and_render_cache():
+    report_cache.clear()
+    built = ReportBuilder().add("# 标题\n").add_template(ReportTemplate("{x}\n"), {"x": 2}).build()
+    assert built == "# 标题\n2\n"
+
+    calls = []
+
+    def render():
+        calls.append(1)
+        return "report"
+
+    assert render_cached("AAPL", "basic", 1, render) == "report"
+    assert render_cached("AAPL", "basic", 1, render) == "report"
+    assert render_cached("AAPL", "basic", 2, render) == "report"
+    assert len(calls) == 2
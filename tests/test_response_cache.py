@@ -0,0 +1,86 @@
+"""
+响应缓存测试：同一请求命中缓存、ETag 条件请求返回 304 且带 Vary、数据版本变化后失效、非 200 不缓存
+"""
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from api.compression import CompressionMiddleware
+from api.response_cache import ResponseCacheMiddleware
+
+
+def make_client(compress=False):
+    app = FastAPI()
+    state = {"calls": 0, "version": "1"}
+
+    @app.get("/data")
+    def data(n: int = 1):
+        state["calls"] += 1
+        return {"values": list(range(n)), "calls": state["calls"]}
+
+    @app.post("/echo")
+    def echo(body: dict):
+        state["calls"] += 1
+        return body
+
+    @app.get("/missing")
+    def missing():
+        state["calls"] += 1
+        raise HTTPException(status_code=404, detail="missing")
+
+    app.add_middleware(ResponseCacheMiddleware, paths=("/data", "/echo", "/missing"),
+                       version=lambda: state["version"])
+    if compress:
+        app.add_middleware(CompressionMiddleware, minimum_size=100)
+    return TestClient(app), state
+
+
+def test_hit_and_conditional_request():
+    client, state = make_client()
+    first = client.get("/data?n=3&x=1")
+    second = client.get("/data?x=1&n=3")
+    assert first.headers["x-cache"] == "MISS" and second.headers["x-cache"] == "HIT"
+    assert second.json() == first.json() and state["calls"] == 1
+    assert first.headers["vary"] == "Accept"
+
+    etag = first.headers["etag"]
+    not_modified = client.get("/data?n=3&x=1", headers={"If-None-Match": f'"other", {etag}'})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+    assert not_modified.headers["vary"] == "Accept"
+
+    # Accept 不同的请求分别缓存
+    client.get("/data?n=3&x=1", headers={"Accept": "text/plain"})
+    assert state["calls"] == 2
+
+
+def test_version_change_and_errors_bypass():
+    client, state = make_client()
+    etag = client.get("/data").headers["etag"]
+    state["version"] = "2"
+    response = client.get("/data", headers={"If-None-Match": etag})
+    # 新版本重新计算，内容变化后旧 ETag 不再匹配
+    assert response.status_code == 200 and response.headers["x-cache"] == "MISS"
+    assert response.headers["etag"] != etag and state["calls"] == 2
+
+    assert client.get("/missing").status_code == 404
+    assert client.get("/missing").status_code == 404
+    assert state["calls"] == 4
+
+
+def test_equivalent_json_bodies_share_entry():
+    client, state = make_client()
+    client.post("/echo", content=b'{"a": 1, "b": [1, 2]}', headers={"Content-Type": "application/json"})
+    response = client.post("/echo", content=b'{"b":[1,2],"a":1}', headers={"Content-Type": "application/json"})
+    assert response.headers["x-cache"] == "HIT" and state["calls"] == 1
+
+
+def test_weak_etag_after_compression_still_matches():
+    client, _ = make_client(compress=True)
+    response = client.get("/data?n=200", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"].startswith('W/"')
+    assert response.headers["vary"] == "Accept, Accept-Encoding"
+
+    again = client.get("/data?n=200", headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]})
+    assert again.status_code == 304
@@ -0,0 +1,121 @@
+"""
+智能体调度器测试：优先级顺序、队列满时的背压、截止时间、失败隔离、运行中注册与停止
+"""
+import asyncio
+
+import pytest
+
+from agents.base import BaseAgent
+from core.scheduler import AgentScheduler, DeadlineExceeded, QueueFullError
+
+
+class RecordingAgent(BaseAgent):
+    """按处理顺序记录 payload；gate 未打开前阻塞第一个任务"""
+
+    name = "recorder"
+    queue_size = 10
+
+    def __init__(self, name="recorder", queue_size=10):
+        self.name = name
+        self.queue_size = queue_size
+        self.seen = []
+        self.gate = asyncio.Event()
+
+    async def handle(self, payload):
+        await self.gate.wait()
+        if payload.get("fail"):
+            raise RuntimeError("boom")
+        if payload.get("sleep"):
+            await asyncio.sleep(payload["sleep"])
+        self.seen.append(payload["i"])
+        return payload["i"] * 2
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_priority_order_and_results():
+    async def scenario():
+        scheduler = AgentScheduler()
+        agent = RecordingAgent()
+        scheduler.register(agent)
+        await scheduler.start()
+        # 第一个任务被 gate 挡住，其余按优先级、同优先级按提交顺序排队
+        first = await scheduler.submit("recorder", {"i": 0})
+        await asyncio.sleep(0)
+        futures = [await scheduler.submit("recorder", {"i": i}, priority=p)
+                   for i, p in ((1, 5), (2, 1), (3, 5), (4, 0))]
+        agent.gate.set()
+        results = await asyncio.gather(first, *futures)
+        stats = scheduler.get_stats()["recorder"]
+        await scheduler.stop()
+        return agent.seen, results, stats
+
+    seen, results, stats = run(scenario())
+    assert seen == [0, 4, 2, 1, 3]
+    assert results == [0, 2, 4, 6, 8]
+    assert stats["completed"] == 5 and stats["queue_depth"] == 0
+
+
+def test_backpressure_rejects_when_full():
+    async def scenario():
+        scheduler = AgentScheduler()
+        agent = RecordingAgent(queue_size=2)
+        scheduler.register(agent)
+        await scheduler.start()
+        await scheduler.submit("recorder", {"i": 0})
+        await asyncio.sleep(0)
+        await scheduler.submit("recorder", {"i": 1})
+        await scheduler.submit("recorder", {"i": 2})
+        with pytest.raises(QueueFullError):
+            await scheduler.submit("recorder", {"i": 3}, block=False)
+        with pytest.raises(QueueFullError):
+            await scheduler.submit("recorder", {"i": 3}, timeout=0.01)
+        rejected = scheduler.stats["recorder"].rejected
+        agent.gate.set()
+        await scheduler.stop()
+        return rejected
+
+    assert run(scenario()) == 2
+
+
+def test_deadlines_and_failures_are_isolated():
+    async def scenario():
+        scheduler = AgentScheduler()
+        agent = RecordingAgent()
+        agent.gate.set()
+        scheduler.register(agent)
+        await scheduler.start()
+        slow = await scheduler.submit("recorder", {"i": 1, "sleep": 1.0}, deadline=0.05)
+        failed = await scheduler.submit("recorder", {"i": 2, "fail": True})
+        ok = await scheduler.submit("recorder", {"i": 3})
+        outcomes = await asyncio.gather(slow, failed, ok, return_exceptions=True)
+        stats = scheduler.get_stats()["recorder"]
+        await scheduler.stop()
+        return outcomes, stats
+
+    (slow, failed, ok), stats = run(scenario())
+    assert isinstance(slow, DeadlineExceeded)
+    assert isinstance(failed, RuntimeError)
+    assert ok == 6
+    assert (stats["expired"], stats["failed"], stats["completed"]) == (1, 1, 1)
+
+
+def test_register_while_running_and_stop_cancels_pending():
+    async def scenario():
+        scheduler = AgentScheduler()
+        await scheduler.start()
+        agent = RecordingAgent(name="late")
+        scheduler.register(agent)
+        # 启动任务尚未运行时即可提交，任务先入队
+        blocked = await scheduler.submit("late", {"i": 1}, block=False)
+        pending = await scheduler.submit("late", {"i": 2}, block=False)
+        await asyncio.sleep(0.01)
+        await scheduler.stop()
+        with pytest.raises(KeyError):
+            await scheduler.submit("late", {"i": 3})
+        return blocked, pending
+
+    blocked, pending = run(scenario())
+    assert blocked.cancelled() and pending.cancelled()
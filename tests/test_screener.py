@@ -0,0 +1,98 @@
+"""
+风险筛选测试：预排序索引的分页与朴素排序一致，区间/行业过滤，并发首次调用只重建一次
+"""
+import threading
+
+import numpy as np
+import pytest
+
+from src.modules import screener as screener_module
+from src.modules.screener import RiskScreener
+from src.modules.stock_database import LocalStockDatabase
+
+
+@pytest.fixture
+def screener():
+    rng = np.random.default_rng(0)
+    size = 57
+    risk = rng.uniform(0, 10, size).round(1)
+    risk[rng.choice(size, 9, replace=False)] = np.nan
+    s = RiskScreener()
+    s.load_columns(np.array([f"T{i:02d}" for i in range(size)], dtype=object),
+                   np.array(["Tech" if i % 3 else "Energy" for i in range(size)], dtype=object),
+                   {"risk_score": risk, "beta": rng.uniform(0.5, 2, size)})
+    return s
+
+
+def naive_order(values, descending):
+    """稳定排序，NaN 始终排在最后"""
+    valid = np.flatnonzero(~np.isnan(values))
+    nan = np.flatnonzero(np.isnan(values))
+    key = -values[valid] if descending else values[valid]
+    return np.concatenate([valid[np.argsort(key, kind="stable")], nan])
+
+
+def page_tickers(result):
+    return [row["ticker"] for row in result["rows"]]
+
+
+@pytest.mark.parametrize("descending", [True, False])
+@pytest.mark.parametrize("offset,limit", [(0, 10), (5, 20), (40, 10), (45, 10), (48, 5), (50, 20), (0, 100)])
+def test_unfiltered_pages_match_naive_sort(screener, descending, offset, limit):
+    values = screener._index.columns["risk_score"]
+    result = screener.screen(sort_by="risk_score", descending=descending, offset=offset, limit=limit)
+    expected = naive_order(values, descending)[offset:offset + limit]
+    got = page_tickers(result)
+    assert result["total"] == 57
+    # 同值的顺序不作要求，逐个比较取值
+    assert [screener._index.columns["risk_score"][int(t[1:])] for t in got] == \
+        pytest.approx(list(values[expected]), nan_ok=True)
+
+
+def test_pages_cover_all_rows_once(screener):
+    seen = []
+    for offset in range(0, 60, 7):
+        seen += page_tickers(screener.screen(descending=True, offset=offset, limit=7))
+    assert sorted(seen) == sorted(screener._index.tickers)
+
+
+def test_range_and_sector_filters(screener):
+    index = screener._index
+    result = screener.screen(filters={"risk_score": {"gte": 3, "lt": 7}}, sector="Tech", limit=100)
+    expected = {t for t, v, s in zip(index.tickers, index.columns["risk_score"], index.sectors)
+                if 3 <= v < 7 and s == "Tech"}
+    assert set(page_tickers(result)) == expected
+    assert result["total"] == len(expected)
+    scores = [row["risk_score"] for row in result["rows"]]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_unknown_metric(screener):
+    with pytest.raises(ValueError):
+        screener.screen(filters={"nope": {"gt": 1}})
+
+
+def test_concurrent_first_calls_rebuild_once(monkeypatch):
+    fresh = RiskScreener()
+    monkeypatch.setattr(screener_module, "screener", fresh)
+    calls = []
+    original = LocalStockDatabase.calculate_risk_scores
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(LocalStockDatabase, "calculate_risk_scores", staticmethod(counting))
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        screener_module.get_screener()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert fresh.data_version == LocalStockDatabase.DATA_VERSION
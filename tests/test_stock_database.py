@@ -0,0 +1,37 @@
+"""
+批量风险评分测试：向量化 calculate_risk_scores 与逐只 calculate_risk_score 在相同随机波动率下结果一致
+"""
+import random
+
+import numpy as np
+
+from src.modules.stock_database import LocalStockDatabase
+
+
+def test_batch_scores_match_scalar(monkeypatch):
+    infos = LocalStockDatabase.STOCK_DATABASE
+    batch = LocalStockDatabase.calculate_risk_scores(seed=7)
+    draws = iter(np.random.default_rng(7).uniform(0.05, 0.15, len(infos)))
+
+    # 逐只版本的波动率取与批量版本相同的随机数，其余随机项（技术指标）不影响评分
+    monkeypatch.setattr(random, "uniform", lambda low, high: next(draws) if low == 0.05 else 0.0)
+    for i, ticker in enumerate(batch["tickers"]):
+        scalar = LocalStockDatabase.calculate_risk_score(dict(infos[ticker]))
+        level = LocalStockDatabase.RISK_LEVELS[batch["risk_level"][i]][0]
+        assert scalar["risk_score"] == batch["risk_score"][i], ticker
+        assert scalar["volatility"] == batch["volatility"][i], ticker
+        assert scalar["risk_level"] == level, ticker
+
+
+def test_range_lookup_edges():
+    rules = {"low": (0.0, 1.0, 3.0), "high": (1.0, 2.0, 8.0)}
+    values = np.array([-0.5, 0.0, 0.999, 1.0, 1.999, 2.0, np.nan])
+    scores = LocalStockDatabase._lookup_range_scores(values, rules, default=6.0)
+    np.testing.assert_array_equal(scores, [6.0, 3.0, 3.0, 8.0, 8.0, 6.0, 6.0])
+
+
+def test_seeded_batch_is_deterministic():
+    first = LocalStockDatabase.calculate_risk_scores(seed=1)
+    second = LocalStockDatabase.calculate_risk_scores(seed=1)
+    np.testing.assert_array_equal(first["risk_score"], second["risk_score"])
+    assert set(np.unique(first["risk_level"])) <= {0, 1, 2}
@@ -0,0 +1,93 @@
+"""
+缓存工具
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+class LRUCache:
+    """
+    线程安全的 LRU 缓存
+
+    可选 max_weight + weigher（如按字节数）再限制总占用，条目数或总权重任一超限即淘汰。
+    """
+
+    def __init__(self, maxsize: int = 1024, max_weight: Optional[int] = None,
+                 weigher: Optional[Callable[[Any], int]] = None):
+        self.maxsize = maxsize
+        self.max_weight = max_weight
+        self.weigher = weigher
+        self.weight = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """读取缓存，命中时移到最近使用位置"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            if self.weigher is not None:
+                if key in self._data:
+                    self.weight -= self.weigher(self._data[key])
+                self.weight += self.weigher(value)
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize or (
+                    self.max_weight is not None and self.weight > self.max_weight and self._data):
+                _, evicted = self._data.popitem(last=False)
+                if self.weigher is not None:
+                    self.weight -= self.weigher(evicted)
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """命中则返回缓存值，否则调用 factory 生成并写入"""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        """清空缓存及统计"""
+        with self._lock:
+            self._data.clear()
+            self.weight = 0
+            self.hits = 0
+            self.misses = 0
+
+    def values(self) -> List[Any]:
+        """当前所有条目的快照（不影响使用顺序与命中统计）"""
+        with self._lock:
+            return list(self._data.values())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        total = self.hits + self.misses
+        stats = {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+        if self.weigher is not None:
+            stats["weight"] = self.weight
+            stats["max_weight"] = self.max_weight
+        return stats
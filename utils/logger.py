@@ -1,29 +1,277 @@
 """
 日志配置工具
+
+所有日志经由一个 loguru 回调输出：调用方只负责生成记录并放入进程内队列，
+格式化（文本或 JSON）与控制台/文件 I/O 都在后台写线程中完成。
 """
+import atexit
+import json
+import os
+import queue
 import sys
+import threading
+import time
+import traceback
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO
+
 from loguru import logger
 
-def setup_logger(name: str = "finrisk"):
-    """设置日志配置"""
-    
+# 日志目录，设为空字符串时不写文件（如只读文件系统的 Serverless 环境）
+LOG_DIR = os.getenv("FINRISK_LOG_DIR", "logs")
+# 输出格式：text 或 json
+LOG_FORMAT = os.getenv("FINRISK_LOG_FORMAT", "text").lower()
+# 控制台 / 文件的最低级别
+CONSOLE_LEVEL = os.getenv("FINRISK_LOG_LEVEL", "INFO").upper()
+FILE_LEVEL = os.getenv("FINRISK_LOG_FILE_LEVEL", "DEBUG").upper()
+# 按模块设置级别，如 "core.alerts=WARNING,core.scheduler=DEBUG"
+MODULE_LEVELS = os.getenv("FINRISK_LOG_LEVELS", "")
+LOG_RETENTION_DAYS = 30
+# 待写队列超过该长度时丢弃新日志（写线程跟不上时保护内存）
+MAX_BACKLOG = 100_000
+
+_TEXT_FORMAT = "{time} | {level: <8} | {name}:{function}:{line} - {message}"
+
+
+def _level_no(level: str) -> int:
+    return logger.level(level.upper()).no
+
+
+class _ModuleLevels:
+    """按模块名（loguru 记录的 __name__ 或 setup_logger 传入的名称）前缀匹配的级别过滤"""
+
+    def __init__(self):
+        self.levels: Dict[str, int] = {}
+        self._cache: Dict[str, int] = {}
+
+    def set(self, module: str, level: str) -> None:
+        self.levels[module] = _level_no(level)
+        self._cache = {}
+
+    def parse(self, spec: str) -> None:
+        for item in spec.split(","):
+            module, _, level = item.partition("=")
+            if module.strip() and level.strip():
+                self.set(module.strip(), level.strip())
+
+    def _resolve(self, name: str) -> int:
+        level = self._cache.get(name)
+        if level is None:
+            level = 0
+            parts = name.split(".")
+            for i in range(len(parts), 0, -1):
+                prefix = ".".join(parts[:i])
+                if prefix in self.levels:
+                    level = self.levels[prefix]
+                    break
+            self._cache[name] = level
+        return level
+
+    def __call__(self, record) -> bool:
+        if not self.levels:
+            return True
+        # 先按绑定的模块名前缀匹配，没有匹配时再按记录所在的 Python 模块名匹配
+        module = record["extra"].get("module")
+        threshold = self._resolve(module) if module else 0
+        if not threshold:
+            threshold = self._resolve(record["name"] or "")
+        return record["level"].no >= threshold
+
+
+def format_text(record) -> str:
+    text = _TEXT_FORMAT.format(
+        time=record["time"].strftime("%Y-%m-%d %H:%M:%S"), level=record["level"].name,
+        name=record["name"], function=record["function"], line=record["line"], message=record["message"]
+    )
+    if record["exception"]:
+        text += "\n" + "".join(traceback.format_exception(*record["exception"])).rstrip()
+    return text
+
+
+def format_json(record) -> str:
+    data = {
+        "ts": record["time"].isoformat(),
+        "level": record["level"].name,
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+        "thread": record["thread"].name
+    }
+    if record["extra"]:
+        data["extra"] = record["extra"]
+    if record["exception"]:
+        data["exception"] = "".join(traceback.format_exception(*record["exception"])).rstrip()
+    return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class _DailyFile:
+    """按日期切分的日志文件（finrisk_YYYY-MM-DD.log），首次写入时才创建，切换日期时清理过期文件"""
+
+    def __init__(self, directory: str, retention_days: int = LOG_RETENTION_DAYS):
+        self.directory = Path(directory)
+        self.retention_days = retention_days
+        self._date = None
+        self._file: Optional[TextIO] = None
+
+    def write(self, lines: List[str], date) -> None:
+        if date != self._date:
+            self.close()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.directory / f"finrisk_{date:%Y-%m-%d}.log", "a", encoding="utf-8")
+            self._date = date
+            self._cleanup(date)
+        self._file.write("\n".join(lines) + "\n")
+
+    def flush(self) -> None:
+        if self._file:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _cleanup(self, today) -> None:
+        cutoff = f"finrisk_{today - timedelta(days=self.retention_days):%Y-%m-%d}.log"
+        for path in self.directory.glob("finrisk_*.log"):
+            if path.name < cutoff:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+
+class AsyncLogSink:
+    """
+    异步日志输出
+
+    loguru 调用 write 时只把记录放入 SimpleQueue；后台线程批量取出、格式化并写入控制台与文件，
+    每批只 flush 一次。进程退出时排空队列。
+    """
+
+    def __init__(self, console: Optional[TextIO], log_dir: str, fmt: str = "text",
+                 console_level: str = "INFO", file_level: str = "DEBUG"):
+        self.console = console
+        self.file = _DailyFile(log_dir) if log_dir else None
+        self.formatter = format_json if fmt == "json" else format_text
+        self.console_level = _level_no(console_level)
+        self.file_level = _level_no(file_level)
+        self.queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def min_level(self) -> int:
+        levels = [self.console_level] if self.console else []
+        if self.file:
+            levels.append(self.file_level)
+        return min(levels) if levels else _level_no("CRITICAL")
+
+    def write(self, message) -> None:
+        if self.queue.qsize() >= MAX_BACKLOG:
+            self.dropped += 1
+            return
+        self.enqueued += 1
+        self.queue.put(message.record)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < 1000:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            self._write([r for r in batch if r is not None])
+            if stop:
+                return
+
+    def _write(self, records) -> None:
+        if not records:
+            return
+        console_lines, file_lines = [], []
+        for record in records:
+            try:
+                line = self.formatter(record)
+            except Exception as e:
+                line = f"日志格式化失败: {e!r}"
+            if self.console and record["level"].no >= self.console_level:
+                console_lines.append(line)
+            if self.file and record["level"].no >= self.file_level:
+                file_lines.append(line)
+        try:
+            if console_lines:
+                self.console.write("\n".join(console_lines) + "\n")
+                self.console.flush()
+            if file_lines:
+                self.file.write(file_lines, records[-1]["time"].date())
+                self.file.flush()
+        except Exception as e:
+            sys.__stderr__.write(f"日志写入失败: {e!r}\n")
+        self.written += len(records)
+
+    def flush(self, timeout: float = 2.0) -> None:
+        """等待调用前已入队的日志写出"""
+        target = self.enqueued
+        deadline = time.monotonic() + timeout
+        while self.written < target and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def close(self) -> None:
+        self.queue.put(None)
+        self._thread.join(timeout=2.0)
+        if self.file:
+            self.file.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"queued": self.queue.qsize(), "written": self.written, "dropped": self.dropped}
+
+
+module_levels = _ModuleLevels()
+_sink: Optional[AsyncLogSink] = None
+_lock = threading.Lock()
+
+
+def _configure() -> None:
+    global _sink
+    module_levels.parse(MODULE_LEVELS)
+    _sink = AsyncLogSink(sys.stdout, LOG_DIR, LOG_FORMAT, CONSOLE_LEVEL, FILE_LEVEL)
     # 移除默认配置
     logger.remove()
-    
-    # 控制台输出
-    logger.add(
-        sys.stdout,
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-        level="INFO"
-    )
-    
-    # 文件输出
-    logger.add(
-        "logs/finrisk_{time:YYYY-MM-DD}.log",
-        rotation="1 day",
-        retention="30 days",
-        level="DEBUG",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
-    )
-    
-    return logger.bind(module=name)
\ No newline at end of file
+    # format 只保留消息本身，完整格式化在写线程中进行
+    logger.add(_sink.write, level=_sink.min_level, format="{message}", filter=module_levels,
+               catch=True, backtrace=False, diagnose=False)
+    atexit.register(_sink.close)
+
+
+def setup_logger(name: str = "finrisk"):
+    """获取绑定模块名的 logger；全局输出只在首次调用时配置"""
+    if _sink is None:
+        with _lock:
+            if _sink is None:
+                _configure()
+    return logger.bind(module=name)
+
+
+def set_module_level(module: str, level: str) -> None:
+    """
+    运行时设置某模块（及其子模块）的最低级别
+
+    模块级别是额外的过滤条件，低于控制台/文件级别的日志仍不会输出。
+    """
+    module_levels.set(module, level)
+
+
+def flush_logs(timeout: float = 2.0) -> None:
+    if _sink is not None:
+        _sink.flush(timeout)
+
+
+def log_stats() -> Dict[str, Any]:
+    return _sink.stats() if _sink is not None else {}
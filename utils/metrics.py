@@ -0,0 +1,262 @@
+"""
+运行指标工具
+
+进程内的计数器与直方图注册表，按 Prometheus 文本格式导出（/metrics），
+Gradio 监控页与 API 读取同一个全局 registry。
+"""
+import functools
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# 延迟直方图的默认桶（秒），与 prometheus_client 默认值一致
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} 需要标签 {self.labelnames}，收到 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """单调递增计数器"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, value in sorted(self.samples().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class _HistogramState:
+    __slots__ = ("counts", "sum", "count", "max")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * buckets
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+
+class Histogram(_Metric):
+    """固定桶直方图；observe 只做一次二分查找与计数"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._states: Dict[LabelValues, _HistogramState] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = _HistogramState(len(self.buckets))
+            state.counts[index] += 1
+            state.sum += value
+            state.count += 1
+            if value > state.max:
+                state.max = value
+
+    def summary(self, **labels) -> Dict[str, float]:
+        """某组标签的次数、均值、最大值与按桶估算的 p50/p95（不超过最大值；无数据时为 0）"""
+        with self._lock:
+            state = self._states.get(self._key(labels))
+            if state is None or not state.count:
+                return {"count": 0, "avg": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+            counts, total, count, peak = list(state.counts), state.sum, state.count, state.max
+        return {"count": count, "avg": total / count, "max": peak,
+                "p50": min(self._quantile(counts, count, 0.5), peak),
+                "p95": min(self._quantile(counts, count, 0.95), peak)}
+
+    def label_values(self) -> List[LabelValues]:
+        with self._lock:
+            return sorted(self._states)
+
+    def _quantile(self, counts: List[int], count: int, q: float) -> float:
+        # 与 PromQL histogram_quantile 相同：在所在桶内线性插值，落在 +Inf 桶时取最大有限边界
+        rank = q * count
+        cumulative = 0
+        for i, n in enumerate(counts):
+            if cumulative + n >= rank and n:
+                upper = self.buckets[i]
+                lower = self.buckets[i - 1] if i else 0.0
+                if upper == math.inf:
+                    return lower
+                return lower + (upper - lower) * (rank - cumulative) / n
+            cumulative += n
+        return self.buckets[-2]
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            states = [(key, list(s.counts), s.sum, s.count) for key, s in sorted(self._states.items())]
+        for key, counts, total, count in states:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """指标注册表；同名指标重复注册时返回已有实例"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"指标 {name} 已注册为 {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Prometheus 文本格式（text/plain; version=0.0.4）"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# 各阶段耗时：fetch（行情获取）/ compute（指标计算）/ render（报告渲染）/ request（界面端到端分析）
+STAGE_SECONDS = registry.histogram(
+    "finrisk_stage_duration_seconds", "各阶段耗时（秒）", ("stage", "operation")
+)
+STAGE_ERRORS = registry.counter(
+    "finrisk_stage_errors_total", "各阶段抛出异常的次数", ("stage", "operation")
+)
+HTTP_SECONDS = registry.histogram(
+    "finrisk_http_request_duration_seconds", "API 请求耗时（秒），route 为路由模板", ("method", "route", "status")
+)
+FETCH_SOURCES = registry.counter(
+    "finrisk_fetch_total", "行情获取次数，按数据来源（cache / local_sim / yahoo_api / local_fallback / api_error）",
+    ("source",)
+)
+
+
+class timed:
+    """
+    阶段计时：既可作装饰器也可作上下文管理器
+
+        @timed("fetch")
+        def get_stock_data(...): ...
+
+        with timed("render", "stress_test"):
+            ...
+
+    operation 默认取被装饰函数的 __qualname__；异常照常抛出，并计入 finrisk_stage_errors_total。
+    """
+
+    __slots__ = ("stage", "operation", "_start")
+
+    def __init__(self, stage: str, operation: Optional[str] = None):
+        self.stage = stage
+        self.operation = operation
+        self._start = 0.0
+
+    def __enter__(self) -> "timed":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        operation = self.operation or "unknown"
+        STAGE_SECONDS.observe(time.perf_counter() - self._start, stage=self.stage, operation=operation)
+        if exc_type is not None:
+            STAGE_ERRORS.inc(stage=self.stage, operation=operation)
+
+    def __call__(self, func: Callable) -> Callable:
+        stage = self.stage
+        operation = self.operation or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # 每次调用新建计时器，装饰器本身可被多个线程共享
+            with timed(stage, operation):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def stage_summaries(stage: Optional[str] = None) -> Iterator[Tuple[str, str, Dict[str, float]]]:
+    """按 (stage, operation) 遍历耗时摘要，供监控页展示"""
+    for stage_name, operation in STAGE_SECONDS.label_values():
+        if stage is None or stage_name == stage:
+            yield stage_name, operation, STAGE_SECONDS.summary(stage=stage_name, operation=operation)
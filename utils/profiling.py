@@ -0,0 +1,295 @@
+"""
+采样剖析工具
+
+后台线程按固定间隔采集各线程的 Python 调用栈，结果输出为折叠栈（collapsed stacks）格式，
+每行 "帧;帧;帧 次数"，可直接交给 flamegraph.pl、speedscope 或 inferno 生成火焰图。
+"""
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.cache import LRUCache
+from utils.logger import setup_logger
+
+logger = setup_logger("profiling")
+
+# 栈顶位于这些文件时视为空闲等待（事件循环 select、锁/条件变量等待），不计入样本
+IDLE_FILES = ("selectors.py", "threading.py", "queue.py")
+# 不采样的线程：日志写线程与剖析线程自身
+IGNORED_THREADS = ("log-writer",)
+PROFILER_THREAD_PREFIX = "profiler"
+MAX_DEPTH = 128
+
+
+def _frame_label(code) -> str:
+    # 与 py-spy 的折叠栈格式一致："函数 (文件:首行)"
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    采样剖析器
+
+    interval 秒采集一次 sys._current_frames()，默认采集全部线程：async 端点运行在事件循环线程，
+    同步端点与 asyncio.to_thread 运行在线程池，都能被覆盖；同时在运行的其他请求也会出现在结果中。
+    """
+
+    def __init__(self, interval: float = 0.005, thread_ids: Optional[List[int]] = None,
+                 max_seconds: Optional[float] = None):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.thread_ids = set(thread_ids) if thread_ids else None
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name=f"{PROFILER_THREAD_PREFIX}-{id(self):x}",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started
+        return self
+
+    def __enter__(self) -> "SamplingProfiler":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        # 超过 max_seconds 后停止采样（如长连接的流式响应），结果保留已采集部分
+        deadline = self.started + self.max_seconds if self.max_seconds else None
+        while not self._stop.wait(self.interval):
+            if deadline is not None and time.perf_counter() > deadline:
+                return
+            self.sample()
+
+    def sample(self) -> None:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if self.thread_ids is not None and ident not in self.thread_ids:
+                continue
+            name = names.get(ident, str(ident))
+            if name in IGNORED_THREADS or name.startswith(PROFILER_THREAD_PREFIX):
+                continue
+            if os.path.basename(frame.f_code.co_filename) in IDLE_FILES:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.append(f"thread:{name}")
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def collapsed(self) -> str:
+        """折叠栈文本（按次数降序）"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top(self, n: int = 10) -> List[Tuple[str, int]]:
+        """按自身（栈顶）样本数排序的函数"""
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(n)
+
+
+@dataclass
+class Profile:
+    """一次剖析的结果"""
+    profile_id: str
+    name: str
+    started_at: datetime
+    duration_ms: float
+    samples: int
+    interval_ms: float
+    collapsed: str
+    top: List[Tuple[str, int]]
+    path: Optional[str] = None
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "profile_id": self.profile_id,
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": self.duration_ms,
+            "samples": self.samples,
+            "interval_ms": self.interval_ms,
+            "top": [{"frame": frame, "samples": count} for frame, count in self.top],
+            "path": self.path
+        }
+
+
+@dataclass
+class ProfileConfig:
+    """
+    剖析配置
+
+    环境变量：FINRISK_PROFILE_TRIGGER（0 关闭请求头/查询参数触发）、FINRISK_PROFILE_TOKEN（触发值须等于该令牌，未设置时不能按请求触发）、
+    FINRISK_PROFILE_RATE（默认采样率，0~1）、FINRISK_PROFILE_RATES（按路径前缀的采样率，如 "/api/risk=0.01,/api/screener=0.05"）、
+    FINRISK_PROFILE_INTERVAL_MS（采样间隔）、FINRISK_PROFILE_DIR（保存折叠栈文件的目录，空则只保存在内存）、
+    FINRISK_PROFILE_MAX_ACTIVE（同时进行的剖析上限）、FINRISK_PROFILE_MAX_SECONDS（单次最长采样时间）。
+    """
+    trigger: bool = True
+    token: Optional[str] = None
+    default_rate: float = 0.0
+    rates: Dict[str, float] = field(default_factory=dict)
+    interval_ms: float = 5.0
+    directory: str = ""
+    max_active: int = 4
+    max_seconds: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "ProfileConfig":
+        rates = {}
+        for item in os.getenv("FINRISK_PROFILE_RATES", "").split(","):
+            prefix, _, rate = item.partition("=")
+            if prefix.strip() and rate.strip():
+                rates[prefix.strip()] = float(rate)
+        return cls(
+            trigger=os.getenv("FINRISK_PROFILE_TRIGGER", "1") == "1",
+            token=os.getenv("FINRISK_PROFILE_TOKEN") or None,
+            default_rate=float(os.getenv("FINRISK_PROFILE_RATE", "0")),
+            rates=rates,
+            interval_ms=float(os.getenv("FINRISK_PROFILE_INTERVAL_MS", "5")),
+            directory=os.getenv("FINRISK_PROFILE_DIR", ""),
+            max_active=int(os.getenv("FINRISK_PROFILE_MAX_ACTIVE", "4")),
+            max_seconds=float(os.getenv("FINRISK_PROFILE_MAX_SECONDS", "30"))
+        )
+
+    def rate_for(self, path: str) -> float:
+        """最长前缀匹配的采样率，没有匹配时使用默认采样率"""
+        best, rate = -1, self.default_rate
+        for prefix, value in self.rates.items():
+            if path.startswith(prefix) and len(prefix) > best:
+                best, rate = len(prefix), value
+        return rate
+
+    def authorized(self, value: Optional[str]) -> bool:
+        """值是否与令牌相同（常量时间比较）；未配置令牌时总是 False"""
+        if not self.token or not value:
+            return False
+        return hmac.compare_digest(value.encode(), self.token.encode())
+
+    def triggered(self, value: Optional[str]) -> bool:
+        """请求头 / 查询参数的值是否开启剖析：须配置令牌且值与之相同，匿名请求不能触发"""
+        return self.trigger and self.authorized(value)
+
+    def sampled(self, path: str) -> bool:
+        rate = self.rate_for(path)
+        return rate > 0 and random.random() < rate
+
+
+class ProfileStore:
+    """最近的剖析结果（内存 LRU），配置了目录时同时写入 .collapsed 文件"""
+
+    def __init__(self, maxsize: int = 100):
+        self._profiles = LRUCache(maxsize=maxsize)
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, max_active: int) -> bool:
+        """占用一个剖析名额；已达上限时返回 False（该请求不剖析）"""
+        with self._lock:
+            if self._active >= max_active:
+                return False
+            self._active += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._active -= 1
+
+    def add(self, profile: Profile, directory: str = "") -> Profile:
+        if directory:
+            try:
+                Path(directory).mkdir(parents=True, exist_ok=True)
+                safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in profile.name).strip("_")
+                path = Path(directory) / f"{profile.started_at:%Y%m%d_%H%M%S}_{safe_name}_{profile.profile_id}.collapsed"
+                path.write_text(profile.collapsed, encoding="utf-8")
+                profile.path = str(path)
+            except OSError as e:
+                logger.warning(f"剖析结果写入失败: {e}")
+        self._profiles.set(profile.profile_id, profile)
+        return profile
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        return self._profiles.get(profile_id)
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        return [p.summary() for p in sorted(self._profiles.values(), key=lambda p: p.started_at, reverse=True)]
+
+
+profile_config = ProfileConfig.from_env()
+profile_store = ProfileStore()
+
+
+class profiled:
+    """
+    在剖析器下运行一段代码并保存结果
+
+        with profiled("analyze AAPL") as session:
+            ...
+        session.profile  # Profile，已达并发上限时为 None
+    """
+
+    def __init__(self, name: str, config: Optional[ProfileConfig] = None, profile_id: Optional[str] = None):
+        self.name = name
+        self.config = config or profile_config
+        self.profile_id = profile_id or new_profile_id()
+        self.profile: Optional[Profile] = None
+        self._profiler: Optional[SamplingProfiler] = None
+        self._started_at = None
+
+    @property
+    def active(self) -> bool:
+        """是否真正在剖析（并发名额已满时为 False）"""
+        return self._profiler is not None
+
+    def __enter__(self) -> "profiled":
+        if profile_store.acquire(self.config.max_active):
+            self._started_at = datetime.now()
+            self._profiler = SamplingProfiler(self.config.interval_ms / 1000,
+                                              max_seconds=self.config.max_seconds).start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._profiler is None:
+            return
+        try:
+            profiler = self._profiler.stop()
+            self.profile = profile_store.add(Profile(
+                profile_id=self.profile_id,
+                name=self.name,
+                started_at=self._started_at,
+                duration_ms=round(profiler.duration * 1000, 1),
+                samples=profiler.samples,
+                interval_ms=self.config.interval_ms,
+                collapsed=profiler.collapsed(),
+                top=profiler.top()
+            ), self.config.directory)
+        finally:
+            profile_store.release()
+
+
+def new_profile_id() -> str:
+    return uuid.uuid4().hex[:12]